@@ -2,7 +2,6 @@ import sys
 import os
 import logging
 import time
-import pandas as pd
 import numpy as np
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
@@ -13,8 +12,9 @@ from typing import List, Optional, Dict
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.data_loader import load_price_csv, align_pairs
-from core.coint import engle_granger
-from core.signal import compute_spread, zscore, mean_reversion_signals
+from core.catalog import TickerCatalog
+from core.coint import EG_CACHE
+from core.signal import Z_METHODS, mean_reversion_signals
 from core.backtester import backtest_spread_strategy
 from core.metrics import summarize_performance
 
@@ -33,6 +33,9 @@ MIN_WINDOW = 20
 MAX_WINDOW = 252
 DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "prices.csv")
 
+# Ticker list and per-ticker stats, refreshed only when the data file changes
+catalog = TickerCatalog(DATA_PATH, date_col="date")
+
 app = FastAPI(
     title="Statistical Arbitrage Research Engine API",
     description="REST API for running cointegration-based pairs trading backtests",
@@ -55,6 +58,7 @@ class BacktestRequest(BaseModel):
     entry_z: float = DEFAULT_ENTRY_Z
     exit_z: float = DEFAULT_EXIT_Z
     notional: float = 1000.0
+    z_method: str = "rolling"
     
     @validator('tickers')
     def validate_tickers(cls, v):
@@ -72,6 +76,12 @@ class BacktestRequest(BaseModel):
             raise ValueError(f'Window must be <= {MAX_WINDOW}')
         return v
     
+    @validator('z_method')
+    def validate_z_method(cls, v):
+        if v not in Z_METHODS:
+            raise ValueError(f'z_method must be one of {", ".join(Z_METHODS)}')
+        return v
+    
     @validator('entry_z')
     def validate_entry_z(cls, v):
         if v <= 0:
@@ -126,7 +136,9 @@ def get_pairs():
     Get list of available tickers from the data file.
     
     Returns:
-        dict: JSON object with 'tickers' key containing list of available ticker symbols
+        dict: JSON object with 'tickers' key containing list of available ticker symbols,
+              and 'stats' mapping each ticker to its first_date, last_date and rows
+              (null for non-numeric columns, or while a new data file is indexed)
     
     Raises:
         HTTPException: 404 if data file not found, 500 on other errors
@@ -138,10 +150,9 @@ def get_pairs():
         raise HTTPException(status_code=404, detail=f"Data file not found: {DATA_PATH}")
     
     try:
-        df = pd.read_csv(DATA_PATH)
-        cols = [c for c in df.columns if c.lower() != "date"]
+        cols = catalog.tickers()
         logger.info(f"Found {len(cols)} tickers: {cols}")
-        return {"tickers": cols}
+        return {"tickers": cols, "stats": catalog.stats()}
     except Exception as e:
         logger.error(f"Error loading ticker list: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error loading data: {str(e)}")
@@ -161,22 +172,24 @@ def run_backtest(req: BacktestRequest):
         HTTPException: 400 for invalid inputs, 500 for processing errors
     """
     start_time = time.time()
-    logger.info(f"Backtest requested: {req.tickers}, window={req.window}, entry_z={req.entry_z}, exit_z={req.exit_z}")
+    logger.info(f"Backtest requested: {req.tickers}, window={req.window}, z_method={req.z_method}, entry_z={req.entry_z}, exit_z={req.exit_z}")
     
     try:
         # 1. Load Data
-        logger.info(f"Loading data from {DATA_PATH}")
-        df = load_price_csv(DATA_PATH, date_col="date")
-        
-        # Validate tickers exist
+        # Validate tickers exist (header only, before any parse)
+        available = catalog.tickers()
         for ticker in req.tickers:
-            if ticker not in df.columns:
+            if ticker not in available:
                 logger.error(f"Ticker not found: {ticker}")
                 raise HTTPException(
                     status_code=400,
-                    detail=f"Ticker '{ticker}' not found in data. Available: {list(df.columns)}"
+                    detail=f"Ticker '{ticker}' not found in data. Available: {available}"
                 )
         
+        # On a cold cache only the requested tickers are parsed
+        logger.info(f"Loading data from {DATA_PATH}")
+        df = load_price_csv(DATA_PATH, date_col="date", price_cols=req.tickers)
+        
         df_pairs = align_pairs(df, req.tickers)
         
         if df_pairs.empty:
@@ -198,13 +211,15 @@ def run_backtest(req: BacktestRequest):
         
         # 2. Cointegration
         logger.info("Running cointegration test")
-        eg_res = engle_granger(y, x)
+        # Memoized by content: moving only entry_z/exit_z reuses the fit,
+        # the spread and the z-score
+        eg_res = EG_CACHE.engle_granger(y, x)
         logger.info(f"Hedge ratio: {eg_res.hedge_ratio:.4f}, ADF p-value: {eg_res.adf_pvalue:.4f}")
         
         # 3. Signals
         logger.info("Generating signals")
-        spread = compute_spread(y, x, eg_res.hedge_ratio, eg_res.intercept)
-        z = zscore(spread, window=req.window)
+        spread = EG_CACHE.spread(eg_res, y, x)
+        z = EG_CACHE.zscore(eg_res, y, x, window=req.window, method=req.z_method)
         z = z.fillna(0)  # Handle NaNs at start
         
         signals = mean_reversion_signals(z, entry_z=req.entry_z, exit_z=req.exit_z)
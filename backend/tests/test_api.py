@@ -7,7 +7,7 @@ Run with: pytest tests/ -v
 import pytest
 from fastapi.testclient import TestClient
 
-from main import app
+from main import app, catalog
 
 client = TestClient(app)
 
@@ -32,6 +32,20 @@ class TestHealthEndpoints:
         assert "tickers" in data
         assert isinstance(data["tickers"], list)
         assert len(data["tickers"]) > 0
+    
+    def test_get_pairs_stats(self):
+        """Test per-ticker date range and row counts in the ticker list"""
+        client.get("/api/pairs")
+        indexer = catalog._indexer
+        if indexer is not None:
+            indexer.join()  # a cold cache is indexed in the background
+        response = client.get("/api/pairs")
+        data = response.json()
+        assert "stats" in data
+        for ticker in data["tickers"]:
+            stats = data["stats"][ticker]
+            assert stats["rows"] > 0
+            assert stats["first_date"] <= stats["last_date"]
 
 
 class TestBacktestEndpoint:
@@ -122,6 +136,33 @@ class TestBacktestEndpoint:
         response = client.post("/api/run_backtest", json=request_data)
         assert response.status_code == 422  # Validation error
     
+    def test_z_methods(self):
+        """Test the EWMA and median/MAD z-score modes"""
+        for method in ("ewma", "mad"):
+            request_data = {
+                "tickers": ["AAA", "BBB"],
+                "window": 60,
+                "entry_z": 2.0,
+                "exit_z": 0.5,
+                "z_method": method
+            }
+            response = client.post("/api/run_backtest", json=request_data)
+            assert response.status_code == 200
+            assert len(response.json()["zscore"]) == len(response.json()["dates"])
+    
+    def test_invalid_z_method(self):
+        """Test error for an unknown z-score mode"""
+        request_data = {
+            "tickers": ["AAA", "BBB"],
+            "window": 60,
+            "entry_z": 2.0,
+            "exit_z": 0.5,
+            "z_method": "median"
+        }
+        
+        response = client.post("/api/run_backtest", json=request_data)
+        assert response.status_code == 422  # Validation error
+    
     def test_invalid_exit_greater_than_entry(self):
         """Test error when exit_z >= entry_z"""
         request_data = {
@@ -0,0 +1,100 @@
+"""
+Tests for the concurrent IB batch loader (src/batch_loader.py)
+
+Requests are served by the ReplayIB stand-in, so no TWS/Gateway is needed.
+
+Run with: pytest tests/ -v
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from batch_loader import Pacer, fill_store
+from ib_replay import ReplayIB
+from price_store import PriceStore
+
+
+def make_cfg(cache_dir, end_date="2022-12-31", adjusted=False):
+    return dict(start_date="2022-01-01", end_date=end_date, cache_dir=str(cache_dir),
+                adjusted=adjusted, use_rth=True, ib_host="127.0.0.1", ib_port=7497, ib_client_id=1)
+
+
+class TestPacer:
+    """Test the sliding-window request pacer"""
+
+    def test_limits_request_rate(self):
+        """No more than max_requests start within any period"""
+        pacer = Pacer(max_requests=5, period=0.2)
+
+        async def run():
+            starts = []
+            for _ in range(12):
+                await pacer.acquire()
+                starts.append(time.monotonic())
+            return starts
+
+        starts = asyncio.run(run())
+        assert starts[-1] - starts[0] >= 0.4
+        for i in range(5, 12):
+            assert starts[i] - starts[i - 5] >= 0.2 - 1e-3
+
+
+class TestFillStore:
+    """Test concurrent filling of the price store"""
+
+    def test_concurrent_fill(self, tmp_path):
+        """All tickers are fetched with several requests in flight, capped by max_in_flight"""
+        tickers = [f"T{i:02d}" for i in range(24)]
+        ib = ReplayIB(latency=0.02)
+        filled, failed = fill_store(make_cfg(tmp_path), tickers, max_in_flight=6,
+                                    max_requests=1000, period=1.0, ib=ib)
+
+        assert failed == {}
+        assert set(filled) == set(tickers)
+        assert 1 < ib.max_in_flight <= 6
+        store = PriceStore(str(tmp_path), adjusted=False)
+        assert store.missing("T07", "2022-01-01", "2022-12-31") == []
+        expected = ib.history["T07"].loc["2022-01-01":"2022-12-31"]
+        assert (store.read("T07", "2022-01-01", "2022-12-31").to_numpy() == expected.to_numpy()).all()
+
+    def test_retries_and_failures(self, tmp_path, monkeypatch):
+        """Transient errors are retried; persistent ones are reported, not raised"""
+        ib = ReplayIB(fail_first={"AAA": 2, "BBB": 10})
+        filled, failed = fill_store(make_cfg(tmp_path), ["AAA", "BBB"], retries=2, backoff=0.01,
+                                    max_requests=1000, period=1.0, ib=ib)
+        assert "AAA" in filled
+        assert "BBB" in failed and "ConnectionError" in failed["BBB"]
+
+    def test_second_fill_is_noop(self, tmp_path):
+        """A covered universe sends no requests"""
+        ib = ReplayIB()
+        fill_store(make_cfg(tmp_path), ["AAA", "BBB"], max_requests=1000, period=1.0, ib=ib)
+        n = len(ib.requests)
+        fill_store(make_cfg(tmp_path), ["AAA", "BBB"], max_requests=1000, period=1.0, ib=ib)
+        assert len(ib.requests) == n
+
+    def test_adjusted_incremental_extend(self, tmp_path):
+        """Extending an adjusted store fetches the gap; a changed basis rebuilds the ticker"""
+        ib = ReplayIB()
+        kwargs = dict(max_requests=1000, period=1.0, ib=ib)
+        assert fill_store(make_cfg(tmp_path, "2022-06-30", adjusted=True), ["AAA"], **kwargs)[1] == {}
+        n = len(ib.requests)
+        filled, failed = fill_store(make_cfg(tmp_path, "2022-12-31", adjusted=True), ["AAA"], **kwargs)
+        assert failed == {} and len(ib.requests) == n + 1
+        assert filled["AAA"] == len(pd.bdate_range("2022-07-01", "2022-12-30"))
+
+        history = ib.history["AAA"]
+        history.loc[:"2023-02-01"] *= 0.5  # 2:1 split adjustment
+        filled, failed = fill_store(make_cfg(tmp_path, "2023-03-31", adjusted=True), ["AAA"], **kwargs)
+        assert failed == {} and len(ib.requests) == n + 3  # gap, then the full range
+        store = PriceStore(str(tmp_path), adjusted=True)
+        assert store.missing("AAA", "2022-01-01", "2023-03-31") == []
+        stored = store.read("AAA", "2022-01-01", "2023-03-31")
+        np.testing.assert_allclose(stored.to_numpy(), history.loc[stored.index].to_numpy(), rtol=1e-12)
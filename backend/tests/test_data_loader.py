@@ -0,0 +1,366 @@
+"""
+Tests for core.data_loader and its columnar price cache
+
+Run with: pytest tests/ -v
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.catalog import TickerCatalog
+from core.coint import engle_granger
+from core.data_loader import align_pairs, load_price_csv
+from core.intraday import ingest_intraday_csv, load_intraday
+from core.panel import PricePanel
+from core.signal import zscore
+from core.trading_calendar import TradingCalendar, load_calendar
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from backtest import backtest
+
+
+@pytest.fixture
+def price_file(tmp_path):
+    """Small wide price CSV with a gap to exercise resampling and ffill"""
+    dates = pd.bdate_range("2023-01-02", periods=30).delete([5, 6])
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "date": dates.strftime("%Y-%m-%d"),
+        "AAA": 100 + rng.standard_normal(len(dates)).cumsum(),
+        "BBB": 50 + rng.standard_normal(len(dates)).cumsum(),
+    })
+    path = tmp_path / "prices.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+class TestPriceCache:
+    """Test the on-disk cache behind load_price_csv"""
+
+    def test_cached_load_matches_parse(self, price_file, tmp_path):
+        """Cold and warm cached loads return the same frame as a plain parse"""
+        cache_dir = str(tmp_path / "cache")
+        expected = load_price_csv(price_file, use_cache=False)
+
+        cold = load_price_csv(price_file, cache_dir=cache_dir)
+        warm = load_price_csv(price_file, cache_dir=cache_dir)
+
+        pd.testing.assert_frame_equal(cold, expected)
+        pd.testing.assert_frame_equal(warm, expected)
+        assert warm.index.freqstr == "B"
+        assert len(os.listdir(cache_dir)) == 1
+
+    def test_cached_frame_is_writable(self, price_file, tmp_path):
+        """In-place edits on a cached frame never reach the cache files"""
+        cache_dir = str(tmp_path / "cache")
+        load_price_csv(price_file, cache_dir=cache_dir)
+        df = load_price_csv(price_file, cache_dir=cache_dir)
+        df.iloc[:3, 0] = np.nan
+        assert not load_price_csv(price_file, cache_dir=cache_dir).iloc[:3, 0].isna().any()
+
+    def test_price_cols_selected_from_cache(self, price_file, tmp_path):
+        """price_cols is served from the cached panel"""
+        cache_dir = str(tmp_path / "cache")
+        load_price_csv(price_file, cache_dir=cache_dir)
+        df = load_price_csv(price_file, price_cols=["BBB"], cache_dir=cache_dir)
+        assert list(df.columns) == ["BBB"]
+
+    def test_cold_price_cols_cached_alone(self, price_file, tmp_path):
+        """A cold load with price_cols caches only those columns, until the full panel replaces them"""
+        cache_dir = str(tmp_path / "cache")
+        df = pd.read_csv(price_file)
+        df["CCC"] = df["AAA"] + 1
+        df.to_csv(price_file, index=False)
+        expected = load_price_csv(price_file, use_cache=False)
+
+        cold = load_price_csv(price_file, price_cols=["BBB", "AAA"], cache_dir=cache_dir)
+        (entry,) = os.listdir(cache_dir)
+        warm = load_price_csv(price_file, price_cols=["AAA", "BBB"], cache_dir=cache_dir)
+        assert os.listdir(cache_dir) == [entry]
+        pd.testing.assert_frame_equal(cold, expected[["BBB", "AAA"]])
+        pd.testing.assert_frame_equal(warm, expected[["AAA", "BBB"]])
+
+        load_price_csv(price_file, price_cols=["CCC"], cache_dir=cache_dir)
+        assert len(os.listdir(cache_dir)) == 2
+
+        full = load_price_csv(price_file, cache_dir=cache_dir)  # builds the full panel
+        pd.testing.assert_frame_equal(full, expected)
+        (full_entry,) = os.listdir(cache_dir)  # and evicts the subset entries
+        assert full_entry != entry
+        pd.testing.assert_frame_equal(load_price_csv(price_file, price_cols=["BBB"], cache_dir=cache_dir),
+                                      expected[["BBB"]])
+        assert os.listdir(cache_dir) == [full_entry]  # served from the full panel
+
+    def test_cache_invalidated_on_change(self, price_file, tmp_path):
+        """Rewriting the source file rebuilds the entry and evicts the old one"""
+        cache_dir = str(tmp_path / "cache")
+        load_price_csv(price_file, cache_dir=cache_dir)
+        old_entries = set(os.listdir(cache_dir))
+
+        df = pd.read_csv(price_file)
+        df["AAA"] = df["AAA"] * 2
+        df.to_csv(price_file, index=False)
+        st = os.stat(price_file)
+        os.utime(price_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+        reloaded = load_price_csv(price_file, cache_dir=cache_dir)
+        pd.testing.assert_frame_equal(reloaded, load_price_csv(price_file, use_cache=False))
+        new_entries = set(os.listdir(cache_dir))
+        assert len(new_entries) == 1
+        assert new_entries != old_entries
+
+
+class TestColumnPushdown:
+    """Test price_cols pushdown on uncached loads"""
+
+    def test_pushdown_matches_full_load(self, price_file):
+        """Reading only price_cols gives the same result as slicing a full load"""
+        full = load_price_csv(price_file, use_cache=False)
+        pushed = load_price_csv(price_file, price_cols=["BBB", "AAA"], use_cache=False)
+        pd.testing.assert_frame_equal(pushed, full[["BBB", "AAA"]])
+
+    def test_pushdown_missing_ticker(self, price_file):
+        """Unknown tickers raise KeyError before the body is parsed"""
+        with pytest.raises(KeyError):
+            load_price_csv(price_file, price_cols=["ZZZ"], use_cache=False)
+
+
+class TestPricePanel:
+    """Test zero-copy pair access through PricePanel"""
+
+    def test_pair_views_match_align_pairs(self, price_file):
+        """PairView has the rows of align_pairs and shares memory with the panel"""
+        df = load_price_csv(price_file, use_cache=False)
+        df.iloc[:4, 0] = np.nan  # AAA starts later
+        panel = PricePanel.from_frame(df)
+
+        view = align_pairs(panel, ["BBB", "AAA"])
+        expected = align_pairs(df, ["BBB", "AAA"])
+
+        assert view.contiguous
+        assert np.shares_memory(view.y, panel.values)
+        pd.testing.assert_frame_equal(view.to_frame(), expected, check_freq=False)
+
+    def test_gappy_column_mask(self, price_file):
+        """Interior gaps are reported through the joint-validity mask"""
+        df = load_price_csv(price_file, use_cache=False)
+        df.iloc[10, 1] = np.nan
+        view = PricePanel.from_frame(df).pair("AAA", "BBB")
+        assert not view.contiguous
+        assert view.mask.sum() == len(df) - 1
+
+    def test_engle_granger_accepts_views(self, price_file):
+        """engle_granger on array views matches the Series path"""
+        df = load_price_csv(price_file, use_cache=False)
+        view = PricePanel.from_frame(df).pair("BBB", "AAA")
+        from_views = engle_granger(view.y, view.x)
+        from_series = engle_granger(df["BBB"], df["AAA"])
+        assert from_views.hedge_ratio == pytest.approx(from_series.hedge_ratio)
+        assert from_views.adf_pvalue == pytest.approx(from_series.adf_pvalue)
+
+
+def indexed_stats(catalog):
+    """Stats once the background cache build started by a cold stats() call is done"""
+    catalog.stats()
+    indexer = catalog._indexer
+    if indexer is not None:
+        indexer.join()
+    return catalog.stats()
+
+
+class TestTickerCatalog:
+    """Test the header-only ticker catalog"""
+
+    def test_tickers_and_stats(self, price_file, tmp_path):
+        """Tickers come from the header; stats count raw (pre-ffill) rows"""
+        catalog = TickerCatalog(price_file, cache_dir=str(tmp_path / "cache"))
+        assert catalog.tickers() == ["AAA", "BBB"]
+        stats = indexed_stats(catalog)
+        assert stats["AAA"]["rows"] == 28
+        assert stats["AAA"]["first_date"] == "2023-01-02"
+
+    def test_cold_cache_not_parsed_inline(self, price_file, tmp_path):
+        """A cold stats() call returns None per ticker and builds the cache in the background"""
+        cache_dir = str(tmp_path / "cache")
+        catalog = TickerCatalog(price_file, cache_dir=cache_dir)
+        assert catalog.stats() == {"AAA": None, "BBB": None}
+        indexer = catalog._indexer
+        if indexer is not None:
+            indexer.join()
+        assert catalog.stats()["BBB"]["rows"] == 28
+        load_price_csv(price_file, cache_dir=cache_dir)
+        assert len(os.listdir(cache_dir)) == 1  # the backend's load reuses that entry
+
+    def test_failed_index_retried(self, price_file, tmp_path, monkeypatch, caplog):
+        """A failing background build is logged and the next stats() call retries it"""
+        import core.catalog
+        catalog = TickerCatalog(price_file, cache_dir=str(tmp_path / "cache"))
+
+        def broken(*args, **kwargs):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(core.catalog, "load_price_csv", broken)
+        assert catalog.stats() == {"AAA": None, "BBB": None}
+        indexer = catalog._indexer
+        if indexer is not None:
+            indexer.join()
+        assert "disk full" in caplog.text
+        assert catalog._indexer is None
+
+        monkeypatch.undo()
+        assert indexed_stats(catalog)["AAA"]["rows"] == 28
+
+    def test_non_numeric_column(self, price_file, tmp_path):
+        """Every listed ticker has a stats entry, None for non-numeric columns"""
+        df = pd.read_csv(price_file)
+        df["NAME"] = "x"
+        df.to_csv(price_file, index=False)
+        catalog = TickerCatalog(price_file, cache_dir=str(tmp_path / "cache"))
+        stats = indexed_stats(catalog)
+        assert catalog.tickers() == list(stats) == ["AAA", "BBB", "NAME"]
+        assert stats["NAME"] is None and stats["AAA"]["rows"] == 28
+
+    def test_refresh_on_change(self, price_file, tmp_path):
+        """A rewritten file is re-indexed; an unchanged one is not re-read"""
+        catalog = TickerCatalog(price_file, cache_dir=str(tmp_path / "cache"))
+        indexed_stats(catalog)
+        signature = catalog._signature
+        catalog.tickers()
+        assert catalog._signature == signature
+
+        df = pd.read_csv(price_file)
+        df["CCC"] = df["AAA"]
+        df.iloc[:10, -1] = np.nan
+        df.to_csv(price_file, index=False)
+        st = os.stat(price_file)
+        os.utime(price_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+        assert catalog.tickers() == ["AAA", "BBB", "CCC"]
+        assert indexed_stats(catalog)["CCC"]["rows"] == 18
+
+
+class TestIntraday:
+    """Test chunked intraday ingestion"""
+
+    @pytest.fixture
+    def tick_file(self, tmp_path):
+        """Irregular second-level prices over two sessions, with holes"""
+        rng = np.random.default_rng(3)
+        ts = pd.date_range("2024-03-04 09:30", "2024-03-04 16:00", freq="s").append(
+            pd.date_range("2024-03-05 09:30", "2024-03-05 16:00", freq="s"))
+        ts = ts[np.sort(rng.choice(len(ts), 20_000, replace=False))]
+        df = pd.DataFrame({
+            "timestamp": ts,
+            "AAA": 100 + rng.standard_normal(len(ts)).cumsum() * 0.01,
+            "BBB": 50 + rng.standard_normal(len(ts)).cumsum() * 0.01,
+        })
+        df.loc[rng.choice(len(df), 500, replace=False), "BBB"] = np.nan
+        path = tmp_path / "ticks.csv"
+        df.to_csv(path, index=False)
+        return str(path), df.set_index("timestamp")
+
+    @pytest.mark.parametrize("chunksize", [997, 50_000])
+    def test_matches_full_resample(self, tick_file, tmp_path, chunksize):
+        """Bars are identical to resampling the whole file at once, whatever the block size"""
+        path, df = tick_file
+        meta = ingest_intraday_csv(path, str(tmp_path / "bars"), bar_size="5min",
+                                   chunksize=chunksize, dtype=np.float64)
+        expected = df.resample("5min").last().dropna(how="all")
+        bars = load_intraday(str(tmp_path / "bars"))
+        assert meta["rows"] == len(expected)
+        pd.testing.assert_frame_equal(bars, expected, check_freq=False, check_names=False,
+                                      check_index_type=False)
+
+    def test_float32_and_column_subset(self, tick_file, tmp_path):
+        """Default storage is float32 and price_cols picks columns from the mapped file"""
+        path, _ = tick_file
+        ingest_intraday_csv(path, str(tmp_path / "bars"), chunksize=4096)
+        bars = load_intraday(str(tmp_path / "bars"), price_cols=["BBB"])
+        assert list(bars.columns) == ["BBB"]
+        assert bars["BBB"].dtype == np.float32
+        assert os.path.getsize(tmp_path / "bars" / "values.bin") == 2 * 4 * len(bars)
+
+    def test_unsorted_rejected(self, tick_file, tmp_path):
+        """Out-of-order rows raise instead of producing split bars"""
+        path, df = tick_file
+        df.iloc[::-1].reset_index().to_csv(path, index=False)
+        with pytest.raises(ValueError):
+            ingest_intraday_csv(path, str(tmp_path / "bars"), chunksize=1000)
+
+    def test_load_price_csv_without_calendar(self, tmp_path):
+        """freq=None keeps intraday rows instead of forcing a business-day index"""
+        ts = pd.date_range("2024-03-04 09:30", periods=5, freq="min")
+        path = tmp_path / "bars.csv"
+        pd.DataFrame({"date": ts, "AAA": np.arange(5.0)}).to_csv(path, index=False)
+        df = load_price_csv(str(path), freq=None, cache_dir=str(tmp_path / "cache"))
+        assert len(df) == 5 and df.index[1] == ts[1]
+
+
+class TestTradingCalendar:
+    """Test the shared calendar and forward-fill mask"""
+
+    def test_filled_mask(self, price_file, tmp_path):
+        """The two dropped business days are flagged as forward-filled for every ticker"""
+        cal = load_calendar(price_file, cache_dir=str(tmp_path / "cache"))
+        df = load_price_csv(price_file, cache_dir=str(tmp_path / "cache"))
+        assert cal.index.equals(df.index)
+        assert cal.tickers == ["AAA", "BBB"]
+        dropped = pd.bdate_range("2023-01-02", periods=30)[[5, 6]]
+        assert list(cal.index[cal.stale(["AAA"])]) == list(dropped)
+        assert cal.filled.sum() == 4
+
+    def test_built_once(self, price_file, tmp_path):
+        """Repeated loads return the same calendar until the file changes"""
+        cache_dir = str(tmp_path / "cache")
+        cal = load_calendar(price_file, cache_dir=cache_dir)
+        assert load_calendar(price_file, cache_dir=cache_dir) is cal
+
+        df = pd.read_csv(price_file)
+        df.iloc[:3].to_csv(price_file, index=False)
+        st = os.stat(price_file)
+        os.utime(price_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert len(load_calendar(price_file, cache_dir=cache_dir)) == 3
+
+    def test_align_matches_intersection(self, price_file, tmp_path):
+        """Position-based alignment equals chained index intersections"""
+        cal = load_calendar(price_file, cache_dir=str(tmp_path / "cache"))
+        df = load_price_csv(price_file, cache_dir=str(tmp_path / "cache"))
+        y = df["AAA"]
+        x = df["BBB"].iloc[3:]
+        z = df["AAA"].iloc[::2].rolling(2).mean()
+
+        ya, xa, za = cal.align(y, x, z)
+        idx = y.index.intersection(x.index).intersection(z.index)
+        pd.testing.assert_series_equal(ya, y.loc[idx], check_freq=False)
+        pd.testing.assert_series_equal(xa, x.loc[idx], check_freq=False)
+        pd.testing.assert_series_equal(za, z.loc[idx], check_freq=False)
+
+        fresh = cal.common(y, x, z, exclude_stale=["BBB"])
+        assert len(fresh) == len(idx) - cal.stale(["BBB"])[cal.positions(idx)].sum()
+
+    def test_backtest_exclude_stale(self, price_file, tmp_path):
+        """src/backtest skips stale days with the loader's calendar and rejects exclude_stale without one"""
+        cache_dir = str(tmp_path / "cache")
+        df = load_price_csv(price_file, cache_dir=cache_dir)
+        y, x = df["AAA"], df["BBB"]
+        z = zscore(y - x, window=5)
+        pred_dS = pd.Series(0.0, index=y.index)
+        cal = load_calendar(price_file, cache_dir=cache_dir)
+
+        full = backtest(y, x, 1.0, pred_dS, z, z_window=5)
+        fresh = backtest(y, x, 1.0, pred_dS, z, z_window=5, calendar=cal, exclude_stale=["BBB"])
+        assert len(full["returns"]) - len(fresh["returns"]) == 2
+        assert not fresh["returns"].index.isin(cal.index[cal.stale(["BBB"])]).any()
+        with pytest.raises(ValueError, match="forward-fill"):
+            backtest(y, x, 1.0, pred_dS, z, z_window=5, exclude_stale=["BBB"])
+
+    def test_unsorted_index_rejected(self):
+        """Calendars need a sorted, unique index"""
+        with pytest.raises(ValueError):
+            TradingCalendar(pd.DatetimeIndex(["2023-01-03", "2023-01-02"]))
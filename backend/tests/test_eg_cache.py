@@ -0,0 +1,122 @@
+"""
+Tests for the memoized Engle-Granger cache (core.coint.EngleGrangerCache)
+
+Run with: pytest tests/ -v
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import config
+from core.coint import EngleGrangerCache, cached_engle_granger, eg_cache_key, engle_granger
+from core.signal import compute_spread, zscore
+
+
+@pytest.fixture
+def pair():
+    dates = pd.bdate_range("2021-01-04", periods=400)
+    rng = np.random.default_rng(11)
+    x = pd.Series(50 + rng.standard_normal(len(dates)).cumsum(), index=dates, name="X")
+    y = pd.Series(2.0 + 1.3 * x.to_numpy() + rng.standard_normal(len(dates)), index=dates, name="Y")
+    return y, x
+
+
+class TestKeys:
+    """Keys depend on content, dates and test settings only"""
+
+    def test_equal_content_equal_key(self, pair):
+        y, x = pair
+        assert eg_cache_key(y, x) == eg_cache_key(y.copy(), x.copy())
+
+    def test_any_change_gives_new_key(self, pair):
+        y, x = pair
+        base = eg_cache_key(y, x)
+        bumped = y.copy()
+        bumped.iloc[100] += 1e-9
+        assert eg_cache_key(bumped, x) != base
+        assert eg_cache_key(y, x.shift(1, freq="B")) != base
+        assert eg_cache_key(y, x, maxlag=2) != base
+        assert eg_cache_key(y, x, regression="ct") != base
+
+
+class TestEngleGrangerCache:
+    """LRU behaviour, counters and derived series"""
+
+    def test_hit_returns_same_result(self, pair):
+        y, x = pair
+        cache = EngleGrangerCache(maxsize=4)
+        first = cache.engle_granger(y, x)
+        second = cache.engle_granger(y.copy(), x.copy())
+        assert second is first
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+        ref = engle_granger(y, x)
+        assert first.hedge_ratio == pytest.approx(ref.hedge_ratio)
+        assert first.adf_pvalue == pytest.approx(ref.adf_pvalue)
+
+    def test_lru_eviction(self, pair):
+        y, x = pair
+        cache = EngleGrangerCache(maxsize=2)
+        cache.engle_granger(y, x, maxlag=1)
+        cache.engle_granger(y, x, maxlag=2)
+        cache.engle_granger(y, x, maxlag=1)  # refresh maxlag=1
+        cache.engle_granger(y, x, maxlag=3)  # evicts maxlag=2
+        assert len(cache) == 2
+        cache.engle_granger(y, x, maxlag=1)
+        cache.engle_granger(y, x, maxlag=2)
+        stats = cache.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 4
+
+    def test_spread_and_zscore_are_memoized(self, pair):
+        y, x = pair
+        cache = EngleGrangerCache()
+        res = cache.engle_granger(y, x)
+        spread = cache.spread(res, y, x)
+        z = cache.zscore(res, y, x, window=30)
+
+        pd.testing.assert_series_equal(spread, compute_spread(y, x, res.hedge_ratio, res.intercept))
+        pd.testing.assert_series_equal(z, zscore(spread, window=30))
+        assert cache.spread(res, y, x) is spread
+        assert cache.zscore(res, y, x, window=30) is z
+        assert cache.zscore(res, y, x, window=60) is not z
+
+    def test_derived_values_follow_precision(self, pair):
+        y, x = pair
+        cache = EngleGrangerCache()
+        res = cache.engle_granger(y, x)
+        z64 = cache.zscore(res, y, x, window=30)
+        config.set_precision("float32")
+        try:
+            z32 = cache.zscore(res, y, x, window=30)
+        finally:
+            config.set_precision("float64")
+        assert z64.dtype == np.float64 and z32.dtype == np.float32
+
+    def test_disk_tier_survives_new_instance(self, pair, tmp_path):
+        y, x = pair
+        first = EngleGrangerCache(disk_dir=str(tmp_path)).engle_granger(y, x)
+
+        cache = EngleGrangerCache(disk_dir=str(tmp_path))
+        res = cache.engle_granger(y, x)
+        assert cache.stats()["disk_hits"] == 1 and cache.stats()["misses"] == 0
+        assert res.hedge_ratio == first.hedge_ratio
+        assert res.adf_pvalue == first.adf_pvalue
+        assert res.crit_values == first.crit_values
+        np.testing.assert_allclose(res.spread, first.spread)
+
+    def test_module_level_cache(self, pair):
+        y, x = pair
+        cache = EngleGrangerCache()
+        assert cached_engle_granger(y, x, cache=cache) is cached_engle_granger(y, x, cache=cache)
+        assert cache.stats()["hits"] == 1
+
+    def test_new_window_uses_cached_moments(self, pair):
+        y, x = pair
+        cache = EngleGrangerCache()
+        res = cache.engle_granger(y, x)
+        moments = cache.moments(res, y, x)
+        assert cache.moments(res, y, x) is moments
+        z = cache.zscore(res, y, x, window=45)
+        pd.testing.assert_series_equal(z, zscore(cache.spread(res, y, x), window=45))
@@ -0,0 +1,89 @@
+"""
+Tests for threshold-grid positions and metrics (core.grid)
+
+Run with: pytest tests/ -v
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.backtester import backtest_spread_strategy
+from core.grid import grid_backtest, grid_positions
+from core.metrics import summarize_performance
+from core.signal import mean_reversion_signals, zscore
+
+ENTRIES = [1.0, 1.5, 2.0, 2.5, 3.5]
+EXITS = [0.0, 0.25, 0.5, 1.0, 1.5, 2.0]  # 1.5 and 2.0 overlap the lower entries
+
+
+@pytest.fixture
+def spread_z():
+    rng = np.random.default_rng(8)
+    n = 1500
+    s = np.zeros(n)
+    for t in range(1, n):
+        s[t] = 0.95 * s[t - 1] + rng.standard_normal()
+    s[[300, 301, 900]] = np.nan
+    spread = pd.Series(s, index=pd.bdate_range("2015-01-01", periods=n))
+    return spread, zscore(spread, window=40)
+
+
+class TestGridPositions:
+    """Every slice matches mean_reversion_signals"""
+
+    def test_matches_single_runs(self, spread_z):
+        _, z = spread_z
+        P = grid_positions(z, ENTRIES, EXITS)
+        assert P.shape == (len(z), len(ENTRIES), len(EXITS)) and P.dtype == np.int8
+        for i, e in enumerate(ENTRIES):
+            for j, x in enumerate(EXITS):
+                np.testing.assert_array_equal(P[:, i, j], mean_reversion_signals(z, e, x).to_numpy())
+
+    def test_exit_wins_on_same_row(self):
+        z = np.array([0.0, 2.5, 1.0, 0.2, -3.0, 0.0])
+        P = grid_positions(z, [2.0], [0.5, 4.0])
+        np.testing.assert_array_equal(P[:, 0, 0], [0, -1, -1, 0, 1, 0])
+        np.testing.assert_array_equal(P[:, 0, 1], np.zeros(6))
+
+
+class TestGridBacktest:
+    """Every cell matches backtest_spread_strategy + summarize_performance"""
+
+    @pytest.mark.parametrize("notional,capital", [(1.0, None), (-2.0, None), (1.0, 50.0)])
+    def test_matches_pipeline(self, spread_z, notional, capital):
+        spread, z = spread_z
+        res = grid_backtest(spread, z, ENTRIES, EXITS, notional=notional, capital=capital)
+        for i, e in enumerate(ENTRIES):
+            for j, x in enumerate(EXITS):
+                bt = backtest_spread_strategy(spread, mean_reversion_signals(z, e, x), notional=notional)
+                returns = bt.returns if capital is None else bt.pnl / capital
+                perf = summarize_performance(returns, bt.turnover)
+                assert res.total_pnl[i, j] == pytest.approx(bt.pnl.sum(), abs=1e-9)
+                assert res.sharpe[i, j] == pytest.approx(perf.sharpe, rel=1e-9, abs=1e-12)
+                assert res.total_return[i, j] == pytest.approx(perf.total_return, rel=1e-9, abs=1e-12)
+                assert res.max_drawdown[i, j] == pytest.approx(perf.max_drawdown, rel=1e-9, abs=1e-12)
+                assert res.hit_rate[i, j] == pytest.approx(perf.hit_rate)
+                assert res.turnover[i, j] == perf.turnover
+
+    def test_chunking_does_not_change_results(self, spread_z, monkeypatch):
+        import core.grid
+        spread, z = spread_z
+        whole = grid_backtest(spread, z, ENTRIES, EXITS)
+        monkeypatch.setattr(core.grid, "_CHUNK_ELEMENTS", 1)
+        chunked = grid_backtest(spread, z, ENTRIES, EXITS)
+        for m in core.grid.METRICS:
+            np.testing.assert_allclose(getattr(chunked, m), getattr(whole, m), rtol=1e-12, atol=1e-14)
+
+    def test_frame_and_best(self, spread_z):
+        spread, z = spread_z
+        res = grid_backtest(spread, z, ENTRIES, EXITS)
+        frame = res.to_frame()
+        assert len(frame) == len(ENTRIES) * len(EXITS)
+        assert frame.loc[(2.0, 0.5), "sharpe"] == res.sharpe[2, 2]
+        assert res.best("sharpe")["sharpe"] == res.sharpe.max()
+
+    def test_length_mismatch(self, spread_z):
+        spread, z = spread_z
+        with pytest.raises(ValueError):
+            grid_backtest(spread.to_numpy(), z.to_numpy()[:-1], ENTRIES, EXITS)
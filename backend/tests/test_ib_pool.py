@@ -0,0 +1,151 @@
+"""
+Tests for the pooled IB connection manager (src/ib_pool.py)
+
+Run with: pytest tests/ -v
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from ib_pool import IBPool
+
+
+class FakeConn:
+    """Minimal IB session: records client ids and can refuse some of them"""
+
+    refused = set()
+    down = False
+
+    def __init__(self):
+        self.client_id = None
+        self.connected = False
+
+    def connect(self, host, port, clientId, **kwargs):
+        if self.down:
+            raise ConnectionRefusedError("gateway unreachable")
+        if clientId in self.refused:
+            raise ConnectionError(f"client id {clientId} already in use")
+        self.client_id, self.connected = clientId, True
+
+    def isConnected(self):
+        return self.connected
+
+    def disconnect(self):
+        self.connected = False
+
+
+@pytest.fixture(autouse=True)
+def reset_refused():
+    FakeConn.refused = set()
+    FakeConn.down = False
+
+
+class TestIBPool:
+    """Test connection reuse, id allocation and reconnects"""
+
+    def test_reuse_counts_hits(self):
+        """Sequential sessions reuse one connection"""
+        pool = IBPool(client_id=20, factory=FakeConn)
+        for _ in range(5):
+            with pool.session() as ib:
+                assert ib.client_id == 20
+        stats = pool.stats()
+        assert (stats["misses"], stats["hits"], stats["size"]) == (1, 4, 1)
+
+    def test_concurrent_sessions_get_unique_ids(self):
+        """Connections held at the same time use distinct client ids"""
+        pool = IBPool(client_id=20, max_size=3, factory=FakeConn)
+        conns = [pool.acquire() for _ in range(3)]
+        assert sorted(c.client_id for c in conns) == [20, 21, 22]
+        pool.wait = 0.05
+        with pytest.raises(TimeoutError):
+            pool.acquire()
+        for c in conns:
+            pool.release(c)
+
+    def test_waiter_gets_released_connection(self):
+        """A caller blocked on a full pool is served by the next release"""
+        pool = IBPool(max_size=1, factory=FakeConn, wait=5.0)
+        held = pool.acquire()
+        got = []
+        t = threading.Thread(target=lambda: got.append(pool.acquire()))
+        t.start()
+        pool.release(held)
+        t.join(2)
+        assert got == [held]
+        assert pool.stats()["waits"] >= 1
+
+    def test_dropped_connection_reconnects(self):
+        """An idle connection that dropped is reconnected on checkout"""
+        pool = IBPool(client_id=30, factory=FakeConn)
+        with pool.session() as ib:
+            pass
+        ib.disconnect()
+        with pool.session() as again:
+            assert again is ib and again.isConnected()
+        assert pool.stats()["reconnects"] == 1
+
+    def test_refused_client_id_skipped(self):
+        """A client id that is taken elsewhere is skipped"""
+        FakeConn.refused = {40}
+        pool = IBPool(client_id=40, max_size=2, factory=FakeConn)
+        with pool.session() as ib:
+            assert ib.client_id == 41
+
+    def test_connection_error_discards(self):
+        """A session that raised ConnectionError is not returned to the pool"""
+        pool = IBPool(factory=FakeConn)
+        with pytest.raises(ConnectionError):
+            with pool.session():
+                raise ConnectionError("socket closed")
+        assert pool.stats()["size"] == 0
+
+    def test_recovers_after_outage(self):
+        """Failed connects during a gateway outage keep their client ids"""
+        pool = IBPool(client_id=50, max_size=2, factory=FakeConn)
+        with pool.session() as ib:
+            pass
+        ib.disconnect()
+        FakeConn.down = True
+        for _ in range(3):
+            with pytest.raises(ConnectionRefusedError):
+                pool.acquire()
+        assert pool.stats()["size"] == 0
+        assert sorted(pool._free_ids) == [50, 51]
+
+        FakeConn.down = False
+        with pool.session() as a, pool.session() as b:
+            assert sorted([a.client_id, b.client_id]) == [50, 51]
+
+    def test_in_use_error_code_retires_id(self):
+        """Only ids rejected with error 326 are retired"""
+        class ErrorEventConn(FakeConn):
+            def __init__(self):
+                super().__init__()
+                self.handlers = []
+                self.errorEvent = self
+
+            def __iadd__(self, handler):
+                self.handlers.append(handler)
+                return self
+
+            def __isub__(self, handler):
+                self.handlers.remove(handler)
+                return self
+
+            def connect(self, host, port, clientId, **kwargs):
+                if clientId == 60:
+                    for handler in self.handlers:
+                        handler(-1, 326, "Unable to connect")
+                    raise ConnectionError("API connection failed")
+                super().connect(host, port, clientId, **kwargs)
+
+        pool = IBPool(client_id=60, max_size=2, factory=ErrorEventConn)
+        with pool.session() as ib:
+            assert ib.client_id == 61 and ib.handlers == []
+        assert 60 not in pool._free_ids and 60 not in pool._ids.values()
@@ -0,0 +1,80 @@
+"""
+Tests for the batched Johansen test (core.coint.johansen / rolling_johansen)
+
+Run with: pytest tests/ -v
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.vector_ar.vecm import coint_johansen
+
+from core.coint import johansen, rolling_johansen
+
+
+@pytest.fixture
+def prices():
+    """Five assets: four on one stochastic trend, one independent"""
+    rng = np.random.default_rng(11)
+    n = 360
+    f = rng.standard_normal(n).cumsum()
+    cols = [f * rng.uniform(0.5, 2) + rng.standard_normal(n) for _ in range(4)]
+    cols.append(rng.standard_normal(n).cumsum())
+    return pd.DataFrame(np.column_stack(cols), index=pd.bdate_range("2022-01-03", periods=n),
+                        columns=list("ABCDE"))
+
+
+def reference(values, det_order, k_ar_diff):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return coint_johansen(values, det_order, k_ar_diff)
+
+
+class TestJohansen:
+    """Test agreement with statsmodels coint_johansen"""
+
+    @pytest.mark.parametrize("det_order", [-1, 0, 1])
+    @pytest.mark.parametrize("k_ar_diff", [0, 1, 3])
+    def test_matches_statsmodels(self, prices, det_order, k_ar_diff):
+        """Eigenvalues, statistics, critical values and vectors (up to column sign)"""
+        values = prices[["A", "B", "E"]].to_numpy()
+        ref = reference(values, det_order, k_ar_diff)
+        res = johansen(values, det_order, k_ar_diff)
+        np.testing.assert_allclose(res.eig, ref.eig, atol=1e-12)
+        np.testing.assert_allclose(res.trace_stat, ref.lr1, atol=1e-9)
+        np.testing.assert_allclose(res.max_eig_stat, ref.lr2, atol=1e-9)
+        np.testing.assert_allclose(res.trace_crit, ref.cvt)
+        np.testing.assert_allclose(res.max_eig_crit, ref.cvm)
+        np.testing.assert_allclose(np.abs(res.evec), np.abs(ref.evec), atol=1e-10)
+        np.testing.assert_allclose(res.evec[:, 0], ref.evec[:, 0], atol=1e-10)
+
+    def test_rolling_baskets(self, prices):
+        """Every (basket, window) entry equals a direct call; NaN windows stay NaN"""
+        prices = prices.copy()
+        prices.iloc[200, 2] = np.nan
+        baskets = [("A", "B", "C"), ("B", "C", "E"), ("A", "D", "E")]
+        res = rolling_johansen(prices, 120, baskets, step=7, chunk_elements=5_000)
+        n_win = len(range(119, len(prices), 7))
+        assert res.eig.shape == (3, n_win, 3) and res.evec.shape == (3, n_win, 3, 3)
+        assert list(res.index) == list(prices.index[119::7])
+        for b, basket in enumerate(baskets):
+            for w, end in enumerate(res.index):
+                window = prices.loc[:end, list(basket)].iloc[-120:]
+                if window.isna().any().any():
+                    assert np.isnan(res.trace_stat[b, w]).all()
+                    continue
+                ref = reference(window.to_numpy(), 0, 1)
+                np.testing.assert_allclose(res.trace_stat[b, w], ref.lr1, atol=1e-9)
+
+    def test_rank_and_weights(self, prices):
+        """Common-trend basket has rank 2; weights are normalised to the first asset"""
+        res = johansen(prices[["A", "B", "C"]])
+        assert res.rank() == 2
+        w = res.weights(0)
+        assert w[0] == 1.0
+        spread = prices[["A", "B", "C"]].to_numpy() @ w
+        assert np.std(spread) < 0.5 * prices["A"].std()
+        with pytest.raises(ValueError):
+            rolling_johansen(prices, 50, [("A", "B"), ("A", "B", "C")])
@@ -0,0 +1,44 @@
+"""
+Tests for the vectorized MacKinnon p-value tables (core.mackinnon)
+
+Run with: pytest tests/ -v
+"""
+
+import numpy as np
+import pytest
+from statsmodels.tsa.adfvalues import mackinnoncrit, mackinnonp, tau_2010s
+
+from core.mackinnon import mackinnon_crit, mackinnon_pvalues
+
+
+class TestMacKinnon:
+    """Test agreement with statsmodels' scalar lookups"""
+
+    @pytest.mark.parametrize("regression", ["c", "n", "ct", "ctt"])
+    def test_pvalues_match(self, regression):
+        """Every N, across both polynomial branches and both cut-offs"""
+        rng = np.random.default_rng(0)
+        for N in range(1, 7):
+            t = rng.uniform(-30, 12, 500)
+            expected = [mackinnonp(s, regression=regression, N=N) for s in t]
+            np.testing.assert_allclose(mackinnon_pvalues(t, regression, N), expected, atol=1e-8)
+            assert list(mackinnon_pvalues(np.array([-np.inf, np.inf]), regression, N)) == [0.0, 1.0]
+
+    def test_scalar_and_nan(self):
+        """Scalars give floats; NaN passes through"""
+        assert isinstance(mackinnon_pvalues(-3.1, "c", 2), float)
+        assert mackinnon_pvalues(-3.1, "c", 2) == pytest.approx(mackinnonp(-3.1, "c", 2), abs=1e-8)
+        p = mackinnon_pvalues(np.array([[np.nan, -2.0]]), "c", 1)
+        assert p.shape == (1, 2) and np.isnan(p[0, 0])
+        with pytest.raises(ValueError):
+            mackinnon_pvalues(-2.0, "c", 7)
+
+    @pytest.mark.parametrize("regression", ["c", "n", "ct", "ctt"])
+    def test_crit_match(self, regression):
+        """Critical values for arrays of sample sizes, including asymptotic"""
+        nobs = np.array([25, 100, 251, 1000, np.inf])
+        for N in range(1, len(tau_2010s[regression]) + 1):
+            crit = mackinnon_crit(nobs, regression, N)
+            assert crit.shape == (5, 3)
+            for row, n in zip(crit, nobs):
+                np.testing.assert_allclose(row, mackinnoncrit(N, regression, n), atol=1e-12)
@@ -0,0 +1,90 @@
+"""
+Tests for rolling Ornstein-Uhlenbeck estimation (core.ou)
+
+Run with: pytest tests/ -v
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.ou import COLUMNS, ou_fit, rolling_ou
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from coint_utils import half_life, rolling_half_life
+
+
+def ar1(n, phi, mean, scale, seed):
+    rng = np.random.default_rng(seed)
+    s = np.empty(n)
+    s[0] = mean
+    for t in range(1, n):
+        s[t] = mean + phi * (s[t - 1] - mean) + scale * rng.standard_normal()
+    return s
+
+
+def ar1_fit(seg):
+    """Reference OU parameters from a plain AR(1) least-squares fit"""
+    seg = seg[~np.isnan(seg)]
+    phi, a = np.polyfit(seg[:-1], seg[1:], 1)
+    resid = seg[1:] - (a + phi * seg[:-1])
+    sigma_e = np.sqrt(resid @ resid / (len(resid) - 2))
+    kappa = -np.log(phi)
+    return phi, kappa, a / (1 - phi), sigma_e * np.sqrt(2 * kappa / (1 - phi ** 2)), np.log(2) / kappa
+
+
+class TestRollingOU:
+    """Window moments reproduce per-window AR(1) regressions"""
+
+    def test_matches_per_window_fit(self):
+        s = pd.Series(ar1(600, 0.9, 5.0, 0.4, seed=1), index=pd.bdate_range("2021-01-01", periods=600))
+        res = rolling_ou(s, window=80)
+        assert list(res.columns) == COLUMNS
+        assert res.iloc[:79].isna().all().all()
+        for t in [79, 250, 599]:
+            np.testing.assert_allclose(res.iloc[t].to_numpy(), ar1_fit(s.to_numpy()[t - 79:t + 1]), rtol=1e-9)
+
+    def test_batch_matches_single(self):
+        spreads = pd.DataFrame({f"s{k}": ar1(400, 0.8 + 0.05 * k, k, 1.0, seed=k) for k in range(3)})
+        batch = rolling_ou(spreads, window=60)
+        assert list(batch["half_life"].columns) == list(spreads.columns)
+        for name in spreads:
+            pd.testing.assert_frame_equal(
+                batch.xs(name, axis=1, level="spread"), rolling_ou(spreads[name], window=60),
+                check_names=False, rtol=1e-10)
+
+    def test_nan_and_non_reverting_windows(self):
+        s = ar1(300, 0.9, 0.0, 1.0, seed=3)
+        s[100] = np.nan
+        res = rolling_ou(s, window=50)
+        # Windows containing the gap are NaN unless min_periods allows it
+        assert res["phi"].iloc[100:150].isna().all()
+        loose = rolling_ou(s, window=50, min_periods=40)
+        u, v = s[61:110], s[62:111]  # transitions of the window ending at row 110
+        ok = ~(np.isnan(u) | np.isnan(v))
+        assert ok.sum() == 47
+        assert loose["phi"].iloc[110] == pytest.approx(np.polyfit(u[ok], v[ok], 1)[0])
+
+        explosive = ar1(100, 1.05, 0.0, 1.0, seed=0) + 1.0
+        last = rolling_ou(explosive, window=50).iloc[-1]
+        assert last["phi"] > 1 and np.isinf(last["half_life"]) and np.isnan(last["mu"])
+
+    def test_ou_fit_full_sample(self):
+        spreads = pd.DataFrame({"fast": ar1(2000, 0.7, 1.0, 1.0, seed=4), "slow": ar1(2000, 0.98, 1.0, 1.0, seed=5)})
+        fit = ou_fit(spreads)
+        assert fit.loc["fast", "half_life"] < fit.loc["slow", "half_life"]
+        np.testing.assert_allclose(fit.loc["fast"].to_numpy(), ar1_fit(spreads["fast"].to_numpy()), rtol=1e-9)
+        assert ou_fit(spreads["fast"])["half_life"] == pytest.approx(fit.loc["fast", "half_life"])
+        assert ou_fit(spreads.iloc[:10], min_obs=30).isna().all().all()
+
+    def test_src_half_lives_agree(self):
+        """The CLI's printed half-life and its rolling time stop use one definition"""
+        s = pd.Series(ar1(1500, 0.9, 2.0, 1.0, seed=6))
+        assert half_life(s) == pytest.approx(ou_fit(s)["half_life"], rel=1e-9)
+        assert rolling_half_life(s, window=len(s) - 1).iloc[-1] == pytest.approx(
+            half_life(s.iloc[:-1]), rel=1e-9)
+        assert np.isinf(half_life(pd.Series(np.arange(100.0) ** 1.5)))
@@ -0,0 +1,78 @@
+"""
+Tests for the configurable compute precision (core.config.set_precision)
+
+Run with: pytest tests/ -v
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import config
+from core.backtester import backtest_spread_strategy
+from core.data_loader import load_price_csv
+from core.metrics import summarize_performance
+from core.signal import compute_spread, mean_reversion_signals, zscore
+
+
+@pytest.fixture
+def float32_mode():
+    config.set_precision("float32")
+    yield
+    config.set_precision("float64")
+
+
+@pytest.fixture
+def price_file(tmp_path):
+    dates = pd.bdate_range("2022-01-03", periods=500)
+    rng = np.random.default_rng(7)
+    x = 100 + rng.standard_normal(len(dates)).cumsum()
+    y = 1.5 * x + rng.standard_normal(len(dates))
+    path = tmp_path / "prices.csv"
+    pd.DataFrame({"date": dates.strftime("%Y-%m-%d"), "AAA": y, "BBB": x}).to_csv(path, index=False)
+    return str(path)
+
+
+def run_pipeline(path, cache_dir, **load_kwargs):
+    df = load_price_csv(path, cache_dir=cache_dir, **load_kwargs)
+    spread = compute_spread(df["AAA"], df["BBB"], np.float64(1.5), 0.25)
+    z = zscore(spread, window=60)
+    signals = mean_reversion_signals(z, entry_z=1.5, exit_z=0.5)
+    result = backtest_spread_strategy(spread, signals)
+    return df, spread, z, signals, result, summarize_performance(result.returns, result.turnover)
+
+
+class TestPrecision:
+    """Test float32 mode end to end"""
+
+    def test_default_is_float64(self, price_file, tmp_path):
+        """Without configuration everything stays float64"""
+        df, spread, z, _, result, _ = run_pipeline(price_file, str(tmp_path / "cache"))
+        assert config.get_dtype() == np.float64
+        assert {df["AAA"].dtype, spread.dtype, z.dtype, result.pnl.dtype} == {np.dtype(np.float64)}
+
+    @pytest.mark.parametrize("use_cache", [True, False])
+    def test_float32_end_to_end(self, price_file, tmp_path, float32_mode, use_cache):
+        """Loader, spread, z-score, signals and backtest series all come out float32"""
+        df, spread, z, signals, result, _ = run_pipeline(
+            price_file, str(tmp_path / "cache"), use_cache=use_cache, price_cols=["AAA", "BBB"])
+        for s in (df["AAA"], spread, z, signals, result.pnl, result.returns, result.positions):
+            assert s.dtype == np.float32
+
+    def test_float32_matches_float64(self, price_file, tmp_path):
+        """float32 results track float64 within single-precision tolerance"""
+        *_, z64, sig64, _, perf64 = run_pipeline(price_file, str(tmp_path / "cache"))
+        config.set_precision("float32")
+        try:
+            *_, z32, sig32, _, perf32 = run_pipeline(price_file, str(tmp_path / "cache"))
+        finally:
+            config.set_precision("float64")
+        np.testing.assert_allclose(z32, z64, rtol=1e-4, atol=1e-4)
+        assert (sig32 != sig64).mean() < 0.01
+        assert isinstance(perf32.total_return, float)
+        assert perf32.sharpe == pytest.approx(perf64.sharpe, abs=0.1)
+
+    def test_invalid_precision(self):
+        """Only float64 and float32 are accepted"""
+        with pytest.raises(ValueError):
+            config.set_precision("float16")
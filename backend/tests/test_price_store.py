@@ -0,0 +1,163 @@
+"""
+Tests for the range-aware IB price store used by src/data_loader.load_pair
+
+A fake IB client replays synthetic bars, so no TWS/Gateway connection is needed.
+
+Run with: pytest tests/ -v
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from ib_insync import BarData
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+import data_loader
+from ib_pool import IBPool
+from price_store import AdjustmentMismatch, PriceStore
+
+
+class FakeIB:
+    """Serves daily bars for any ticker from one synthetic business-day history"""
+
+    def __init__(self):
+        dates = pd.bdate_range("2015-01-01", pd.Timestamp.today().normalize())
+        rng = np.random.default_rng(1)
+        self.history = pd.Series(100 + rng.standard_normal(len(dates)).cumsum(), index=dates)
+        self.requests = []
+        self.connected = False
+
+    def reqHistoricalData(self, contract, endDateTime, durationStr, **kwargs):
+        end = pd.Timestamp(endDateTime) if endDateTime else pd.Timestamp.today()
+        start = end - pd.DateOffset(years=int(durationStr.split()[0]))
+        self.requests.append((contract.symbol, start, end))
+        window = self.history.loc[start:end]
+        return [BarData(date=d.date(), close=float(v)) for d, v in window.items()]
+
+    def connect(self, host, port, clientId, **kwargs):
+        self.connected = True
+
+    def isConnected(self):
+        return self.connected
+
+    def disconnect(self):
+        self.connected = False
+
+
+@pytest.fixture
+def fake_ib(monkeypatch):
+    ib = FakeIB()
+    ib.pool = IBPool(factory=lambda: ib, max_size=1)
+    monkeypatch.setattr(data_loader, "get_pool", lambda host, port, client_id: ib.pool)
+    return ib
+
+
+def make_cfg(cache_dir, start, end, adjusted=False):
+    return dict(
+        ticker_y="AAA", ticker_x="BBB", start_date=start, end_date=end,
+        cache_dir=str(cache_dir), adjusted=adjusted, use_rth=True,
+        ib_host="127.0.0.1", ib_port=7497, ib_client_id=1,
+    )
+
+
+class TestPriceStore:
+    """Test coverage bookkeeping in PriceStore"""
+
+    def test_missing_gaps(self, tmp_path):
+        """Gaps are the parts of a request outside the covered ranges"""
+        store = PriceStore(str(tmp_path))
+        store.merge("AAA", pd.Series(dtype=float), "2020-01-01", "2020-01-31")
+        store.merge("AAA", pd.Series(dtype=float), "2020-03-01", "2020-03-31")
+
+        gaps = store.missing("AAA", "2019-12-15", "2020-04-10")
+        assert gaps == [
+            (pd.Timestamp("2019-12-15"), pd.Timestamp("2019-12-31")),
+            (pd.Timestamp("2020-02-01"), pd.Timestamp("2020-02-29")),
+            (pd.Timestamp("2020-04-01"), pd.Timestamp("2020-04-10")),
+        ]
+        assert store.missing("AAA", "2020-01-05", "2020-01-20") == []
+
+    def test_adjacent_ranges_merge(self, tmp_path):
+        """Back-to-back ranges collapse into one"""
+        store = PriceStore(str(tmp_path))
+        store.merge("AAA", pd.Series(dtype=float), "2020-01-01", "2020-01-31")
+        store.merge("AAA", pd.Series(dtype=float), "2020-02-01", "2020-02-15")
+        assert store.coverage("AAA") == [(pd.Timestamp("2020-01-01"), pd.Timestamp("2020-02-15"))]
+
+    def test_legacy_files_absorbed(self, tmp_path):
+        """Old {ticker}_{start}_{end}.csv files count as coverage"""
+        dates = pd.bdate_range("2021-01-04", "2021-01-29")
+        pd.DataFrame({"Adj Close": np.arange(len(dates), dtype=float)}, index=dates).to_csv(
+            tmp_path / "AAA_2021-01-01_2021-01-31.csv", index_label="Date"
+        )
+        store = PriceStore(str(tmp_path))
+        assert store.missing("AAA", "2021-01-01", "2021-01-31") == []
+        assert len(store.read("AAA", "2021-01-01", "2021-01-31")) == len(dates)
+
+    def test_adjusted_mismatch_detected(self, tmp_path):
+        """Adjusted bars on a different basis than the stored ones are rejected"""
+        dates = pd.bdate_range("2020-01-01", "2020-03-31")
+        prices = pd.Series(np.linspace(100, 120, len(dates)), index=dates)
+        store = PriceStore(str(tmp_path), adjusted=True)
+        store.merge("AAA", prices.loc[:"2020-02-14"], "2020-01-01", "2020-02-14")
+
+        anchored = store.anchored("AAA", "2020-02-15", "2020-03-31")
+        assert anchored == (pd.Timestamp("2020-02-14"), pd.Timestamp("2020-03-31"))
+        store.merge("AAA", prices.loc["2020-02-14":], "2020-02-15", "2020-03-31")
+        with pytest.raises(AdjustmentMismatch):
+            store.merge("AAA", 0.5 * prices.loc["2020-03-02":], "2020-04-01", "2020-04-30")
+        with pytest.raises(AdjustmentMismatch):  # no overlap to compare against
+            store.merge("AAA", pd.Series([1.0], index=[pd.Timestamp("2020-05-04")]), "2020-05-01", "2020-05-31")
+
+
+class TestLoadPair:
+    """Test that load_pair only fetches what the store lacks"""
+
+    def test_sub_range_served_locally(self, tmp_path, fake_ib):
+        """A sub-range of a previous request needs no connection"""
+        y, x = data_loader.load_pair(make_cfg(tmp_path, "2020-01-01", "2020-12-31"))
+        assert len(fake_ib.requests) == 2
+
+        y2, x2 = data_loader.load_pair(make_cfg(tmp_path, "2020-03-01", "2020-06-30"))
+        assert len(fake_ib.requests) == 2
+        assert fake_ib.pool.stats()["misses"] == 1
+        assert fake_ib.pool.stats()["hits"] == 0
+        pd.testing.assert_series_equal(y2, y.loc["2020-03-01":"2020-06-30"])
+
+    def test_extension_fetches_only_gap(self, tmp_path, fake_ib):
+        """Extending a range requests just the new days and keeps one file per ticker"""
+        data_loader.load_pair(make_cfg(tmp_path, "2020-01-01", "2020-12-31"))
+        fake_ib.requests.clear()
+
+        y, _ = data_loader.load_pair(make_cfg(tmp_path, "2020-01-01", "2021-01-08"))
+        assert fake_ib.pool.stats()["hits"] == 1  # connection reused, no new handshake
+        assert {r[0] for r in fake_ib.requests} == {"AAA", "BBB"}
+        assert all(end == pd.Timestamp("2021-01-08") for _, _, end in fake_ib.requests)
+        assert y.index[-1] == pd.Timestamp("2021-01-08")
+        pd.testing.assert_series_equal(y, fake_ib.history.loc["2020-01-01":"2021-01-08"],
+                                       check_names=False, check_freq=False, check_index_type=False)
+        assert sorted(os.listdir(tmp_path)) == [
+            "AAA.RAW.RTH.csv", "AAA.RAW.RTH.json", "BBB.RAW.RTH.csv", "BBB.RAW.RTH.json",
+        ]
+
+    def test_adjustment_change_refetches_full_range(self, tmp_path, fake_ib):
+        """A split between two adjusted fetches rebuilds the stored history"""
+        data_loader.load_pair(make_cfg(tmp_path, "2020-01-01", "2020-12-31", adjusted=True))
+        fake_ib.requests.clear()
+        data_loader.load_pair(make_cfg(tmp_path, "2020-01-01", "2021-01-08", adjusted=True))
+        assert len(fake_ib.requests) == 2  # bases agree: only the gap per ticker
+
+        # 2:1 split adjustment: every bar before it is halved in ADJUSTED_LAST
+        split = pd.Timestamp("2021-06-01")
+        fake_ib.history.loc[:split] *= 0.5
+        fake_ib.requests.clear()
+        y, x = data_loader.load_pair(make_cfg(tmp_path, "2020-01-01", "2021-03-31", adjusted=True))
+        assert len(fake_ib.requests) == 4  # gap, then the full range, per ticker
+        expected = fake_ib.history.loc["2020-01-01":"2021-03-31"]
+        pd.testing.assert_series_equal(y, expected, check_names=False, check_freq=False, check_index_type=False)
+        pd.testing.assert_series_equal(x, expected, check_names=False, check_freq=False, check_index_type=False)
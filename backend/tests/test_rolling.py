@@ -0,0 +1,80 @@
+"""
+Tests for the single-pass rolling OLS engine (core.rolling) and its users,
+core.coint.rolling_hedge_ratio and src/beta_estimators.rolling_beta.
+
+Run with: pytest tests/ -v
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+
+from core.coint import rolling_hedge_ratio
+from core.rolling import rolling_ols
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from beta_estimators import rolling_beta
+
+
+@pytest.fixture
+def pair():
+    """A pair whose price level drifts far from its starting point"""
+    rng = np.random.default_rng(8)
+    n = 1500
+    x = 1e4 + np.cumsum(rng.standard_normal(n)) * 40 + np.arange(n) * 3.0
+    y = 5 + 1.3 * x + rng.standard_normal(n) * 8
+    idx = pd.bdate_range("2018-01-01", periods=n)
+    return pd.Series(y, index=idx, name="Y"), pd.Series(x, index=idx, name="X")
+
+
+def direct(y, x):
+    """Two-pass OLS on centred data for one window"""
+    fit = sm.OLS(y, sm.add_constant(x - x.mean())).fit()
+    b = fit.params[1]
+    return fit.params[0] - b * x.mean(), b, np.sqrt(fit.mse_resid), fit.rsquared, fit.tvalues[1]
+
+
+class TestRollingOLS:
+    """Test the window statistics against a direct fit"""
+
+    @pytest.mark.parametrize("window", [3, 60, 250])
+    def test_matches_direct_fit(self, pair, window):
+        """All five statistics, on windows aligned and misaligned with the blocks"""
+        y, x = pair
+        res = rolling_ols(y, x, window)
+        assert list(res.columns) == ["intercept", "beta", "resid_std", "r2", "tstat"]
+        assert res.iloc[:window - 1].isna().all().all()
+        for end in [window - 1, window, 2 * window - 1, 2 * window + 7, len(y) - 1]:
+            sl = slice(end - window + 1, end + 1)
+            expected = direct(y.to_numpy()[sl], x.to_numpy()[sl])
+            np.testing.assert_allclose(res.iloc[end].to_numpy(), expected, rtol=1e-7)
+
+    def test_nan_and_constant_windows(self, pair):
+        """NaN or constant-x windows are NaN, matching pandas rolling cov/var"""
+        y, x = pair
+        y, x = y.copy(), x.copy()
+        y.iloc[100] = np.nan
+        x.iloc[400:440] = 123.0
+        res = rolling_ols(y, x, 30)
+        expected = y.rolling(30).cov(x) / x.rolling(30).var().replace(0, np.nan)
+        np.testing.assert_allclose(res["beta"], expected, rtol=1e-8, equal_nan=True)
+        assert res["beta"].iloc[100:130].isna().all()
+        assert np.isnan(res["beta"].iloc[438])
+
+    def test_hedge_ratio_and_rolling_beta(self, pair):
+        """Both callers return the engine's beta in their existing shape"""
+        y, x = pair
+        beta = rolling_ols(y, x, 60)["beta"]
+        hr = rolling_hedge_ratio(y, x, 60)
+        pd.testing.assert_series_equal(hr, beta.rename("X"))
+        arr = rolling_hedge_ratio(y.to_numpy(), x.to_numpy(), 60)
+        np.testing.assert_allclose(arr, beta.to_numpy(), equal_nan=True)
+        rb = rolling_beta(y, x, 120)
+        assert rb.name == "beta_roll"
+        legacy = y.rolling(120).cov(x) / x.rolling(120).var()
+        np.testing.assert_allclose(rb, legacy, rtol=1e-8, equal_nan=True)
@@ -0,0 +1,93 @@
+"""
+Tests for the one-pass rolling Engle-Granger test (core.rolling_coint)
+and src/coint_utils.rolling_coint_pvalues, which is built on it.
+
+Run with: pytest tests/ -v
+"""
+
+import sys
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.stattools import coint
+
+from core.rolling_coint import rolling_engle_granger
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from coint_utils import _rolling_coint_pvalues_loop, rolling_coint_pvalues
+
+
+@pytest.fixture
+def pair():
+    """A pair that drifts in and out of cointegration"""
+    rng = np.random.default_rng(3)
+    n = 420
+    f = rng.standard_normal(n).cumsum()
+    idx = pd.bdate_range("2022-01-03", periods=n)
+    x = pd.Series(50 + f + rng.standard_normal(n) * 0.3, index=idx)
+    y = pd.Series(20 + 1.5 * f + 2 * np.sin(np.arange(n) / 15) + rng.standard_normal(n)
+                  + np.where(np.arange(n) > 250, rng.standard_normal(n).cumsum() * 0.3, 0), index=idx)
+    return y, x
+
+
+def reference(y, x, **kwargs):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return coint(y, x, **kwargs)
+
+
+class TestRollingEngleGranger:
+    """Test window-by-window agreement with statsmodels coint"""
+
+    @pytest.mark.parametrize("window,maxlag,autolag", [(252, None, "aic"), (80, 4, "aic"), (80, 2, None)])
+    def test_matches_coint(self, pair, window, maxlag, autolag):
+        """ADF statistic and p-value match coint for every window"""
+        y, x = pair
+        res = rolling_engle_granger(y, x, window, maxlag=maxlag, autolag=autolag)
+        assert res.iloc[:window - 1].isna().all().all()
+        for end in range(window - 1, len(y), 11):
+            stat, p, _ = reference(y.iloc[end - window + 1:end + 1], x.iloc[end - window + 1:end + 1],
+                                   maxlag=maxlag, autolag=autolag)
+            assert res["adf_stat"].iloc[end] == pytest.approx(stat, abs=1e-8)
+            assert res["pvalue"].iloc[end] == pytest.approx(p, abs=1e-8)
+
+    def test_hedge_ratio_and_nan_windows(self, pair):
+        """OLS coefficients match a direct fit; windows touching a NaN are NaN"""
+        y, x = pair
+        y = y.copy()
+        y.iloc[300] = np.nan
+        res = rolling_engle_granger(y, x, 60)
+        b, a = np.polyfit(x.iloc[100:160], y.iloc[100:160], 1)
+        assert res["hedge_ratio"].iloc[159] == pytest.approx(b)
+        assert res["intercept"].iloc[159] == pytest.approx(a)
+        assert res["pvalue"].iloc[300:360].isna().all()
+        assert res["pvalue"].iloc[[299, 360]].notna().all()
+
+    def test_arrays_and_bad_args(self, pair):
+        """NumPy inputs give a RangeIndex frame; invalid options raise"""
+        y, x = pair
+        res = rolling_engle_granger(y.to_numpy(), x.to_numpy(), 100)
+        assert isinstance(res.index, pd.RangeIndex)
+        assert res["adf_stat"].iloc[-1] == pytest.approx(reference(y.iloc[-100:], x.iloc[-100:])[0], abs=1e-8)
+        with pytest.raises(ValueError):
+            rolling_engle_granger(y, x, 100, maxlag=60)
+        with pytest.raises(ValueError):
+            rolling_engle_granger(y, x, 100, autolag="bic")
+
+
+class TestRollingCointPvalues:
+    """Test the src wrapper against the per-window coint loop it replaces"""
+
+    def test_matches_loop(self, pair):
+        """Same p-values, same index, window ending the day before each row"""
+        y, x = pair
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            expected = _rolling_coint_pvalues_loop(y, x, 120)
+        result = rolling_coint_pvalues(y, x, 120)
+        pd.testing.assert_index_equal(result.index, expected.index)
+        np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), atol=1e-8, equal_nan=True)
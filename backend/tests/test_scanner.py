@@ -0,0 +1,102 @@
+"""
+Tests for the vectorized all-pairs Engle-Granger scanner (core.scanner)
+
+Run with: pytest tests/ -v
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.stattools import adfuller
+
+from core.coint import engle_granger
+from core.panel import PricePanel
+from core.scanner import adf_batch, scan_pairs
+
+
+@pytest.fixture
+def universe():
+    """Ten tickers on one common factor, with a late listing, a delisting and an interior gap"""
+    rng = np.random.default_rng(0)
+    n = 400
+    factor = rng.standard_normal(n).cumsum()
+    prices = np.column_stack([
+        100 + factor * rng.uniform(0.5, 2) + rng.standard_normal(n) * rng.uniform(0.5, 5)
+        for _ in range(10)
+    ])
+    prices[:40, 3] = np.nan
+    prices[-25:, 6] = np.nan
+    prices[200:205, 8] = np.nan
+    return pd.DataFrame(prices, index=pd.bdate_range("2021-01-01", periods=n),
+                        columns=[f"T{i}" for i in range(10)])
+
+
+def reference(df, y, x, **kwargs):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        return engle_granger(df[y], df[x], **kwargs)
+
+
+class TestScanPairs:
+    """Test that the scan reproduces engle_granger pair by pair"""
+
+    @pytest.mark.parametrize("regression,maxlag", [("c", 1), ("c", 3), ("n", 2), ("ct", 1)])
+    def test_matches_engle_granger(self, universe, regression, maxlag):
+        """Hedge ratio, intercept, ADF stat and p-value agree for every pair and direction"""
+        results = scan_pairs(universe, top_k=None, maxlag=maxlag, regression=regression, both_directions=True)
+        assert len(results) == 90
+        for r in results:
+            eg = reference(universe, r.y, r.x, maxlag=maxlag, regression=regression)
+            assert r.hedge_ratio == pytest.approx(eg.hedge_ratio, rel=1e-9)
+            assert r.intercept == pytest.approx(eg.intercept, rel=1e-9, abs=1e-9)
+            assert r.adf_stat == pytest.approx(eg.adf_stat, abs=1e-8)
+            assert r.adf_pvalue == pytest.approx(eg.adf_pvalue, abs=1e-8)
+            assert r.crit_values == pytest.approx(eg.crit_values)
+
+    def test_small_tiles(self, universe, monkeypatch):
+        """Tiling the universe into small ticker blocks gives the same scan"""
+        import core.scanner
+        whole = scan_pairs(universe, top_k=None, maxlag=2, both_directions=True)
+        monkeypatch.setattr(core.scanner, "_TICKER_BLOCK", 3)
+        tiled = scan_pairs(universe, top_k=None, maxlag=2, both_directions=True)
+        assert [(r.y, r.x) for r in tiled] == [(r.y, r.x) for r in whole]
+        np.testing.assert_allclose([r.adf_stat for r in tiled], [r.adf_stat for r in whole], rtol=1e-10)
+
+    def test_large_maxlag_uses_adf_batch(self, universe, monkeypatch):
+        """Lags above the moment cap go through adf_batch with the same result"""
+        import core.scanner
+        monkeypatch.setattr(core.scanner, "_MOMENT_MAXLAG", 1)
+        results = scan_pairs(universe, top_k=None, maxlag=3)
+        assert len(results) == 45
+        for r in results[:10]:
+            eg = reference(universe, r.y, r.x, maxlag=3)
+            assert r.adf_stat == pytest.approx(eg.adf_stat, abs=1e-8)
+        with pytest.raises(ValueError):
+            scan_pairs(universe, maxlag=None)
+
+    def test_top_k_ranking(self, universe):
+        """top_k keeps the most negative statistics, in order, across ticker blocks"""
+        full = scan_pairs(universe, top_k=None)
+        top = scan_pairs(PricePanel.from_frame(universe), top_k=5)
+        assert [(r.y, r.x) for r in top] == [(r.y, r.x) for r in full[:5]]
+        assert all(a.adf_stat <= b.adf_stat for a, b in zip(full, full[1:]))
+
+    def test_min_obs(self, universe):
+        """Pairs with too few joint observations are skipped"""
+        results = scan_pairs(universe, top_k=None, min_obs=380)
+        assert all("T3" not in (r.y, r.x) and "T6" not in (r.y, r.x) for r in results)
+        assert len(results) == 28
+
+    def test_adf_batch_ragged_columns(self, universe):
+        """Columns with different sample ranges are tested independently"""
+        a = universe["T0"].to_numpy() - universe["T1"].to_numpy()
+        b = a.copy()
+        b[:100] = np.nan
+        stat, lag, nobs = adf_batch(np.column_stack([a, b]))
+        assert nobs[0] - nobs[1] == 100
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", FutureWarning)
+            expected = [adfuller(a, maxlag=1)[0], adfuller(b[100:], maxlag=1)[0]]
+        np.testing.assert_allclose(stat, expected, atol=1e-8)
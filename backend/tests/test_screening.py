@@ -0,0 +1,97 @@
+"""
+Tests for multi-stage pair screening (core.screening)
+
+Run with: pytest tests/ -v
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.coint import engle_granger
+from core.screening import _masked_corr, _masked_ssd, screen_pairs
+
+
+@pytest.fixture
+def universe():
+    """Two factor groups of five tickers each, with a late listing and an interior gap"""
+    rng = np.random.default_rng(1)
+    n = 500
+    factors = rng.standard_normal((n, 2)).cumsum(axis=0)
+    cols = []
+    for k in range(10):
+        f = factors[:, k // 5]
+        cols.append(100 + 3 * f + rng.standard_normal(n) * 0.5)
+    prices = np.column_stack(cols)
+    prices[:50, 2] = np.nan
+    prices[300:310, 7] = np.nan
+    return pd.DataFrame(prices, index=pd.bdate_range("2020-01-01", periods=n),
+                        columns=[f"T{i}" for i in range(10)])
+
+
+class TestScreenPairs:
+    """Test the stage filters and the per-stage report"""
+
+    def test_masked_stats_match_pairwise(self, universe):
+        """Correlation and SSD use only the rows both tickers share"""
+        rets = universe.pct_change(fill_method=None)
+        corr = _masked_corr(rets.to_numpy()[1:])
+        np.testing.assert_allclose(corr, rets.corr().to_numpy(), atol=1e-10)
+
+        ssd = _masked_ssd(universe.to_numpy())
+        norm = universe / universe.apply(lambda s: s.dropna().iloc[0])
+        for a, b in [(0, 2), (2, 7), (3, 8)]:
+            d = (norm.iloc[:, a] - norm.iloc[:, b]).dropna()
+            assert ssd[a, b] == pytest.approx((d ** 2).mean(), rel=1e-10)
+
+    def test_stage_counts(self, universe):
+        """Each stage reports the pairs it saw and removed, chained in order"""
+        res = screen_pairs(universe, min_corr=0.3, ssd_quantile=0.5, n_clusters=2, max_pvalue=1.0)
+        summary = res.summary()
+        assert list(summary.index) == ["min_obs", "corr", "ssd", "cluster", "coint"]
+        assert summary["pairs_in"].iloc[0] == 45
+        assert (summary["pairs_in"].iloc[1:].to_numpy() == summary["pairs_out"].iloc[:-1].to_numpy()).all()
+        assert summary["pairs_out"].iloc[-1] == len(res.pairs)
+        assert (summary["seconds"] >= 0).all()
+        # Cross-group pairs are uncorrelated and never reach the final test
+        assert summary.loc["corr", "removed"] >= 25
+        assert set(res.pairs["cluster"].value_counts().index) <= {0, 1}
+
+    def test_survivors_match_engle_granger(self, universe):
+        """Final p-values are engle_granger's, sorted ascending and cut at max_pvalue"""
+        res = screen_pairs(universe, max_pvalue=0.05)
+        assert len(res.pairs) > 0
+        assert res.pairs["pvalue"].is_monotonic_increasing
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", FutureWarning)
+            for row in res.pairs.itertuples():
+                eg = engle_granger(universe[row.y], universe[row.x])
+                assert row.pvalue == pytest.approx(eg.adf_pvalue)
+                assert row.hedge_ratio == pytest.approx(eg.hedge_ratio)
+                assert row.pvalue <= 0.05
+
+    def test_custom_test_and_untested(self, universe):
+        """A custom (hedge, pvalue) test is used as given; test=False skips it"""
+        calls = []
+
+        def fake(y, x):
+            calls.append((y.name, x.name))
+            return 1.0, 0.01
+
+        res = screen_pairs(universe, min_corr=0.5, test=fake)
+        assert len(calls) == len(res.pairs) == res.stages[-2].pairs_out
+        untested = screen_pairs(universe, min_corr=0.5, test=False)
+        assert [s.name for s in untested.stages] == ["min_obs", "corr"]
+        assert "pvalue" not in untested.pairs
+
+    def test_half_life_stage(self, universe):
+        """The half-life stage keeps pairs whose hedged spread reverts within the bounds"""
+        res = screen_pairs(universe, max_pvalue=1.0, max_half_life=5.0)
+        assert list(res.summary().index)[-1] == "half_life"
+        assert (res.pairs["half_life"] <= 5.0).all()
+        loose = screen_pairs(universe, max_pvalue=1.0, min_half_life=0.0)
+        assert len(loose.pairs) >= len(res.pairs)
+        with pytest.raises(ValueError):
+            screen_pairs(universe, test=False, max_half_life=5.0)
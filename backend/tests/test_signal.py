@@ -0,0 +1,187 @@
+"""
+Tests for the spread / z-score / signal kernels (core.signal)
+
+Run with: pytest tests/ -v
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import config
+from core.signal import (EwmaZScore, RobustZScore, SpreadMoments, compute_spread, ewma_zscore, mean_reversion_signals,
+                         robust_zscore, signal_kernel, zscore, zscore_center_scale, zscore_multi)
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from coint_utils import z_center_scale
+
+
+def reference_chain(y, x, hedge_ratio, intercept, window, entry_z, exit_z):
+    """The pandas implementation the kernels replaced"""
+    spread = y - (intercept + hedge_ratio * x)
+    roll = spread.rolling(window=window)
+    z = ((spread - roll.mean()) / roll.std()).replace([np.inf, -np.inf], np.nan)
+    signals = pd.Series(np.nan, index=z.index)
+    signals[z > entry_z] = -1
+    signals[z < -entry_z] = 1
+    signals[z.abs() < exit_z] = 0
+    return spread, z, signals.ffill().fillna(0)
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(3)
+    n = 3000
+    x = 100 + rng.standard_normal(n).cumsum()
+    y = 4.0 + 1.2 * x + rng.standard_normal(n).cumsum() * 0.05 + rng.standard_normal(n)
+    idx = pd.bdate_range("2012-01-02", periods=n)
+    y[[500, 501, 1700]] = np.nan
+    y[2000:2030] = y[2000]  # flat stretch where the spread is constant...
+    x[2000:2030] = x[2000]
+    return pd.Series(y, index=idx, name="Y"), pd.Series(x, index=idx, name="X")
+
+
+class TestSignalKernels:
+    """The wrappers and the fused kernel reproduce the pandas chain"""
+
+    def test_wrappers_match_reference(self, prices):
+        y, x = prices
+        ref_spread, ref_z, ref_sig = reference_chain(y, x, 1.2, 4.0, 20, 1.5, 0.5)
+        spread = compute_spread(y, x, 1.2, 4.0)
+        z = zscore(spread, window=20)
+        sig = mean_reversion_signals(z, entry_z=1.5, exit_z=0.5)
+
+        pd.testing.assert_series_equal(spread, ref_spread)
+        pd.testing.assert_index_equal(z.index, ref_z.index)
+        np.testing.assert_array_equal(np.isnan(z), np.isnan(ref_z))
+        np.testing.assert_allclose(z, ref_z, rtol=1e-9, atol=1e-9)
+        assert np.isnan(z.iloc[2025])  # constant window
+        pd.testing.assert_series_equal(sig, ref_sig)
+
+    def test_kernel_matches_wrappers_and_reuses_buffers(self, prices):
+        y, x = prices
+        spread = compute_spread(y, x, 1.2, 4.0)
+        z = zscore(spread, window=30)
+        out = tuple(np.empty(len(y)) for _ in range(3))
+        for entry, exit_ in [(2.0, 0.5), (1.0, 0.0)]:
+            res = signal_kernel(y.to_numpy(), x.to_numpy(), 1.2, 4.0, window=30, entry_z=entry, exit_z=exit_, out=out)
+            assert all(a is b for a, b in zip(res, out))
+            np.testing.assert_array_equal(res[0], spread.to_numpy())
+            np.testing.assert_array_equal(res[1], z.to_numpy())
+            np.testing.assert_array_equal(res[2], mean_reversion_signals(z, entry, exit_).to_numpy())
+
+    def test_hysteresis_holds_until_exit(self):
+        z = np.array([np.nan, 0.0, 2.5, 1.0, np.nan, 0.2, -3.0, -1.0, 3.0])
+        np.testing.assert_array_equal(mean_reversion_signals(z, 2.0, 0.5), [0, 0, -1, -1, -1, 0, 1, 1, -1])
+
+    def test_float32_and_bad_buffers(self, prices):
+        y, x = prices
+        config.set_precision("float32")
+        try:
+            spread, z, pos = signal_kernel(y.to_numpy(), x.to_numpy(), 1.2, 4.0, window=20)
+            assert spread.dtype == z.dtype == pos.dtype == np.float32
+            np.testing.assert_array_equal(spread, compute_spread(y, x, 1.2, 4.0).to_numpy())
+            with pytest.raises(ValueError):
+                signal_kernel(y.to_numpy(), x.to_numpy(), 1.2, out=tuple(np.empty(len(y)) for _ in range(3)))
+        finally:
+            config.set_precision("float64")
+
+
+class TestMultiWindow:
+    """zscore_multi and SpreadMoments reuse one set of prefix sums"""
+
+    def test_zscore_multi_matches_single_windows(self, prices):
+        y, x = prices
+        spread = compute_spread(y, x, 1.2, 4.0)
+        windows = [20, 60, 252]
+        frame = zscore_multi(spread, windows)
+        assert list(frame.columns) == windows
+        pd.testing.assert_index_equal(frame.index, spread.index)
+        for w in windows:
+            ref = spread.rolling(w)
+            ref_z = ((spread - ref.mean()) / ref.std()).replace([np.inf, -np.inf], np.nan)
+            np.testing.assert_array_equal(frame[w].to_numpy(), zscore(spread, w).to_numpy())
+            np.testing.assert_array_equal(np.isnan(frame[w]), np.isnan(ref_z))
+            np.testing.assert_allclose(frame[w], ref_z, rtol=1e-9, atol=1e-9)
+
+    def test_moments_reused_across_windows(self, prices):
+        y, x = prices
+        spread = compute_spread(y, x, 1.2, 4.0) + 1e6  # far from zero
+        moments = SpreadMoments(spread)
+        for w in (20, 137):
+            pd.testing.assert_series_equal(moments.zscore(w), zscore(spread, w))
+        assert np.isnan(moments.zscore(len(spread) + 1)).all()
+
+    def test_float32(self, prices):
+        y, x = prices
+        spread = compute_spread(y, x, 1.2, 4.0)
+        config.set_precision("float32")
+        try:
+            frame = zscore_multi(spread.to_numpy(), [30, 90])
+        finally:
+            config.set_precision("float64")
+        assert (frame.dtypes == np.float32).all()
+        np.testing.assert_allclose(frame[90], zscore(spread, 90).to_numpy(), rtol=1e-5, atol=1e-5)
+
+
+class TestZMethods:
+    """EWMA and median/MAD z-scores: batch and incremental forms agree"""
+
+    @pytest.fixture
+    def spread(self, prices):
+        y, x = prices
+        return compute_spread(y, x, 1.2, 4.0)
+
+    @pytest.mark.parametrize("window", [20, 21, 60])
+    def test_incremental_matches_batch(self, spread, window):
+        for batch, scorer in [(ewma_zscore(spread, span=window), EwmaZScore(window)),
+                              (robust_zscore(spread, window=window), RobustZScore(window))]:
+            online = np.array([scorer.update(v) for v in spread.to_numpy()])
+            np.testing.assert_array_equal(np.isnan(online), np.isnan(batch))
+            np.testing.assert_allclose(online, batch, rtol=1e-12, atol=1e-12)
+
+    def test_ewma_matches_pandas(self, spread):
+        center, scale = zscore_center_scale(spread, 30, "ewma")
+        ok = spread.notna()
+        ref = spread[ok].ewm(span=30, adjust=False).mean()
+        np.testing.assert_allclose(center[ok].iloc[29:], ref.iloc[29:], rtol=1e-12)
+        assert center[ok].iloc[:29].isna().all() and center[~ok].isna().all()
+
+    def test_mad_matches_pandas_median(self, spread):
+        center, scale = zscore_center_scale(spread, 21, "mad")
+        pd.testing.assert_series_equal(center, spread.rolling(21).median(), check_names=False)
+        z = robust_zscore(spread, 21)
+        np.testing.assert_allclose(((spread - center) / scale).replace([np.inf, -np.inf], np.nan), z, rtol=1e-12)
+        assert np.isnan(z.iloc[2025])  # constant window: MAD == 0
+
+    def test_outlier_does_not_move_mad_scale(self):
+        rng = np.random.default_rng(2)
+        s = pd.Series(rng.standard_normal(200))
+        bumped = s.copy()
+        bumped.iloc[150] = 50.0
+        for method in ("mad", "rolling"):
+            z_after = zscore(bumped, 40, method=method).iloc[151:189]
+            z_clean = zscore(s, 40, method=method).iloc[151:189]
+            moved = np.abs(z_after - z_clean).max()
+            assert (moved < 0.5) if method == "mad" else (moved > 1.0)
+
+    def test_dispatch_and_bad_method(self, spread):
+        pd.testing.assert_series_equal(zscore(spread, 30, method="ewma"), ewma_zscore(spread, 30))
+        pd.testing.assert_series_equal(zscore(spread, 30, method="mad"), robust_zscore(spread, 30))
+        with pytest.raises(ValueError):
+            zscore(spread, 30, method="median")
+
+    def test_src_zero_scale_handling(self, spread):
+        """src z_center_scale: zero sd is NaN by default, kept as 0 for meta-labeling"""
+        flat = spread.rolling(21, min_periods=21).std(ddof=0) == 0
+        assert flat.any()
+        mu, sd = z_center_scale(spread, 21)
+        assert sd[flat].isna().all()
+        mu0, sd0 = z_center_scale(spread, 21, zero=0.0)
+        assert (sd0[flat] == 0).all()
+        pd.testing.assert_series_equal(sd0[~flat], sd[~flat])
+        pd.testing.assert_series_equal(mu0, mu)
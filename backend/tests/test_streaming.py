@@ -0,0 +1,142 @@
+"""
+Tests for the incremental Engle-Granger fit (core.streaming)
+
+Run with: pytest tests/ -v
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.coint import engle_granger
+from core.signal import compute_spread, mean_reversion_signals, zscore
+from core.streaming import StreamingEngleGranger, StreamingSignalEngine
+
+
+@pytest.fixture
+def pair():
+    dates = pd.bdate_range("2019-01-01", periods=800)
+    rng = np.random.default_rng(5)
+    x = pd.Series(80 + rng.standard_normal(len(dates)).cumsum(), index=dates, name="X")
+    y = pd.Series(3.0 + 0.8 * x.to_numpy() + rng.standard_normal(len(dates)), index=dates, name="Y")
+    return y, x
+
+
+def assert_matches(result, ref):
+    assert result.hedge_ratio == pytest.approx(ref.hedge_ratio, rel=1e-10)
+    assert result.intercept == pytest.approx(ref.intercept, rel=1e-9)
+    assert result.adf_stat == pytest.approx(ref.adf_stat, rel=1e-8)
+    assert result.adf_pvalue == pytest.approx(ref.adf_pvalue, rel=1e-6, abs=1e-12)
+    np.testing.assert_allclose(np.asarray(result.spread), np.asarray(ref.spread), atol=1e-9)
+
+
+class TestStreamingEngleGranger:
+    """Bar-by-bar updates reproduce a full refit"""
+
+    def test_updates_match_full_fit(self, pair):
+        y, x = pair
+        model = StreamingEngleGranger.fit(y.iloc[:500], x.iloc[:500])
+        for t in range(500, len(y)):
+            model.update(y.iloc[t], x.iloc[t], timestamp=y.index[t])
+        assert model.n == len(y)
+        result = model.result()
+        assert_matches(result, engle_granger(y, x))
+        pd.testing.assert_index_equal(result.spread.index, y.index, check_exact=True, exact=False)
+
+    def test_update_returns_last_spread(self, pair):
+        y, x = pair
+        model = StreamingEngleGranger()
+        for t in range(300):
+            last = model.update(y.iloc[t], x.iloc[t])
+        ref = engle_granger(y.iloc[:300].to_numpy(), x.iloc[:300].to_numpy())
+        assert last == pytest.approx(ref.spread[-1], abs=1e-9)
+        assert isinstance(model.spread(), np.ndarray)
+
+    def test_nan_bars_are_skipped(self, pair):
+        y, x = pair
+        y = y.copy()
+        y.iloc[[10, 200, 450]] = np.nan
+        model = StreamingEngleGranger.fit(y.iloc[:100], x.iloc[:100])
+        for t in range(100, len(y)):
+            model.update(y.iloc[t], x.iloc[t], timestamp=y.index[t])
+        assert model.n == len(y) - 3
+        assert_matches(model.result(), engle_granger(y, x))
+
+    def test_adf_only_rerun_after_new_bars(self, pair):
+        y, x = pair
+        model = StreamingEngleGranger.fit(y, x)
+        first = model.result()
+        assert model.result() is first
+        model.update(100.0, 120.0, timestamp=y.index[-1] + pd.offsets.BDay())
+        assert model.result() is not first
+
+    def test_mixed_timestamps_rejected(self, pair):
+        y, x = pair
+        model = StreamingEngleGranger.fit(y, x)
+        with pytest.raises(ValueError):
+            model.update(1.0, 1.0)
+
+    def test_save_and_resume(self, pair, tmp_path):
+        y, x = pair
+        path = tmp_path / "state.npz"
+        StreamingEngleGranger.fit(y.iloc[:600], x.iloc[:600], maxlag=2).save(path)
+
+        model = StreamingEngleGranger.load(path)
+        assert model.maxlag == 2 and model.n == 600
+        model.extend(y.iloc[600:], x.iloc[600:])
+        assert_matches(model.result(), engle_granger(y, x, maxlag=2))
+
+
+class TestStreamingSignalEngine:
+    """Bar-by-bar output equals compute_spread -> zscore -> mean_reversion_signals"""
+
+    @pytest.fixture
+    def prices(self):
+        rng = np.random.default_rng(9)
+        n = 2000
+        x = 500 + rng.standard_normal(n).cumsum()
+        y = 4.0 + 1.2 * x + 0.3 * rng.standard_normal(n).cumsum() + rng.standard_normal(n)
+        y[[100, 101, 900]] = np.nan
+        y[1500:1540] = y[1500]  # constant spread for longer than the window
+        x[1500:1540] = x[1500]
+        idx = pd.bdate_range("2016-01-01", periods=n)
+        return pd.Series(y, index=idx), pd.Series(x, index=idx)
+
+    @pytest.mark.parametrize("window", [10, 20, 60])
+    def test_matches_batch_bar_for_bar(self, prices, window):
+        y, x = prices
+        spread = compute_spread(y, x, 1.2, 4.0)
+        z = zscore(spread, window=window)
+        signals = mean_reversion_signals(z, entry_z=1.5, exit_z=0.3)
+
+        engine = StreamingSignalEngine(1.2, 4.0, window=window, entry_z=1.5, exit_z=0.3)
+        out = np.array([engine.update(yt, xt) for yt, xt in zip(y.to_numpy(), x.to_numpy())])
+        np.testing.assert_array_equal(out[:, 0], spread.to_numpy())
+        np.testing.assert_array_equal(np.isnan(out[:, 1]), np.isnan(z.to_numpy()))
+        np.testing.assert_allclose(out[:, 1], z.to_numpy(), rtol=1e-8, atol=1e-8)
+        np.testing.assert_array_equal(out[:, 2], signals.to_numpy())
+        assert engine.n == len(y) and engine.position == signals.iloc[-1]
+
+    @pytest.mark.parametrize("method", ["ewma", "mad"])
+    def test_other_z_methods_match_batch(self, prices, method):
+        y, x = prices
+        spread = compute_spread(y, x, 1.2, 4.0)
+        z = zscore(spread, window=30, method=method)
+        signals = mean_reversion_signals(z, entry_z=1.5, exit_z=0.3)
+
+        engine = StreamingSignalEngine(1.2, 4.0, window=30, entry_z=1.5, exit_z=0.3, method=method)
+        out = np.array([engine.update(yt, xt) for yt, xt in zip(y.to_numpy(), x.to_numpy())])
+        np.testing.assert_allclose(out[:, 1], z.to_numpy(), rtol=1e-12, atol=1e-12)
+        np.testing.assert_array_equal(out[:, 2], signals.to_numpy())
+
+    def test_far_from_zero_spread(self):
+        rng = np.random.default_rng(1)
+        spread = 1e7 + rng.standard_normal(500).cumsum() * 0.01
+        z = zscore(spread, window=30)
+        engine = StreamingSignalEngine(0.0, window=30)
+        out = np.array([engine.update_spread(s)[0] for s in spread])
+        np.testing.assert_allclose(out, z, rtol=1e-6, atol=1e-6)
+
+    def test_bad_window(self):
+        with pytest.raises(ValueError):
+            StreamingSignalEngine(1.0, window=1)
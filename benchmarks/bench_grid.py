@@ -0,0 +1,70 @@
+"""
+Benchmark: entry/exit threshold grid as a loop of single runs vs. one
+grid_backtest call (core.grid)
+
+Times one mean_reversion_signals -> backtest_spread_strategy ->
+summarize_performance run, extrapolates it to the whole grid, and
+compares with grid_backtest over the same grid (checking that the best
+Sharpe agrees on a sample of cells).
+
+Run from the project root:
+    python benchmarks/bench_grid.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.backtester import backtest_spread_strategy
+from core.grid import grid_backtest
+from core.metrics import summarize_performance
+from core.signal import mean_reversion_signals, zscore
+
+N_ROWS = 2520
+WINDOW = 60
+ENTRIES = np.linspace(1.0, 3.5, 50)
+EXITS = np.linspace(0.0, 1.5, 50)
+SAMPLE = 20
+
+def make_spread():
+    rng = np.random.default_rng(5)
+    s = np.zeros(N_ROWS)
+    for t in range(1, N_ROWS):
+        s[t] = 0.97 * s[t - 1] + rng.standard_normal()
+    return pd.Series(s, index=pd.bdate_range("2010-01-01", periods=N_ROWS))
+
+def single_run(spread, z, entry, exit_):
+    bt = backtest_spread_strategy(spread, mean_reversion_signals(z, entry, exit_))
+    return summarize_performance(bt.returns, bt.turnover).sharpe
+
+def main():
+    spread = make_spread()
+    z = zscore(spread, WINDOW)
+    rng = np.random.default_rng(0)
+    cells = [(rng.integers(len(ENTRIES)), rng.integers(len(EXITS))) for _ in range(SAMPLE)]
+
+    t0 = time.perf_counter()
+    sharpe = {(i, j): single_run(spread, z, ENTRIES[i], EXITS[j]) for i, j in cells}
+    single = (time.perf_counter() - t0) / SAMPLE
+
+    grid_backtest(spread, z, ENTRIES, EXITS)
+    t0 = time.perf_counter()
+    res = grid_backtest(spread, z, ENTRIES, EXITS)
+    elapsed = time.perf_counter() - t0
+
+    err = max(abs(res.sharpe[i, j] - s) for (i, j), s in sharpe.items())
+    n_cells = len(ENTRIES) * len(EXITS)
+    print(f"{N_ROWS} rows, {len(ENTRIES)}x{len(EXITS)} grid")
+    print(f"single run          {single * 1e3:>9.2f} ms")
+    print(f"loop (extrapolated) {single * n_cells * 1e3:>9.0f} ms")
+    print(f"grid_backtest       {elapsed * 1e3:>9.0f} ms  ({elapsed / single:.1f} single runs, "
+          f"{single * n_cells / elapsed:.0f}x)")
+    print(f"max |d sharpe| on {SAMPLE} cells: {err:.2e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: load_price_csv time vs. universe width
+
+Compares, for increasingly wide price files:
+    full    - parse every column (no cache)
+    pushed  - parse only two requested tickers (price_cols pushdown)
+    cold    - default path (use_cache=True) on a cold cache, two tickers:
+              parse and store only those columns
+    cached  - warm load from the columnar cache, then select two tickers
+
+Run from the project root:
+    python benchmarks/bench_load_price_csv.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_loader import load_price_csv
+
+N_ROWS = 1260  # ~5 years of business days
+WIDTHS = [10, 100, 1000, 3000]
+REPEATS = 3
+
+def make_price_file(directory: str, n_tickers: int) -> str:
+    rng = np.random.default_rng(42)
+    dates = pd.bdate_range("2019-01-01", periods=N_ROWS)
+    prices = 100 + rng.standard_normal((N_ROWS, n_tickers)).cumsum(axis=0)
+    df = pd.DataFrame(prices, columns=[f"T{i:04d}" for i in range(n_tickers)])
+    df.insert(0, "date", dates.strftime("%Y-%m-%d"))
+    path = os.path.join(directory, f"prices_{n_tickers}.csv")
+    df.to_csv(path, index=False)
+    return path
+
+def best_of(fn, repeats: int = REPEATS) -> float:
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+def main():
+    pair = ["T0000", "T0001"]
+    print(f"{'tickers':>8} {'full (s)':>10} {'pushed (s)':>11} {'cold (s)':>10} {'cached (s)':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, "cache")
+        for width in WIDTHS:
+            path = make_price_file(tmp, width)
+            full = best_of(lambda: load_price_csv(path, use_cache=False))
+            pushed = best_of(lambda: load_price_csv(path, price_cols=pair, use_cache=False))
+            cold_dirs = iter(tempfile.mkdtemp(dir=tmp) for _ in range(REPEATS))
+            cold = best_of(lambda: load_price_csv(path, price_cols=pair, cache_dir=next(cold_dirs)))
+            load_price_csv(path, cache_dir=cache_dir)  # build the cache entry
+            cached = best_of(lambda: load_price_csv(path, price_cols=pair, cache_dir=cache_dir))
+            print(f"{width:>8} {full:>10.4f} {pushed:>11.4f} {cold:>10.4f} {cached:>11.4f}")
+
+if __name__ == "__main__":
+    main()
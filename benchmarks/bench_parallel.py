@@ -0,0 +1,65 @@
+"""
+Benchmark: process-pool rolling cointegration and pair scan (core.parallel)
+
+Times, for 1, 2, 4, ... workers up to os.cpu_count():
+    rolling  - rolling_coint_matrix over every pair of a small universe
+    scan     - parallel_scan_pairs over a wide universe (top 50)
+
+and reports the speedup over one worker. Scaling is bounded by the number
+of physical cores; on a single-core machine every row is ~1x.
+
+Run from the project root:
+    python benchmarks/bench_parallel.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.parallel import parallel_scan_pairs, rolling_coint_matrix
+
+N_ROWS = 1260
+ROLLING_TICKERS = 16   # 120 pairs
+SCAN_TICKERS = 1000
+WINDOW = 252
+
+def make_prices(n_tickers: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    factors = rng.standard_normal((N_ROWS, 5)).cumsum(axis=0)
+    loadings = rng.uniform(0.5, 2.0, (5, n_tickers)) * (rng.random((5, n_tickers)) < 0.3)
+    noise = rng.standard_normal((N_ROWS, n_tickers)) * rng.uniform(0.5, 3.0, n_tickers)
+    prices = 100 + factors @ loadings + noise + 0.2 * rng.standard_normal((N_ROWS, n_tickers)).cumsum(axis=0)
+    return pd.DataFrame(prices, index=pd.bdate_range("2019-01-01", periods=N_ROWS),
+                        columns=[f"T{i:04d}" for i in range(n_tickers)])
+
+def worker_counts():
+    cpus = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpus:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpus:
+        counts.append(cpus)
+    return counts
+
+def main():
+    small, wide = make_prices(ROLLING_TICKERS), make_prices(SCAN_TICKERS)
+    print(f"cpus={os.cpu_count()}  rolling: {ROLLING_TICKERS} tickers, window {WINDOW}  scan: {SCAN_TICKERS} tickers")
+    print(f"{'workers':>8} {'rolling (s)':>12} {'speedup':>8} {'scan (s)':>9} {'speedup':>8}")
+    base = None
+    for workers in worker_counts():
+        t0 = time.perf_counter()
+        rolling_coint_matrix(small, window=WINDOW, workers=workers)
+        rolling_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        parallel_scan_pairs(wide, top_k=50, workers=workers)
+        scan_s = time.perf_counter() - t0
+        base = base or (rolling_s, scan_s)
+        print(f"{workers:>8} {rolling_s:>12.2f} {base[0] / rolling_s:>7.1f}x {scan_s:>9.2f} {base[1] / scan_s:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: float64 vs float32 compute precision (core.config.set_precision)
+
+For a wide price file, loads the universe, then runs spread -> z-score ->
+signals -> backtest -> metrics over a batch of pairs in each precision and
+reports:
+    panel MB   - size of the loaded price frame
+    peak MB    - peak traced allocation during the pair loop
+    load (s)   - warm (cached) load time
+    pairs (s)  - time for the pair loop (mostly per-call pandas overhead)
+    panel (s)  - z-score of the whole universe at once (bandwidth bound)
+
+Run from the project root:
+    python benchmarks/bench_precision.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import config
+from core.backtester import backtest_spread_strategy
+from core.data_loader import load_price_csv
+from core.metrics import summarize_performance
+from core.signal import compute_spread, mean_reversion_signals, zscore
+
+N_ROWS = 2520  # ~10 years of business days
+N_TICKERS = 500
+N_PAIRS = 200
+
+def make_price_file(directory: str) -> str:
+    rng = np.random.default_rng(42)
+    dates = pd.bdate_range("2014-01-01", periods=N_ROWS)
+    prices = 100 + rng.standard_normal((N_ROWS, N_TICKERS)).cumsum(axis=0)
+    df = pd.DataFrame(prices, columns=[f"T{i:04d}" for i in range(N_TICKERS)])
+    df.insert(0, "date", dates.strftime("%Y-%m-%d"))
+    path = os.path.join(directory, "prices.csv")
+    df.to_csv(path, index=False)
+    return path
+
+def run_pairs(df: pd.DataFrame, pairs) -> None:
+    for a, b in pairs:
+        spread = compute_spread(df[a], df[b], 1.0)
+        z = zscore(spread, window=60)
+        signals = mean_reversion_signals(z, entry_z=2.0, exit_z=0.5)
+        result = backtest_spread_strategy(spread, signals)
+        summarize_performance(result.returns, result.turnover)
+
+def main():
+    rng = np.random.default_rng(0)
+    cols = [f"T{i:04d}" for i in range(N_TICKERS)]
+    pairs = [tuple(rng.choice(cols, 2, replace=False)) for _ in range(N_PAIRS)]
+
+    print(f"{N_TICKERS} tickers x {N_ROWS} rows, {N_PAIRS} pairs")
+    print(f"{'precision':>10} {'panel MB':>9} {'peak MB':>8} {'load (s)':>9} {'pairs (s)':>10} {'panel (s)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_price_file(tmp)
+        cache_dir = os.path.join(tmp, "cache")
+        load_price_csv(path, cache_dir=cache_dir)  # build the cache entry
+        for precision in config.PRECISIONS:
+            config.set_precision(precision)
+            t0 = time.perf_counter()
+            df = load_price_csv(path, cache_dir=cache_dir)
+            # Materialise the memory-mapped float64 case so both rows compare in-RAM panels
+            df = df.copy()
+            load_s = time.perf_counter() - t0
+
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            run_pairs(df, pairs)
+            pairs_s = time.perf_counter() - t0
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            t0 = time.perf_counter()
+            zscore(df, window=60)
+            panel_s = time.perf_counter() - t0
+
+            panel_mb = df.memory_usage(index=False).sum() / 2**20
+            print(f"{precision:>10} {panel_mb:>9.1f} {peak / 2**20:>8.2f} {load_s:>9.4f} {pairs_s:>10.3f} {panel_s:>10.3f}")
+    config.set_precision("float64")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: all-pairs Engle-Granger scan vs. the per-pair engle_granger loop
+
+For universes of increasing width, times:
+    loop  - engle_granger on every pair (only run for the smaller universes;
+            larger ones are extrapolated from the per-pair cost)
+    scan  - core.scanner.scan_pairs keeping the top 50 pairs
+
+and checks that both agree on the ADF statistic of every pair.
+
+Run from the project root:
+    python benchmarks/bench_scanner.py
+"""
+
+import os
+import sys
+import time
+import warnings
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.coint import engle_granger
+from core.scanner import scan_pairs
+
+N_ROWS = 1260  # ~5 years of business days
+WIDTHS = [25, 50, 200, 500, 1000]
+LOOP_MAX_WIDTH = 50
+
+def make_prices(n_tickers: int) -> pd.DataFrame:
+    # A few common factors so that some pairs are cointegrated
+    rng = np.random.default_rng(42)
+    factors = rng.standard_normal((N_ROWS, 5)).cumsum(axis=0)
+    loadings = rng.uniform(0.5, 2.0, (5, n_tickers)) * (rng.random((5, n_tickers)) < 0.3)
+    noise = rng.standard_normal((N_ROWS, n_tickers)) * rng.uniform(0.5, 3.0, n_tickers)
+    prices = 100 + factors @ loadings + noise + 0.2 * rng.standard_normal((N_ROWS, n_tickers)).cumsum(axis=0)
+    return pd.DataFrame(prices, index=pd.bdate_range("2019-01-01", periods=N_ROWS),
+                        columns=[f"T{i:04d}" for i in range(n_tickers)])
+
+def loop_scan(df: pd.DataFrame):
+    return {(a, b): engle_granger(df[a], df[b]).adf_stat for a, b in combinations(df.columns, 2)}
+
+def main():
+    warnings.simplefilter("ignore", FutureWarning)
+    print(f"{'tickers':>8} {'pairs':>8} {'loop (s)':>10} {'scan (s)':>9} {'speedup':>8} {'max |dstat|':>12}")
+    per_pair = None
+    for width in WIDTHS:
+        df = make_prices(width)
+        n_pairs = width * (width - 1) // 2
+
+        t0 = time.perf_counter()
+        scan_pairs(df, top_k=50)
+        scan_s = time.perf_counter() - t0
+
+        if width <= LOOP_MAX_WIDTH:
+            t0 = time.perf_counter()
+            ref = loop_scan(df)
+            loop_s = time.perf_counter() - t0
+            per_pair = loop_s / n_pairs
+            diff = max(abs(r.adf_stat - ref[(r.y, r.x)]) for r in scan_pairs(df, top_k=None))
+            loop_txt, diff_txt = f"{loop_s:>10.2f}", f"{diff:>12.2e}"
+        else:
+            loop_s = per_pair * n_pairs
+            loop_txt, diff_txt = f"{'~' + format(loop_s, '.0f'):>10}", f"{'-':>12}"
+        print(f"{width:>8} {n_pairs:>8} {loop_txt} {scan_s:>9.2f} {loop_s / scan_s:>7.0f}x {diff_txt}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: pandas spread -> zscore -> signals chain vs. the array kernels
+(core.signal.signal_kernel)
+
+Reports time per call for the previous pandas implementation, the pandas
+wrappers (now backed by the kernels) and signal_kernel with reused output
+buffers, plus the largest z difference against the pandas chain.
+
+Run from the project root:
+    python benchmarks/bench_signal.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.signal import compute_spread, mean_reversion_signals, signal_kernel, zscore
+
+N_ROWS = 100_000
+WINDOW = 60
+REPEATS = 20
+HEDGE, INTERCEPT, ENTRY, EXIT = 1.2, 4.0, 2.0, 0.5
+
+def make_pair():
+    rng = np.random.default_rng(2)
+    x = 100 + rng.standard_normal(N_ROWS).cumsum()
+    y = INTERCEPT + HEDGE * x + rng.standard_normal(N_ROWS)
+    idx = pd.date_range("2000-01-01", periods=N_ROWS, freq="min")
+    return pd.Series(y, index=idx), pd.Series(x, index=idx)
+
+def pandas_chain(y, x):
+    spread = y - (INTERCEPT + HEDGE * x)
+    roll = spread.rolling(window=WINDOW)
+    z = ((spread - roll.mean()) / roll.std()).replace([np.inf, -np.inf], np.nan)
+    signals = pd.Series(np.nan, index=z.index)
+    signals[z > ENTRY] = -1
+    signals[z < -ENTRY] = 1
+    signals[z.abs() < EXIT] = 0
+    signals.ffill(inplace=True)
+    signals.fillna(0, inplace=True)
+    return z
+
+def wrappers(y, x):
+    z = zscore(compute_spread(y, x, HEDGE, INTERCEPT), WINDOW)
+    mean_reversion_signals(z, ENTRY, EXIT)
+    return z
+
+def timed(fn):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(REPEATS):
+        z = fn()
+    return (time.perf_counter() - t0) / REPEATS, np.asarray(z)
+
+def main():
+    y, x = make_pair()
+    Y, X = y.to_numpy(), x.to_numpy()
+    out = tuple(np.empty(N_ROWS) for _ in range(3))
+    methods = {
+        "pandas chain": lambda: pandas_chain(y, x),
+        "wrappers": lambda: wrappers(y, x),
+        "signal_kernel": lambda: signal_kernel(Y, X, HEDGE, INTERCEPT, WINDOW, ENTRY, EXIT, out=out)[1],
+    }
+    print(f"{N_ROWS} rows, window {WINDOW}, {REPEATS} repeats")
+    print(f"{'method':>14} {'ms/call':>9} {'speedup':>8} {'max |dz|':>10}")
+    results = {name: timed(fn) for name, fn in methods.items()}
+    base, ref = results["pandas chain"]
+    for name, (elapsed, z) in results.items():
+        err = np.nanmax(np.abs(z - ref))
+        print(f"{name:>14} {elapsed * 1e3:>9.2f} {base / elapsed:>7.1f}x {err:>10.2e}")
+
+if __name__ == "__main__":
+    main()
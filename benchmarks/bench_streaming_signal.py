@@ -0,0 +1,50 @@
+"""
+Benchmark: per-bar latency of StreamingSignalEngine vs. recomputing the
+batch chain (core.signal.signal_kernel) on the history for every new bar
+
+Run from the project root:
+    python benchmarks/bench_streaming_signal.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.signal import signal_kernel
+from core.streaming import StreamingSignalEngine
+
+HISTORY = 20_000
+N_BARS = 2_000
+WINDOW = 60
+HEDGE, INTERCEPT = 1.2, 4.0
+
+def main():
+    rng = np.random.default_rng(4)
+    n = HISTORY + N_BARS
+    x = 100 + rng.standard_normal(n).cumsum()
+    y = INTERCEPT + HEDGE * x + rng.standard_normal(n)
+
+    engine = StreamingSignalEngine(HEDGE, INTERCEPT, window=WINDOW)
+    for t in range(HISTORY):
+        engine.update(y[t], x[t])
+    t0 = time.perf_counter()
+    live = [engine.update(y[t], x[t])[2] for t in range(HISTORY, n)]
+    stream = (time.perf_counter() - t0) / N_BARS
+
+    sample = range(HISTORY, n, N_BARS // 50)
+    t0 = time.perf_counter()
+    batch = [signal_kernel(y[:t + 1], x[:t + 1], HEDGE, INTERCEPT, window=WINDOW)[2][-1] for t in sample]
+    recompute = (time.perf_counter() - t0) / len(sample)
+
+    agree = all(live[t - HISTORY] == b for t, b in zip(sample, batch))
+    print(f"{HISTORY} bars of history, window {WINDOW}")
+    print(f"streaming update   {stream * 1e6:>9.1f} us/bar")
+    print(f"batch recompute    {recompute * 1e6:>9.1f} us/bar  ({recompute / stream:.0f}x)")
+    print(f"positions agree: {agree}")
+
+if __name__ == "__main__":
+    main()
@@ -10,15 +10,33 @@ Public API:
 Data Loading:
     - load_price_csv: Load price data from CSV
     - align_pairs: Align two price series by date
+    - PricePanel: Contiguous price matrix with zero-copy pair views
+    - ingest_intraday_csv / load_intraday: Chunked intraday bar ingestion
+    - TradingCalendar / load_calendar: Shared date index and forward-fill mask
 
 Cointegration:
     - engle_granger: Test for cointegration between two series
+    - cached_engle_granger / EngleGrangerCache: Content-keyed LRU (and disk) cache of engle_granger results
+    - StreamingEngleGranger: Engle-Granger fit updated bar by bar, with resumable state
     - rolling_hedge_ratio: Calculate rolling OLS hedge ratios
+    - rolling_ols: One-pass rolling intercept, beta, residual std, R^2 and t-stat
+    - rolling_ou / ou_fit: Rolling and full-sample OU speed, mean, sigma and half-life, batched over spreads
+    - johansen / rolling_johansen: Batched Johansen test for multi-asset baskets
+    - rolling_engle_granger: One-pass rolling Engle-Granger statistics and p-values
+    - mackinnon_pvalues / mackinnon_crit: Vectorized MacKinnon p-value and critical value lookups
+    - rolling_coint_matrix / parallel_scan_pairs: Process-pool versions over shared-memory prices
+    - scan_pairs: Vectorized Engle-Granger scan over every pair of a universe
+    - screen_pairs: Correlation/SSD/cluster pre-filters ahead of the cointegration test
 
 Signal Generation:
     - compute_spread: Calculate cointegration spread
     - zscore: Compute rolling z-scores
+    - zscore_multi / SpreadMoments: Z-scores for many windows from one set of prefix sums
+    - ewma_zscore / robust_zscore: EWMA and median/MAD z-scores (EwmaZScore / RobustZScore bar by bar)
     - mean_reversion_signals: Generate entry/exit signals
+    - signal_kernel: Spread, z-score and position from raw arrays into reusable buffers
+    - StreamingSignalEngine: Spread, z-score and position updated bar by bar in O(1)
+    - grid_positions / grid_backtest: Positions and metrics over an entry x exit threshold grid
 
 Backtesting:
     - backtest_spread_strategy: Run vectorized backtest
@@ -56,8 +74,22 @@ Example:
 """
 
 from .data_loader import load_price_csv, align_pairs
-from .coint import engle_granger, rolling_hedge_ratio
-from .signal import compute_spread, zscore, mean_reversion_signals
+from .panel import PricePanel, PairView
+from .intraday import ingest_intraday_csv, load_intraday
+from .trading_calendar import TradingCalendar, load_calendar
+from .rolling import rolling_ols
+from .ou import rolling_ou, ou_fit
+from .coint import (engle_granger, cached_engle_granger, EngleGrangerCache, rolling_hedge_ratio,
+                    johansen, rolling_johansen, JohansenResult)
+from .streaming import StreamingEngleGranger, StreamingSignalEngine
+from .rolling_coint import rolling_engle_granger
+from .mackinnon import mackinnon_pvalues, mackinnon_crit
+from .parallel import rolling_coint_matrix, parallel_scan_pairs
+from .scanner import scan_pairs, PairScanResult
+from .screening import screen_pairs, ScreeningResult, StageStats
+from .signal import (compute_spread, zscore, zscore_multi, SpreadMoments, ewma_zscore, robust_zscore,
+                     zscore_center_scale, EwmaZScore, RobustZScore, mean_reversion_signals, signal_kernel)
+from .grid import grid_positions, grid_backtest, GridResult
 from .backtester import backtest_spread_strategy, BacktestResult
 from .metrics import summarize_performance, PerformanceSummary
 
@@ -65,13 +97,50 @@ __all__ = [
     # Data loading
     'load_price_csv',
     'align_pairs',
+    'PricePanel',
+    'PairView',
+    'ingest_intraday_csv',
+    'load_intraday',
+    'TradingCalendar',
+    'load_calendar',
     # Cointegration
     'engle_granger',
+    'cached_engle_granger',
+    'EngleGrangerCache',
+    'StreamingEngleGranger',
     'rolling_hedge_ratio',
+    'rolling_ols',
+    'rolling_ou',
+    'ou_fit',
+    'johansen',
+    'rolling_johansen',
+    'JohansenResult',
+    'rolling_engle_granger',
+    'mackinnon_pvalues',
+    'mackinnon_crit',
+    'rolling_coint_matrix',
+    'parallel_scan_pairs',
+    'scan_pairs',
+    'PairScanResult',
+    'screen_pairs',
+    'ScreeningResult',
+    'StageStats',
     # Signal generation
     'compute_spread',
     'zscore',
+    'zscore_multi',
+    'SpreadMoments',
+    'ewma_zscore',
+    'robust_zscore',
+    'zscore_center_scale',
+    'EwmaZScore',
+    'RobustZScore',
     'mean_reversion_signals',
+    'signal_kernel',
+    'StreamingSignalEngine',
+    'grid_positions',
+    'grid_backtest',
+    'GridResult',
     # Backtesting
     'backtest_spread_strategy',
     'BacktestResult',
@@ -2,6 +2,8 @@ import pandas as pd
 import numpy as np
 from dataclasses import dataclass
 
+from . import config
+
 @dataclass
 class BacktestResult:
     pnl: pd.Series
@@ -21,9 +23,17 @@ def backtest_spread_strategy(spread: pd.Series, signal: pd.Series, notional: flo
     - turnover = sum of absolute changes in position over time.
 
     Return BacktestResult with all fields populated.
+    NumPy inputs are treated as positionally aligned (RangeIndex).
+    pnl, returns and positions are in config.get_dtype().
     """
-    # Align
-    df = pd.concat([spread, signal], axis=1).dropna()
+    if isinstance(spread, np.ndarray):
+        spread = pd.Series(spread, copy=False)
+    if isinstance(signal, np.ndarray):
+        signal = pd.Series(signal, copy=False)
+
+    # Align (in the configured precision, so a float32 spread is not upcast)
+    dtype = config.get_dtype()
+    df = pd.concat([spread.astype(dtype), signal.astype(dtype)], axis=1).dropna()
     spread_aligned = df.iloc[:, 0]
     signal_aligned = df.iloc[:, 1]
     
@@ -42,10 +52,10 @@ def backtest_spread_strategy(spread: pd.Series, signal: pd.Series, notional: flo
     
     # PnL
     # pnl_t = pos_{t-1} * (spread_t - spread_{t-1})
-    pnl = positions * spread_diff * notional
+    pnl = positions * spread_diff * dtype.type(notional)
     
     # Returns
-    returns = pnl / abs(notional)
+    returns = pnl / dtype.type(abs(notional))
     
     # Turnover
     # Sum of absolute changes in signal (trades)
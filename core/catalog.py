@@ -0,0 +1,85 @@
+"""
+Ticker catalog for a price file.
+
+Listing tickers only needs the CSV header, so TickerCatalog never parses
+the file body for that. Per-ticker first/last date and observation counts
+come from the columnar cache metadata (core.price_cache), which is built
+once per version of the file. Both are held in memory and refreshed only
+when the file's mtime or size changes.
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from . import price_cache
+from .data_loader import load_price_csv
+
+logger = logging.getLogger(__name__)
+
+class TickerCatalog:
+    def __init__(self, path: str, date_col: str = "date", cache_dir: Optional[str] = None):
+        self.path = path
+        self.date_col = date_col
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._signature = None
+        self._tickers: List[str] = []
+        self._stats: Optional[Dict[str, dict]] = None
+        self._indexer: Optional[threading.Thread] = None
+
+    def _refresh(self) -> None:
+        """Re-read the header if the file changed since the last call."""
+        st = os.stat(self.path)
+        signature = (st.st_mtime_ns, st.st_size)
+        if signature == self._signature:
+            return
+        header = pd.read_csv(self.path, nrows=0).columns
+        self._tickers = [str(c) for c in header if str(c).lower() != self.date_col.lower()]
+        self._stats = None
+        self._indexer = None
+        self._signature = signature
+
+    def _index(self) -> None:
+        # Same arguments as the backend's load, so this builds the entry it reads
+        try:
+            load_price_csv(self.path, date_col=self.date_col, cache_dir=self.cache_dir)
+        except Exception:
+            logger.exception("Indexing %s for ticker stats failed", self.path)
+            with self._lock:
+                if self._indexer is threading.current_thread():
+                    self._indexer = None  # the next stats() call retries
+
+    def tickers(self) -> List[str]:
+        """
+        - Ticker columns of the file (everything except the date column).
+        - Only the header is read, and only when the file changed.
+        """
+        with self._lock:
+            self._refresh()
+            return list(self._tickers)
+
+    def stats(self) -> Dict[str, Optional[dict]]:
+        """
+        - {ticker: {"first_date", "last_date", "rows"}} with one entry per
+          ticker in tickers(); non-numeric columns map to None.
+        - Read from the price cache metadata. If the file has no cache entry
+          yet, every ticker maps to None and the entry is built in a
+          background thread, so the caller never waits on a full parse. A
+          failed build is logged and retried on the next call.
+        """
+        with self._lock:
+            self._refresh()
+            if self._stats is None:
+                key = price_cache.cache_key(self.path, date_col=self.date_col, index_col=None, freq="B")
+                meta = price_cache.load_meta(key, self.cache_dir)
+                if meta is not None and "stats" in meta:
+                    self._stats = meta["stats"]
+                elif self._indexer is None:
+                    self._indexer = threading.Thread(target=self._index, daemon=True)
+                    self._indexer.start()
+            stats = self._stats or {}
+            return {t: stats.get(t) for t in self._tickers}
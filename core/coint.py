@@ -1,8 +1,23 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
 import statsmodels.api as sm
 from statsmodels.tsa.stattools import adfuller
-from dataclasses import dataclass
-from typing import Dict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from numpy.lib.stride_tricks import sliding_window_view
+from statsmodels.tsa.coint_tables import c_sja, c_sjt
+
+from . import config
+from .rolling import rolling_ols
+from .signal import SpreadMoments, compute_spread, zscore
+
+ArrayLike = Union[pd.Series, np.ndarray]
 
 @dataclass
 class EngleGrangerResult:
@@ -11,28 +26,46 @@ class EngleGrangerResult:
     adf_stat: float
     adf_pvalue: float
     crit_values: Dict[str, float]
-    spread: pd.Series
+    spread: ArrayLike
+    cache_key: Optional[str] = None
+
+def _align(y: ArrayLike, x: ArrayLike) -> Tuple[ArrayLike, ArrayLike]:
+    """
+    - Series: align by index and drop rows where either side is NaN.
+    - Arrays (e.g. PairView.y / PairView.x): drop NaN rows positionally;
+      if there are none the inputs are returned as-is, without a copy.
+    """
+    if isinstance(y, pd.Series) or isinstance(x, pd.Series):
+        df = pd.concat([y, x], axis=1).dropna()
+        return df.iloc[:, 0], df.iloc[:, 1]
+
+    y = np.asarray(y, dtype=float)
+    x = np.asarray(x, dtype=float)
+    mask = ~(np.isnan(y) | np.isnan(x))
+    if mask.all():
+        return y, x
+    return y[mask], x[mask]
 
-def engle_granger(y: pd.Series, x: pd.Series, maxlag: int = 1, regression: str = "c") -> EngleGrangerResult:
+def engle_granger(y: ArrayLike, x: ArrayLike, maxlag: int = 1, regression: str = "c") -> EngleGrangerResult:
     """
     - Align y and x by index.
     - Run OLS: y_t = a + b x_t + e_t (use statsmodels OLS).
     - Compute spread = residuals = y_t - (a + b x_t).
     - Run ADF on residuals with given maxlag and regression settings.
     - Return EngleGrangerResult with hedge ratio b, intercept a, and ADF stats.
+    - NumPy inputs (e.g. PricePanel views) are accepted; the spread is then an array.
     """
     # Align
-    df = pd.concat([y, x], axis=1).dropna()
-    y_aligned = df.iloc[:, 0]
-    x_aligned = df.iloc[:, 1]
+    y_aligned, x_aligned = _align(y, x)
     
     # OLS
     # statsmodels OLS requires adding constant manually if we want an intercept
     X = sm.add_constant(x_aligned)
     model = sm.OLS(y_aligned, X).fit()
     
-    intercept = model.params['const']
-    hedge_ratio = model.params.iloc[1] # The coefficient for x
+    params = np.asarray(model.params)
+    intercept = params[0]
+    hedge_ratio = params[1] # The coefficient for x
     
     # Spread / Residuals
     # spread = y - (a + b*x)
@@ -51,26 +84,366 @@ def engle_granger(y: pd.Series, x: pd.Series, maxlag: int = 1, regression: str =
         spread=spread
     )
 
-def rolling_hedge_ratio(y: pd.Series, x: pd.Series, window: int = 60) -> pd.Series:
+EG_CACHE_VERSION = 1
+
+def eg_cache_key(y: ArrayLike, x: ArrayLike, maxlag: int = 1, regression: str = "c") -> str:
+    """
+    - Hash of the aligned y/x values, their index, maxlag and regression.
+    - The same pair over the same dates gets the same key however it was
+      loaded; any change to a price or a date gives a new one.
+    """
+    return _content_key(*_align(y, x), maxlag, regression)
+
+def _content_key(y_aligned: ArrayLike, x_aligned: ArrayLike, maxlag: int, regression: str) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    h.update(json.dumps([EG_CACHE_VERSION, int(maxlag), regression, len(y_aligned)]).encode())
+    h.update(np.ascontiguousarray(np.asarray(y_aligned, dtype=float)).tobytes())
+    h.update(np.ascontiguousarray(np.asarray(x_aligned, dtype=float)).tobytes())
+    if isinstance(y_aligned, pd.Series):
+        h.update(pd.util.hash_array(np.asarray(y_aligned.index)).tobytes())
+    return h.hexdigest()
+
+@dataclass
+class _CacheEntry:
+    result: EngleGrangerResult
+    derived: Dict[Tuple, Any] = field(default_factory=dict)
+
+class EngleGrangerCache:
+    """
+    Memoized engle_granger results, keyed by eg_cache_key.
+
+    - An in-memory LRU of at most maxsize entries holds full results plus
+      the spread, its prefix sums and z-scores derived from them (per dtype
+      and window), so rerunning a pair with new entry/exit thresholds does
+      no fitting at all, and a new window no rolling pass.
+    - disk_dir adds a second tier: the test scalars are kept as one JSON
+      file per key and survive restarts; on a disk hit only the residual
+      spread is recomputed from the aligned inputs.
+    - hits, disk_hits and misses count lookups. Cached objects are shared
+      between callers and must be treated as read-only.
+    """
+
+    def __init__(self, maxsize: int = 128, disk_dir: Optional[str] = None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                    "size": len(self._entries), "maxsize": self.maxsize}
+
+    def clear(self) -> None:
+        """Drop the in-memory entries and reset the counters (the disk tier is kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def engle_granger(self, y: ArrayLike, x: ArrayLike, maxlag: int = 1, regression: str = "c") -> EngleGrangerResult:
+        """engle_granger(y, x, maxlag, regression), served from the cache when possible."""
+        y_aligned, x_aligned = _align(y, x)
+        key = _content_key(y_aligned, x_aligned, maxlag, regression)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.result
+
+        result = self._load(key, y_aligned, x_aligned)
+        from_disk = result is not None
+        if not from_disk:
+            result = engle_granger(y_aligned, x_aligned, maxlag=maxlag, regression=regression)
+            result.cache_key = key
+            self._save(key, result)
+        with self._lock:
+            if from_disk:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+            self._entries[key] = _CacheEntry(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def spread(self, result: EngleGrangerResult, y: ArrayLike, x: ArrayLike) -> ArrayLike:
+        """
+        - compute_spread(y, x, result.hedge_ratio, result.intercept), memoized
+          with the result while its entry is cached.
+        - y and x must be the series result was fitted on.
+        """
+        dtype = config.get_dtype()
+        return self._derived(result, ("spread", dtype.str),
+                             lambda: compute_spread(y, x, result.hedge_ratio, result.intercept))
+
+    def moments(self, result: EngleGrangerResult, y: ArrayLike, x: ArrayLike) -> SpreadMoments:
+        """SpreadMoments of self.spread(result, y, x), memoized like the spread."""
+        dtype = config.get_dtype()
+        return self._derived(result, ("moments", dtype.str),
+                             lambda: SpreadMoments(self.spread(result, y, x)))
+
+    def zscore(self, result: EngleGrangerResult, y: ArrayLike, x: ArrayLike, window: int = 60,
+               method: str = "rolling") -> ArrayLike:
+        """
+        - zscore(self.spread(result, y, x), window, method), memoized per
+          window and method.
+        - A rolling window not seen before is answered from the cached prefix
+          sums (self.moments) without a rolling pass.
+        """
+        dtype = config.get_dtype()
+        if method == "rolling":
+            compute = lambda: self.moments(result, y, x).zscore(window)
+        else:
+            compute = lambda: zscore(self.spread(result, y, x), window=window, method=method)
+        return self._derived(result, ("zscore", dtype.str, int(window), method), compute)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _load(self, key: str, y_aligned: ArrayLike, x_aligned: ArrayLike) -> Optional[EngleGrangerResult]:
+        if self.disk_dir is None:
+            return None
+        try:
+            with open(self._path(key)) as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        intercept, hedge_ratio = stored["intercept"], stored["hedge_ratio"]
+        return EngleGrangerResult(
+            hedge_ratio=hedge_ratio,
+            intercept=intercept,
+            adf_stat=stored["adf_stat"],
+            adf_pvalue=stored["adf_pvalue"],
+            crit_values=stored["crit_values"],
+            spread=y_aligned - (intercept + hedge_ratio * x_aligned),
+            cache_key=key,
+        )
+
+    def _save(self, key: str, result: EngleGrangerResult) -> None:
+        if self.disk_dir is None:
+            return
+        stored = {
+            "hedge_ratio": float(result.hedge_ratio),
+            "intercept": float(result.intercept),
+            "adf_stat": float(result.adf_stat),
+            "adf_pvalue": float(result.adf_pvalue),
+            "crit_values": {k: float(v) for k, v in result.crit_values.items()},
+        }
+        os.makedirs(self.disk_dir, exist_ok=True)
+        # Write to a temp file and rename, so readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(stored, f)
+        os.replace(tmp, self._path(key))
+
+    def _derived(self, result: EngleGrangerResult, name: Tuple, compute):
+        with self._lock:
+            entry = self._entries.get(result.cache_key)
+            if entry is not None and entry.result is result and name in entry.derived:
+                return entry.derived[name]
+        value = compute()
+        with self._lock:
+            entry = self._entries.get(result.cache_key)
+            if entry is not None and entry.result is result:
+                entry.derived[name] = value
+        return value
+
+# Process-wide cache used by cached_engle_granger (and the backend)
+EG_CACHE = EngleGrangerCache(config.EG_CACHE_SIZE, config.EG_CACHE_DIR)
+
+def cached_engle_granger(y: ArrayLike, x: ArrayLike, maxlag: int = 1, regression: str = "c",
+                         cache: Optional[EngleGrangerCache] = None) -> EngleGrangerResult:
+    """engle_granger through cache (default: the process-wide EG_CACHE)."""
+    cache = cache if cache is not None else EG_CACHE
+    return cache.engle_granger(y, x, maxlag=maxlag, regression=regression)
+
+def rolling_hedge_ratio(y: ArrayLike, x: ArrayLike, window: int = 60) -> ArrayLike:
     """
     - Rolling OLS over a moving window.
     - For each window, regress y on x with intercept.
-    - Return a Series of hedge ratios indexed by the window end timestamp.
+    - Return a Series of hedge ratios indexed by the window end timestamp
+      (an array for NumPy inputs).
+    - Computed by core.rolling.rolling_ols in one pass; use that directly
+      for the intercept, residual std, R^2 and t-stat as well.
     """
-    # Align
-    df = pd.concat([y, x], axis=1).dropna()
-    y_aligned = df.iloc[:, 0]
-    x_aligned = df.iloc[:, 1]
-    
-    from statsmodels.regression.rolling import RollingOLS
-    
-    X = sm.add_constant(x_aligned)
-    model = RollingOLS(y_aligned, X, window=window)
-    rres = model.fit()
-    
-    # params will have 'const' and the x column name
-    # We want the coefficient for x.
-    # The columns of params are usually ['const', 'name_of_x']
-    # We can access by position if we are sure.
-    
-    return rres.params.iloc[:, 1]
+    y_aligned, x_aligned = _align(y, x)
+    beta = rolling_ols(y_aligned, x_aligned, window)["beta"]
+    if isinstance(y_aligned, pd.Series):
+        return beta.rename(x_aligned.name)
+    return beta.to_numpy()
+
+@dataclass
+class JohansenResult:
+    """
+    Johansen test results, batched over any leading axes (e.g. basket, window).
+
+    - eig: (..., n) eigenvalues, largest first.
+    - evec: (..., n, n) cointegrating vectors in columns, in eig order,
+      normalised to evec' S_kk evec = I with a positive first element.
+    - trace_stat / max_eig_stat: (..., n) statistics for H0: rank <= r.
+    - trace_crit / max_eig_crit: (n, 3) 90/95/99% critical values.
+    """
+    eig: np.ndarray
+    evec: np.ndarray
+    trace_stat: np.ndarray
+    max_eig_stat: np.ndarray
+    trace_crit: np.ndarray
+    max_eig_crit: np.ndarray
+    nobs: int
+    index: Optional[pd.Index] = None
+    baskets: List[Tuple[str, ...]] = field(default_factory=list)
+
+    def rank(self, level: int = 1) -> np.ndarray:
+        """Cointegration rank from the trace test (level 0/1/2 = 90/95/99%)."""
+        reject = self.trace_stat > self.trace_crit[:, level]
+        return np.cumprod(reject, axis=-1).sum(axis=-1)
+
+    def weights(self, r: int = 0) -> np.ndarray:
+        """(..., n) r-th cointegrating vector scaled so the first asset's weight is 1."""
+        v = self.evec[..., :, r]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return v / v[..., :1]
+
+def johansen(endog: Union[pd.DataFrame, np.ndarray], det_order: int = 0, k_ar_diff: int = 1) -> JohansenResult:
+    """
+    - Johansen cointegration test, as statsmodels coint_johansen, on a
+      (T, n) frame/array or a stack of them with shape (..., T, n).
+    - All eigen-decompositions of the stack run as one batched eigh (the
+      symmetric form of the generalised eigenproblem), not one call each.
+    - Column signs of evec follow the positive-first-element rule, so
+      columns other than the first may be flipped relative to statsmodels.
+    - Windows containing NaN (or singular ones) give NaN.
+    """
+    if det_order not in (-1, 0, 1):
+        raise ValueError("det_order must be -1, 0 or 1")
+    Y = np.asarray(endog, dtype=float)
+    if Y.ndim < 2:
+        raise ValueError("endog must have shape (..., T, n)")
+    T, n = Y.shape[-2:]
+    if T - k_ar_diff - 1 <= n * (k_ar_diff + 1):
+        raise ValueError("too few observations for the number of series and lags")
+
+    lead = Y.shape[:-2]
+    flat = Y.reshape((-1, T, n))
+    eig = np.full((flat.shape[0], n), np.nan)
+    evec = np.full((flat.shape[0], n, n), np.nan)
+    ok = ~np.isnan(flat).any(axis=(1, 2))
+    if ok.any():
+        eig[ok], evec[ok] = _johansen_stack(flat[ok], det_order, k_ar_diff)
+    nobs = T - k_ar_diff - 1
+
+    log1m = np.log1p(-eig)
+    return JohansenResult(
+        eig=eig.reshape(lead + (n,)),
+        evec=evec.reshape(lead + (n, n)),
+        trace_stat=(-nobs * np.cumsum(log1m[:, ::-1], axis=1)[:, ::-1]).reshape(lead + (n,)),
+        max_eig_stat=(-nobs * log1m).reshape(lead + (n,)),
+        trace_crit=np.array([c_sjt(n - i, det_order) for i in range(n)]),
+        max_eig_crit=np.array([c_sja(n - i, det_order) for i in range(n)]),
+        nobs=nobs,
+    )
+
+def rolling_johansen(prices: pd.DataFrame, window: int, baskets: Optional[Sequence[Sequence[str]]] = None,
+                     det_order: int = 0, k_ar_diff: int = 1, step: int = 1,
+                     chunk_elements: int = 4_000_000) -> JohansenResult:
+    """
+    - Johansen test over every trailing window of every basket of prices.
+    - baskets: equal-size tuples of columns (default: all columns as one).
+    - Result arrays have shape (n_baskets, n_windows, ...); result.index
+      holds each window's last date (every step-th window).
+    - Windows are zero-copy views; at most chunk_elements values are
+      materialised per batched call.
+    """
+    baskets = [tuple(prices.columns)] if baskets is None else [tuple(b) for b in baskets]
+    if len({len(b) for b in baskets}) != 1:
+        raise ValueError("all baskets must have the same number of assets")
+    n = len(baskets[0])
+    cols = [[prices.columns.get_loc(c) for c in b] for b in baskets]
+    values = prices.to_numpy(dtype=float)[:, cols]               # (T, baskets, n)
+    views = sliding_window_view(values, window, axis=0)[::step]  # (windows, baskets, n, window)
+    n_win = views.shape[0]
+    if n_win == 0:
+        raise ValueError("window is longer than the price history")
+
+    flat_idx = [(w, b) for b in range(len(baskets)) for w in range(n_win)]
+    per_chunk = max(1, chunk_elements // (window * n))
+    parts = []
+    for lo in range(0, len(flat_idx), per_chunk):
+        w_i, b_i = np.array(flat_idx[lo:lo + per_chunk]).T
+        parts.append(johansen(views[w_i, b_i].transpose(0, 2, 1), det_order, k_ar_diff))
+
+    def stack(name):
+        return np.concatenate([getattr(p, name) for p in parts]).reshape((len(baskets), n_win) + getattr(parts[0], name).shape[1:])
+
+    first = parts[0]
+    return JohansenResult(
+        eig=stack("eig"), evec=stack("evec"), trace_stat=stack("trace_stat"), max_eig_stat=stack("max_eig_stat"),
+        trace_crit=first.trace_crit, max_eig_crit=first.max_eig_crit, nobs=first.nobs,
+        index=prices.index[window - 1::step][:n_win], baskets=baskets,
+    )
+
+def _swap(a: np.ndarray) -> np.ndarray:
+    return np.swapaxes(a, -1, -2)
+
+def _detrend(y: np.ndarray, order: int) -> np.ndarray:
+    """Residuals of each (T, n) slice on a polynomial time trend (order -1: none)."""
+    if order == -1:
+        return y
+    if order == 0:
+        return y - y.mean(axis=-2, keepdims=True)
+    X = np.vander(np.linspace(-1, 1, y.shape[-2]), order + 1)
+    coef = np.einsum("pt,...tn->...pn", np.linalg.pinv(X), y)
+    return y - np.einsum("tp,...pn->...tn", X, coef)
+
+def _resid(y: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Batched OLS residuals of y on x."""
+    if x.shape[-1] == 0:
+        return y
+    xt = _swap(x)
+    return y - x @ np.linalg.solve(xt @ x, xt @ y)
+
+def _johansen_stack(Y: np.ndarray, det_order: int, k: int):
+    """Eigenvalues and vectors for a (B, T, n) stack; per-slice fallback if any slice is singular."""
+    try:
+        return _johansen_eig(Y, det_order, k)
+    except np.linalg.LinAlgError:
+        if len(Y) == 1:
+            n = Y.shape[-1]
+            return np.full((1, n), np.nan), np.full((1, n, n), np.nan)
+        parts = [_johansen_stack(Y[i:i + 1], det_order, k) for i in range(len(Y))]
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+def _johansen_eig(Y: np.ndarray, det_order: int, k: int):
+    T = Y.shape[-2]
+    f = 0 if det_order > -1 else -1
+    Y = _detrend(Y, det_order)
+    dx = np.diff(Y, axis=-2)
+    # Row i (i = k..T-2 of dx) holds dx[i-1], ..., dx[i-k]
+    z = np.concatenate([dx[:, k - j:T - 1 - j] for j in range(1, k + 1)], axis=-1) if k else dx[:, k:, :0]
+    z = _detrend(z, f)
+    r0 = _resid(_detrend(dx[:, k:], f), z)
+    rk = _resid(_detrend(Y[:, 1:T - k], f), z)
+
+    t = rk.shape[-2]  # T - k - 1
+    skk = _swap(rk) @ rk / t
+    sk0 = _swap(rk) @ r0 / t
+    s00 = _swap(r0) @ r0 / t
+    A = sk0 @ np.linalg.solve(s00, _swap(sk0))
+    # skk^-1 A v = lambda v  <=>  (L^-1 A L^-T) w = lambda w, v = L^-T w
+    Linv = np.linalg.inv(np.linalg.cholesky(skk))
+    C = Linv @ A @ _swap(Linv)
+    eig, w = np.linalg.eigh((C + _swap(C)) / 2)
+    eig, w = eig[:, ::-1], w[:, :, ::-1]
+    evec = _swap(Linv) @ w
+    sign = np.sign(evec[:, :1, :])
+    return eig, evec * np.where(sign == 0, 1.0, sign)
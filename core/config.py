@@ -9,11 +9,17 @@ Environment Variables (optional overrides):
     STATARB_DEFAULT_WINDOW: Default rolling window size
     STATARB_DEFAULT_ENTRY_Z: Default entry z-score threshold
     STATARB_DEFAULT_EXIT_Z: Default exit z-score threshold
+    STATARB_CACHE_DIR: Directory for the columnar price cache
+    STATARB_PRECISION: Compute precision, "float64" (default) or "float32"
+    STATARB_EG_CACHE_SIZE: Engle-Granger results kept in memory (default 128)
+    STATARB_EG_CACHE_DIR: Directory for the on-disk Engle-Granger cache tier (off if unset)
 """
 
 import os
 from pathlib import Path
 
+import numpy as np
+
 # Paths
 PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
@@ -22,6 +28,32 @@ DEFAULT_DATA_PATH = DATA_DIR / "prices.csv"
 # Override with environment variable if set
 DATA_PATH = os.getenv("STATARB_DATA_PATH", str(DEFAULT_DATA_PATH))
 
+# Columnar price cache (see core/price_cache.py)
+CACHE_DIR = os.getenv("STATARB_CACHE_DIR", str(DATA_DIR / ".cache"))
+
+# Memoized Engle-Granger results (see core.coint.EngleGrangerCache)
+EG_CACHE_SIZE = int(os.getenv("STATARB_EG_CACHE_SIZE", "128"))
+EG_CACHE_DIR = os.getenv("STATARB_EG_CACHE_DIR") or None
+
+# Numeric precision of prices, spreads, z-scores, positions and returns.
+# float32 halves memory and bandwidth on universe-wide scans; compounding
+# (equity cumprod) and rolling variance are still accumulated in float64.
+PRECISIONS = ("float64", "float32")
+PRECISION = os.getenv("STATARB_PRECISION", "float64")
+if PRECISION not in PRECISIONS:
+    raise ValueError(f"STATARB_PRECISION must be one of {PRECISIONS}, got {PRECISION!r}")
+
+def get_dtype() -> np.dtype:
+    """Floating dtype the core pipeline computes in."""
+    return np.dtype(PRECISION)
+
+def set_precision(precision: str) -> None:
+    """Switch the core pipeline to "float64" or "float32" at runtime."""
+    global PRECISION
+    if precision not in PRECISIONS:
+        raise ValueError(f"precision must be one of {PRECISIONS}, got {precision!r}")
+    PRECISION = precision
+
 # Signal Generation Parameters
 DEFAULT_WINDOW = int(os.getenv("STATARB_DEFAULT_WINDOW", "60"))
 DEFAULT_ENTRY_Z = float(os.getenv("STATARB_DEFAULT_ENTRY_Z", "2.0"))
@@ -60,6 +92,8 @@ def get_config_summary() -> dict:
     """
     return {
         "data_path": DATA_PATH,
+        "cache_dir": CACHE_DIR,
+        "precision": PRECISION,
         "default_params": {
             "window": DEFAULT_WINDOW,
             "entry_z": DEFAULT_ENTRY_Z,
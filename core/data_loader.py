@@ -1,16 +1,65 @@
+import numpy as np
 import pandas as pd
-from typing import List, Optional
+from typing import List, Optional, Union
 
-def load_price_csv(path: str, date_col: str = "date", price_cols: Optional[List[str]] = None, index_col: Optional[str] = None) -> pd.DataFrame:
+from . import config, price_cache
+from .panel import PairView, PricePanel
+
+def load_price_csv(path: str, date_col: str = "date", price_cols: Optional[List[str]] = None, index_col: Optional[str] = None,
+                   use_cache: bool = True, cache_dir: Optional[str] = None, freq: Optional[str] = "B") -> pd.DataFrame:
     """
     - Load CSV of prices.
     - Parse date_col or index_col to datetime and set as index.
     - Sort by index.
     - Assume business-day frequency and forward-fill missing values.
+      Pass freq=None to keep the rows as they are (e.g. pre-resampled intraday
+      bars); large intraday files should go through core.intraday instead.
     - If price_cols is provided, keep only those columns; otherwise keep numeric columns.
+    - If use_cache, the parsed numeric panel is stored in a columnar cache
+      (see core.price_cache) and later loads memory-map it instead of re-parsing.
+    - price_cols is pushed down into the CSV read, so that parsing, resampling
+      and ffill only touch the requested columns: on a cache hit they are
+      selected from the cached panel, otherwise (or with use_cache=False) only
+      they are parsed, and with the cache on they are stored as an entry of
+      their own until a full load builds the whole panel (which evicts them).
+    - Price columns are returned in config.get_dtype() (the cache itself is
+      kept in float64, so only the selected columns are converted).
     """
-    # Read CSV
-    df = pd.read_csv(path)
+    if use_cache:
+        key = price_cache.cache_key(path, date_col=date_col, index_col=index_col, freq=freq)
+        df = price_cache.load_cached_frame(key, cache_dir)
+        if df is None and price_cols:
+            # No full panel yet: cache just the requested columns
+            key = price_cache.cache_key(path, date_col=date_col, index_col=index_col, freq=freq,
+                                        columns=sorted(set(price_cols)))
+            df = price_cache.load_cached_frame(key, cache_dir)
+        if df is None:
+            raw = _read_raw_prices(path, date_col, index_col, price_cols, dtype=np.float64)
+            df = _resample(raw, freq)
+            if isinstance(df.index, pd.DatetimeIndex):
+                df = df.select_dtypes(include=['number'])
+                stats = column_stats(raw[df.columns])
+                price_cache.store_frame(key, df, path, cache_dir, extra_meta={"stats": stats},
+                                        extra_arrays={"filled": filled_mask(raw[df.columns], df)},
+                                        subset=bool(price_cols))
+        if not price_cols or all(c in df.columns for c in price_cols):
+            return _to_precision(_select_columns(df, price_cols))
+        # A requested column is not numeric, so the cache does not hold it;
+        # fall through to a plain parse.
+
+    return _to_precision(_select_columns(_parse_price_csv(path, date_col, index_col, price_cols, freq), price_cols))
+
+def _parse_price_csv(path: str, date_col: str, index_col: Optional[str],
+                     price_cols: Optional[List[str]] = None, freq: Optional[str] = "B") -> pd.DataFrame:
+    return _resample(_read_raw_prices(path, date_col, index_col, price_cols), freq)
+
+def _read_raw_prices(path: str, date_col: str, index_col: Optional[str],
+                     price_cols: Optional[List[str]] = None, dtype=None) -> pd.DataFrame:
+    # Read CSV, restricted to the date column and price_cols when given
+    if price_cols:
+        df = _read_columns(path, date_col, index_col, price_cols, dtype)
+    else:
+        df = pd.read_csv(path)
     
     # Handle index/date column
     if index_col:
@@ -26,13 +75,72 @@ def load_price_csv(path: str, date_col: str = "date", price_cols: Optional[List[
 
     # Sort by index
     df.sort_index(inplace=True)
-    
-    # Resample to business day and ffill
+    return df
+
+def _resample(df: pd.DataFrame, freq: Optional[str] = "B") -> pd.DataFrame:
+    # Resample to business day (or freq) and ffill
     # We assume the index is a DatetimeIndex now
-    if isinstance(df.index, pd.DatetimeIndex):
-        df = df.asfreq('B')
+    if freq and isinstance(df.index, pd.DatetimeIndex):
+        df = df.asfreq(freq)
         df.ffill(inplace=True)
     
+    return df
+
+def filled_mask(raw: pd.DataFrame, df: pd.DataFrame) -> np.ndarray:
+    """
+    - Boolean (rows x tickers) mask of the cells in df that were forward-filled
+      (no observation in raw on that date, but a value after _resample).
+    - raw and df must have the same columns; see core.trading_calendar for its use.
+    """
+    observed = raw.reindex(df.index).notna().to_numpy()
+    return df.notna().to_numpy() & ~observed
+
+def column_stats(raw: pd.DataFrame) -> dict:
+    """
+    - Per-column first/last observation date and number of observations.
+    - Computed on the raw (pre-resample, pre-ffill) rows.
+    """
+    valid = raw.notna().to_numpy()
+    rows = valid.sum(axis=0)
+    first = valid.argmax(axis=0)
+    last = len(raw) - 1 - valid[::-1].argmax(axis=0)
+    dates = raw.index.strftime("%Y-%m-%d")
+    return {
+        str(col): {
+            "first_date": dates[first[i]] if rows[i] else None,
+            "last_date": dates[last[i]] if rows[i] else None,
+            "rows": int(rows[i]),
+        }
+        for i, col in enumerate(raw.columns)
+    }
+
+def _read_columns(path: str, date_col: str, index_col: Optional[str], price_cols: List[str],
+                  dtype=None) -> pd.DataFrame:
+    """
+    - Read only the date/index column and price_cols (header is read first).
+    - Missing tickers raise KeyError, as df[price_cols] would.
+    - Price columns are hinted as dtype (default: the configured float dtype;
+      the cache passes float64); if one is not numeric, retry without hints.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    missing = [c for c in price_cols if c not in header]
+    if missing:
+        raise KeyError(f"{missing} not in {path}")
+
+    key_col = index_col or (date_col if date_col in header else None)
+    usecols = ([key_col] if key_col else []) + [c for c in price_cols if c != key_col]
+    try:
+        return pd.read_csv(path, usecols=usecols, dtype={c: dtype or config.get_dtype() for c in price_cols})
+    except ValueError:
+        return pd.read_csv(path, usecols=usecols)
+
+def _to_precision(df: pd.DataFrame) -> pd.DataFrame:
+    # Cast float columns to the configured precision (no copy if already there)
+    dtype = config.get_dtype()
+    cast = {c: dtype for c, t in df.dtypes.items() if t.kind == "f" and t != dtype}
+    return df.astype(cast) if cast else df
+
+def _select_columns(df: pd.DataFrame, price_cols: Optional[List[str]]) -> pd.DataFrame:
     # Filter columns
     if price_cols:
         df = df[price_cols]
@@ -42,12 +150,16 @@ def load_price_csv(path: str, date_col: str = "date", price_cols: Optional[List[
         
     return df
 
-def align_pairs(df: pd.DataFrame, tickers: List[str]) -> pd.DataFrame:
+def align_pairs(df: Union[pd.DataFrame, PricePanel], tickers: List[str]) -> Union[pd.DataFrame, PairView]:
     """
     - Return df[tickers] subset.
     - Drop any rows with NaNs.
     - Ensure index is sorted.
+    - For a PricePanel, return a zero-copy PairView instead (see core.panel).
     """
+    if isinstance(df, PricePanel):
+        return df.pair(tickers[0], tickers[1])
+
     subset = df[tickers].copy()
     subset.dropna(inplace=True)
     subset.sort_index(inplace=True)
@@ -0,0 +1,175 @@
+"""
+Entry/exit threshold grids over one z-score series.
+
+mean_reversion_signals is a hysteresis rule: the position at t is set by
+the latest "event" up to t - an entry (|z| > entry_z, direction -sign(z))
+or an exit (|z| < exit_z, which wins on the same row). Entry events only
+depend on entry_z and exit events only on exit_z, so for a grid it is
+enough to track, per row,
+
+    A[t, e]   index of the latest entry event for entry_z[e]
+    B[t, x]   index of the latest exit event for exit_z[x]
+
+(one running maximum each) and the position for (e, x) is the direction
+at A[t, e] if A[t, e] > B[t, x], else flat. grid_positions returns that
+as a time x entry x exit tensor.
+
+grid_backtest reduces the tensor straight to backtest_spread_strategy +
+summarize_performance metrics for every cell: PnL moments and hit
+counts are matrix products with the spread changes, and compounded
+equity, drawdown and turnover come from one walk over time that updates
+all cells per row. Both work on chunks of entry thresholds to bound
+memory.
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+ArrayLike = Union[pd.Series, np.ndarray]
+
+# Elements per float64 chunk of the time x entry x exit tensor in grid_backtest (64 MB)
+_CHUNK_ELEMENTS = 8_000_000
+
+METRICS = ["total_pnl", "total_return", "sharpe", "max_drawdown", "hit_rate", "turnover"]
+
+@dataclass
+class GridResult:
+    """
+    Performance of every (entry_z, exit_z) combination.
+
+    - Each metric is an (entry, exit) array with the meaning it has in
+      core.metrics.PerformanceSummary; total_pnl is the summed spread PnL.
+    """
+    entry_z: np.ndarray
+    exit_z: np.ndarray
+    total_pnl: np.ndarray
+    total_return: np.ndarray
+    sharpe: np.ndarray
+    max_drawdown: np.ndarray
+    hit_rate: np.ndarray
+    turnover: np.ndarray
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per (entry_z, exit_z) with a column per metric."""
+        index = pd.MultiIndex.from_product([self.entry_z, self.exit_z], names=["entry_z", "exit_z"])
+        return pd.DataFrame({m: getattr(self, m).ravel() for m in METRICS}, index=index)
+
+    def best(self, metric: str = "sharpe") -> pd.Series:
+        """The row of to_frame() with the highest metric."""
+        frame = self.to_frame()
+        return frame.loc[frame[metric].idxmax()]
+
+def _last_events(z: np.ndarray, entry_z: np.ndarray, exit_z: np.ndarray):
+    rows = np.arange(len(z))[:, None]
+    absz = np.abs(z)[:, None]
+    A = np.where(absz > entry_z[None, :], rows, -1)
+    B = np.where(absz < exit_z[None, :], rows, -1)
+    np.maximum.accumulate(A, axis=0, out=A)
+    np.maximum.accumulate(B, axis=0, out=B)
+    direction = -np.sign(np.nan_to_num(z)).astype(np.int8)
+    return A, B, direction
+
+def _positions(A: np.ndarray, B: np.ndarray, direction: np.ndarray, dtype) -> np.ndarray:
+    held = direction[np.maximum(A, 0)].astype(dtype)
+    return np.where(A[:, :, None] > B[:, None, :], held[:, :, None], dtype(0))
+
+def grid_positions(z: ArrayLike, entry_z: Sequence[float], exit_z: Sequence[float]) -> np.ndarray:
+    """
+    - (time, entry, exit) int8 tensor of positions; [:, i, j] equals
+      mean_reversion_signals(z, entry_z[i], exit_z[j]).
+    """
+    entry_z = np.asarray(entry_z, dtype=float)
+    exit_z = np.asarray(exit_z, dtype=float)
+    A, B, direction = _last_events(np.asarray(z, dtype=float), entry_z, exit_z)
+    return _positions(A, B, direction, np.int8)
+
+def grid_backtest(spread: ArrayLike, z: ArrayLike, entry_z: Sequence[float], exit_z: Sequence[float],
+                  notional: float = 1.0, capital: Optional[float] = None,
+                  periods_per_year: int = 252) -> GridResult:
+    """
+    - Every (entry_z, exit_z) pair run through mean_reversion_signals,
+      backtest_spread_strategy(spread, signals, notional) and
+      summarize_performance on returns = pnl / capital, without a per-pair
+      pandas pipeline.
+    - capital defaults to abs(notional), i.e. the backtester's returns;
+      pass the capital base (e.g. the backend's average gross price) to
+      score returns on it.
+    - spread and z are aligned by position (a Series spread is reindexed
+      to z's index); rows where the spread is NaN are dropped, as the
+      backtester does.
+    """
+    if isinstance(spread, pd.Series) and isinstance(z, pd.Series):
+        spread = spread.reindex(z.index)
+    S = np.asarray(spread, dtype=np.float64)
+    Z = np.asarray(z, dtype=float)
+    if S.shape != Z.shape or S.ndim != 1:
+        raise ValueError("spread and z must be 1-D and of equal length")
+    entry_z = np.asarray(entry_z, dtype=float)
+    exit_z = np.asarray(exit_z, dtype=float)
+    base = abs(notional) if capital is None else capital
+    scale = notional / base
+
+    A, B, direction = _last_events(Z, entry_z, exit_z)
+    keep = ~np.isnan(S)
+    A, B, S = A[keep], B[keep], S[keep]
+    n, n_exit = len(S), len(exit_z)
+
+    ds = np.diff(S) * scale  # return per unit position at rows 1..n-1
+    sgn = np.sign(ds)
+    shape = (len(entry_z), n_exit)
+    out = {m: np.zeros(shape) for m in METRICS}
+    step = max(1, _CHUNK_ELEMENTS // max(n * n_exit, 1))
+    for lo in range(0, len(entry_z), step):
+        sl = slice(lo, lo + step)
+        P = _positions(A[:, sl], B, direction, np.float64)  # (n, entries, exits)
+        flat = P[:-1].reshape(n - 1, -1)  # position held over each return
+        absP = np.abs(flat)
+
+        sum_r = ds @ flat
+        sum_r2 = (ds * ds) @ absP
+        hits = (np.abs(sgn) @ absP + sgn @ flat) / 2
+        nonzero = np.abs(sgn) @ absP
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = sum_r / n  # the first return (NaN in the backtester) counts as 0
+            std = np.sqrt(np.maximum(sum_r2 - n * mean * mean, 0.0) / (n - 1))
+            sharpe = np.where(std > 0, mean / std * np.sqrt(periods_per_year), 0.0)
+            hit_rate = np.where(nonzero > 0, hits / nonzero, 0.0)
+
+        total_return, drawdown, turnover = _path_metrics(P, ds)
+        cells = (-1, n_exit)
+        out["total_pnl"][sl] = (sum_r * base).reshape(cells)
+        out["total_return"][sl] = total_return.reshape(cells)
+        out["sharpe"][sl] = sharpe.reshape(cells)
+        out["max_drawdown"][sl] = drawdown.reshape(cells)
+        out["hit_rate"][sl] = hit_rate.reshape(cells)
+        out["turnover"][sl] = turnover.reshape(cells)
+
+    return GridResult(entry_z=entry_z, exit_z=exit_z, **out)
+
+def _path_metrics(P: np.ndarray, ds: np.ndarray):
+    """
+    - Compounded total return, max drawdown and turnover of every cell of a
+      (time, entries, exits) position chunk, as summarize_performance gives
+      for returns_t = P[t - 1] * ds[t - 1].
+    - Walks time one row of cells at a time: the running equity, peak and
+      worst equity / peak stay in cache, where cumprod / maximum.accumulate
+      along axis 0 would stream the whole tensor several times.
+    """
+    rows = P.reshape(len(P), -1)
+    cells = rows.shape[1]
+    equity, peak, worst = np.ones(cells), np.ones(cells), np.ones(cells)
+    turnover, tmp = np.zeros(cells), np.empty(cells)
+    for t in range(1, len(rows)):
+        np.multiply(rows[t - 1], ds[t - 1], out=tmp)
+        tmp += 1.0
+        equity *= tmp
+        np.maximum(peak, equity, out=peak)
+        np.divide(equity, peak, out=tmp)
+        np.minimum(worst, tmp, out=worst)
+        np.subtract(rows[t], rows[t - 1], out=tmp)
+        np.abs(tmp, out=tmp)
+        turnover += tmp
+    return equity - 1.0, worst - 1.0, turnover
@@ -0,0 +1,105 @@
+"""
+Chunked ingestion of intraday price files.
+
+Minute-bar files are far too large to load with load_price_csv (which also
+forces a business-day calendar). ingest_intraday_csv streams a wide CSV
+(timestamp column + one price column per ticker) in fixed-size blocks,
+resamples each block to the requested bar size in the same pass, and
+appends the bars to compact binary arrays:
+
+    <out_dir>/index.bin    int64 bar-start timestamps (ns)
+    <out_dir>/values.bin   float32 (or float64) bar closes, row-major
+    <out_dir>/meta.json    tickers, dtype, bar size, row count
+
+Only one block (plus the rows of one unfinished bar) is held in memory at
+a time, so peak memory depends on chunksize, not on file size. Input rows
+must be in time order.
+"""
+
+import json
+import os
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+def ingest_intraday_csv(path: str, out_dir: str, bar_size: str = "1min", time_col: str = "timestamp",
+                        price_cols: Optional[List[str]] = None, chunksize: int = 500_000,
+                        dtype: np.dtype = np.float32) -> dict:
+    """
+    - Stream path in blocks of chunksize rows.
+    - Floor timestamps to bar_size and keep the last price per bar and ticker (the bar close).
+    - Bars with no trades are skipped, not forward-filled.
+    - The last bar of each block is carried into the next block, so bars
+      that straddle a block boundary are closed correctly.
+    - Return the metadata written to meta.json.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    if time_col not in header:
+        raise KeyError(f"{time_col} not in {path}")
+    cols = list(price_cols) if price_cols else [c for c in header if c != time_col]
+    freq = pd.tseries.frequencies.to_offset(bar_size)
+
+    os.makedirs(out_dir, exist_ok=True)
+    index_path = os.path.join(out_dir, "index.bin")
+    values_path = os.path.join(out_dir, "values.bin")
+
+    n_rows = 0
+    last_ts = None
+    carry = None
+    reader = pd.read_csv(path, usecols=[time_col] + cols, chunksize=chunksize,
+                         dtype={c: np.float64 for c in cols})
+    with open(index_path, "wb") as f_index, open(values_path, "wb") as f_values:
+        def write(bars: pd.DataFrame) -> int:
+            bars.index.as_unit("ns").asi8.tofile(f_index)
+            np.ascontiguousarray(bars[cols].to_numpy(dtype=dtype)).tofile(f_values)
+            return len(bars)
+
+        for chunk in reader:
+            ts = pd.to_datetime(chunk[time_col])
+            if not ts.is_monotonic_increasing or (last_ts is not None and ts.iloc[0] < last_ts):
+                raise ValueError(f"{path}: rows must be sorted by {time_col}")
+            last_ts = ts.iloc[-1]
+
+            block = chunk[cols].set_axis(pd.DatetimeIndex(ts).floor(freq))
+            if carry is not None:
+                block = pd.concat([carry, block])
+
+            # Keep the (possibly unfinished) last bar for the next block
+            open_bar = block.index[-1]
+            done = block.index < open_bar
+            carry = block[~done]
+            if done.any():
+                n_rows += write(block[done].groupby(level=0, sort=False).last())
+
+        if carry is not None and len(carry):
+            n_rows += write(carry.groupby(level=0, sort=False).last())
+
+    meta = {
+        "source": os.path.abspath(path),
+        "columns": cols,
+        "dtype": np.dtype(dtype).name,
+        "bar_size": bar_size,
+        "rows": n_rows,
+    }
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    return meta
+
+def load_intraday(out_dir: str, price_cols: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    - Open arrays written by ingest_intraday_csv as a DataFrame.
+    - Values are memory-mapped (copy-on-write); only price_cols are materialised if given.
+    """
+    with open(os.path.join(out_dir, "meta.json")) as f:
+        meta = json.load(f)
+    n, cols = meta["rows"], meta["columns"]
+    index = pd.DatetimeIndex(np.fromfile(os.path.join(out_dir, "index.bin"), dtype=np.int64).view("datetime64[ns]"))
+    if n:
+        values = np.memmap(os.path.join(out_dir, "values.bin"), dtype=meta["dtype"], mode="c", shape=(n, len(cols)))
+    else:
+        values = np.empty((0, len(cols)), dtype=meta["dtype"])
+    if price_cols:
+        pos = [cols.index(c) for c in price_cols]
+        return pd.DataFrame(values[:, pos], index=index, columns=list(price_cols))
+    return pd.DataFrame(values, index=index, columns=cols, copy=False)
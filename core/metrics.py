@@ -14,7 +14,9 @@ def sharpe_ratio(returns: pd.Series, periods_per_year: int = 252) -> float:
     """
     - Annualized Sharpe with zero risk-free rate.
     - Handle edge cases where std is 0 or NaN by returning 0.0.
+    - Moments are accumulated in float64 whatever the input precision.
     """
+    returns = returns.astype(np.float64)
     mean_ret = returns.mean()
     std_ret = returns.std()
     
@@ -49,7 +51,7 @@ def hit_rate(returns: pd.Series) -> float:
 
 def summarize_performance(returns: pd.Series, turnover: float, periods_per_year: int = 252) -> PerformanceSummary:
     """
-    - Build equity curve: (1 + returns).cumprod().
+    - Build equity curve: (1 + returns).cumprod(), compounded in float64.
     - total_return = final_equity - 1.
     - Compute sharpe, max_drawdown, hit_rate.
     - Pass in known turnover.
@@ -57,8 +59,8 @@ def summarize_performance(returns: pd.Series, turnover: float, periods_per_year:
     # Handle NaNs in returns (e.g. from shift)
     clean_returns = returns.fillna(0)
     
-    # Equity curve starting at 1
-    equity_curve = (1 + clean_returns).cumprod()
+    # Equity curve starting at 1 (float32 compounding drifts over long samples)
+    equity_curve = (1 + clean_returns.astype(np.float64)).cumprod()
     
     # Total return
     if equity_curve.empty:
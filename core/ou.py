@@ -0,0 +1,113 @@
+"""
+Rolling Ornstein-Uhlenbeck parameters of spreads from window moments.
+
+An OU process sampled once per bar is an AR(1),
+
+    s_t = a + phi * s_{t-1} + e_t,    e_t ~ N(0, sigma_e^2)
+
+with mean-reversion speed kappa = -ln(phi) per bar, long-run mean
+mu = a / (1 - phi), diffusion sigma = sigma_e * sqrt(2 kappa / (1 - phi^2))
+and half-life ln(2) / kappa. The AR(1) fit over a window only needs the
+window sums of u = s_{t-1}, v = s_t, u^2, v^2 and uv over the transitions
+where both ends are known, so every window of every spread follows from
+column-wise prefix sums in O(n) - no per-window regression.
+
+Spreads are residuals of a fitted pair and stay near their own mean, so
+centring each column on its mean is enough to keep the sums accurate.
+A Series gives one row of parameters per bar; a DataFrame of spreads is
+done in one batch and gives (parameter, spread) columns.
+"""
+
+import warnings
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["phi", "kappa", "mu", "sigma", "half_life"]
+
+def rolling_ou(spread: Union[pd.Series, pd.DataFrame, np.ndarray], window: int = 60,
+               min_periods: Optional[int] = None) -> pd.DataFrame:
+    """
+    - AR(1) / OU fit over every trailing window of `window` rows; row t is
+      the window ending at (and including) t, i.e. its window - 1 transitions.
+    - Transitions with a NaN end are left out; windows with fewer than
+      min_periods usable transitions (default: all of them) are NaN.
+    - kappa and half_life are per bar. A window with phi >= 1 does not
+      mean-revert: half_life is inf and mu / sigma are NaN; phi <= 0 gives
+      NaN for everything but phi.
+    - Series / 1-D input: columns phi, kappa, mu, sigma, half_life.
+      DataFrame / 2-D input: (parameter, spread) MultiIndex columns, so
+      result["half_life"] is a bars x spreads frame.
+    """
+    if window < 3:
+        raise ValueError("window must be at least 3")
+    min_periods = window - 1 if min_periods is None else min_periods
+    if not 2 < min_periods <= window - 1:
+        raise ValueError("min_periods must be between 3 and window - 1")
+
+    index = spread.index if isinstance(spread, (pd.Series, pd.DataFrame)) else None
+    S = np.asarray(spread, dtype=float)
+    one_d = S.ndim == 1
+    S2 = S[:, None] if one_d else S
+    n = S2.shape[0]
+    index = index if index is not None else pd.RangeIndex(n)
+
+    params = np.full((n, S2.shape[1], len(COLUMNS)), np.nan)
+    if n >= window:
+        params[window - 1:] = _ou_windows(S2, window, min_periods)
+
+    if one_d:
+        return pd.DataFrame(params[:, 0], index=index, columns=COLUMNS)
+    names = spread.columns if isinstance(spread, pd.DataFrame) else pd.RangeIndex(S2.shape[1])
+    columns = pd.MultiIndex.from_product([COLUMNS, names], names=["param", "spread"])
+    return pd.DataFrame(params.transpose(0, 2, 1).reshape(n, -1), index=index, columns=columns)
+
+def ou_fit(spreads: Union[pd.Series, pd.DataFrame], min_obs: int = 30) -> Union[pd.Series, pd.DataFrame]:
+    """
+    - Full-sample OU parameters: one row per spread (a Series for one spread).
+    - Each spread uses every transition where both ends are known; fewer
+      than min_obs of them gives NaN.
+    """
+    frame = spreads.to_frame() if isinstance(spreads, pd.Series) else spreads
+    n = len(frame)
+    min_obs = max(min_obs, 3)
+    if n - 1 < min_obs:
+        out = pd.DataFrame(np.nan, index=frame.columns, columns=COLUMNS)
+    else:
+        out = rolling_ou(frame, window=n, min_periods=min_obs).iloc[-1].unstack("param")[COLUMNS]
+    return out.iloc[0].rename(spreads.name) if isinstance(spreads, pd.Series) else out
+
+def _ou_windows(S: np.ndarray, w: int, min_periods: int) -> np.ndarray:
+    """(n - w + 1, spreads, 5) OU parameters of every full window."""
+    n = S.shape[0]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN spreads
+        centre = np.nan_to_num(np.nanmean(S, axis=0))
+    D = S - centre
+    u, v = D[:-1], D[1:]
+    ok = ~(np.isnan(u) | np.isnan(v))
+    u, v = np.where(ok, u, 0.0), np.where(ok, v, 0.0)
+
+    # Prefix sums over transitions; transition k links rows k and k + 1
+    P = np.zeros((n, S.shape[1], 6))
+    np.cumsum(np.stack([ok.astype(float), u, v, u * u, v * v, u * v], axis=-1), axis=0, out=P[1:])
+    ends = np.arange(w - 1, n)
+    cnt, su, sv, suu, svv, suv = np.moveaxis(P[ends] - P[ends - w + 1], -1, 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        Suu = suu - su * su / cnt
+        Suv = suv - su * sv / cnt
+        Svv = svv - sv * sv / cnt
+        phi = Suv / Suu
+        a = (sv - phi * su) / cnt + centre * (1 - phi)
+        sigma_e2 = np.maximum(Svv - Suv * phi, 0.0) / (cnt - 2)
+        reverting = (phi > 0) & (phi < 1)
+        kappa = np.where(phi > 0, -np.log(phi), np.nan)
+        mu = np.where(reverting, a / (1 - phi), np.nan)
+        sigma = np.where(reverting, np.sqrt(sigma_e2 * 2 * kappa / (1 - phi * phi)), np.nan)
+        half_life = np.where(reverting, np.log(2) / kappa, np.where(phi >= 1, np.inf, np.nan))
+
+    out = np.stack([phi, kappa, mu, sigma, half_life], axis=-1)
+    out[(cnt < min_periods) | ~(Suu > 0)] = np.nan
+    return out
@@ -0,0 +1,137 @@
+"""
+Zero-copy price panel for pair scans.
+
+A PricePanel holds every ticker in one column-major float matrix with a
+shared DatetimeIndex, so each ticker's history is a contiguous 1-D view.
+Pair access returns NumPy views over the jointly valid date range instead
+of copying a DataFrame subset per pair.
+"""
+
+from itertools import combinations
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+class PairView:
+    """
+    Two aligned price columns of a PricePanel.
+
+    - y, x: views into the panel matrix, trimmed to the jointly valid range.
+    - mask: joint-validity mask over that range (all True unless a ticker
+      has interior gaps that survived forward-filling).
+    - index: the matching slice of the panel's DatetimeIndex.
+    """
+
+    __slots__ = ("tickers", "index", "y", "x", "mask", "_contiguous")
+
+    def __init__(self, tickers: Tuple[str, str], index: pd.DatetimeIndex,
+                 y: np.ndarray, x: np.ndarray, mask: np.ndarray,
+                 contiguous: Optional[bool] = None):
+        self.tickers = tickers
+        self.index = index
+        self.y = y
+        self.x = x
+        self.mask = mask
+        self._contiguous = contiguous
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def contiguous(self) -> bool:
+        """True if y and x are valid on every row, i.e. usable without masking."""
+        if self._contiguous is None:
+            self._contiguous = bool(self.mask.all())
+        return self._contiguous
+
+    def aligned(self) -> Tuple[pd.DatetimeIndex, np.ndarray, np.ndarray]:
+        """
+        - Return (index, y, x) restricted to jointly valid rows.
+        - No copy is made when the pair is contiguous.
+        """
+        if self.contiguous:
+            return self.index, self.y, self.x
+        return self.index[self.mask], self.y[self.mask], self.x[self.mask]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Equivalent of align_pairs(df, tickers) on the source DataFrame."""
+        index, y, x = self.aligned()
+        return pd.DataFrame({self.tickers[0]: y, self.tickers[1]: x}, index=index)
+
+class PricePanel:
+    """
+    Contiguous price matrix with a shared DatetimeIndex.
+
+    - values: (n_dates, n_tickers) float matrix in column-major order.
+    - columns: ticker -> column position.
+    - valid: per-column validity mask (not NaN), computed once.
+    """
+
+    def __init__(self, values: np.ndarray, index: pd.DatetimeIndex, tickers: Sequence[str],
+                 dtype: Optional[np.dtype] = None):
+        values = np.asarray(values)
+        # Column-major so each ticker is one contiguous block. For a float64
+        # memmap from the price cache this is a no-op, not a copy.
+        self.values = np.asfortranarray(values, dtype=dtype or values.dtype)
+        if self.values.ndim != 2 or self.values.shape != (len(index), len(tickers)):
+            raise ValueError("values must have shape (len(index), len(tickers))")
+        if not index.is_monotonic_increasing:
+            raise ValueError("index must be sorted")
+
+        self.index = index
+        self.tickers: List[str] = list(tickers)
+        self.columns = {t: i for i, t in enumerate(self.tickers)}
+        self.valid = np.asfortranarray(~np.isnan(self.values))
+
+        # First/last valid row per column and whether the valid rows form one
+        # run; lets pair() build the joint range in O(1) for typical
+        # forward-filled data where the only gaps are leading NaNs.
+        any_valid = self.valid.any(axis=0)
+        n = len(index)
+        self._first = np.where(any_valid, self.valid.argmax(axis=0), n)
+        self._stop = np.where(any_valid, n - self.valid[::-1].argmax(axis=0), n)
+        self._dense = self.valid.sum(axis=0) == (self._stop - self._first)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, dtype: Optional[np.dtype] = None) -> "PricePanel":
+        """Build a panel from a DatetimeIndex-ed frame of numeric price columns."""
+        return cls(df.to_numpy(), df.index, [str(c) for c in df.columns], dtype=dtype)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.values.shape
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.columns
+
+    def column(self, ticker: str) -> np.ndarray:
+        """Contiguous view of one ticker's full history."""
+        return self.values[:, self.columns[ticker]]
+
+    def pair(self, y_ticker: str, x_ticker: str) -> PairView:
+        """
+        - Return y/x views trimmed to the rows where both tickers have data.
+        - The joint-validity mask is only materialised for gappy columns.
+        """
+        i, j = self.columns[y_ticker], self.columns[x_ticker]
+        start = max(self._first[i], self._first[j])
+        stop = max(start, min(self._stop[i], self._stop[j]))
+        dense = bool(self._dense[i] and self._dense[j])
+        if dense:
+            mask = np.ones(stop - start, dtype=bool)
+        else:
+            mask = self.valid[start:stop, i] & self.valid[start:stop, j]
+        return PairView(
+            (y_ticker, x_ticker),
+            self.index[start:stop],
+            self.values[start:stop, i],
+            self.values[start:stop, j],
+            mask,
+            contiguous=True if dense else None,
+        )
+
+    def iter_pairs(self) -> Iterator[PairView]:
+        """Yield a PairView for every unordered pair of tickers."""
+        for a, b in combinations(self.tickers, 2):
+            yield self.pair(a, b)
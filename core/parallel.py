@@ -0,0 +1,164 @@
+"""
+Process-pool execution of rolling cointegration and the pair scanner.
+
+Both workloads are CPU-bound NumPy on one price matrix. The matrix is
+copied once into a multiprocessing.shared_memory block; workers attach to
+it by name instead of receiving pickled copies, and rolling p-values are
+written straight into a shared output matrix. Work is split as:
+
+    rolling_coint_matrix   chunks of pairs, or chunks of window end rows
+                           when there are fewer pairs than workers
+    parallel_scan_pairs    interleaved ticker blocks of the scanner, merged
+                           into one top-k at the end
+
+workers=1 runs the same code in-process, without a pool.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .panel import PricePanel
+from .rolling_coint import rolling_engle_granger
+from .scanner import _TICKER_BLOCK, PairScanResult, _check_args, _results, _scan_blocks, _TopK
+
+class SharedArray:
+    """A float64 Fortran-order array in a named shared-memory block."""
+
+    def __init__(self, shape: Tuple[int, ...], fill: Optional[np.ndarray] = None):
+        self.shape = tuple(shape)
+        nbytes = max(int(np.prod(self.shape)) * 8, 1)
+        self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self.name = self._shm.name
+        self.array = np.ndarray(self.shape, dtype=np.float64, buffer=self._shm.buf, order="F")
+        if fill is not None:
+            self.array[...] = fill
+
+    @property
+    def spec(self) -> Tuple[str, Tuple[int, ...]]:
+        return self.name, self.shape
+
+    def close(self) -> None:
+        self.array = None
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> "SharedArray":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+# Per-process views of the shared blocks, set by _attach
+_WORKER = {}
+
+def _attach(specs) -> None:
+    """Pool initializer: map each shared block ({key: (name, shape)}) into this worker."""
+    for key, (name, shape) in specs.items():
+        # Workers share the parent's resource tracker, so attaching here
+        # doesn't add a second owner; the parent unlinks the block.
+        shm = shared_memory.SharedMemory(name=name)
+        _WORKER[key] = (shm, np.ndarray(shape, dtype=np.float64, buffer=shm.buf, order="F"))
+
+def _array(key: str) -> np.ndarray:
+    return _WORKER[key][1]
+
+def _run(tasks, fn, workers: int, **shared) -> list:
+    """Run fn over tasks, in-process for one worker, else on a pool attached to shared."""
+    if workers <= 1 or len(tasks) <= 1:
+        _WORKER.update({k: (None, a.array) for k, a in shared.items()})
+        try:
+            return [fn(t) for t in tasks]
+        finally:
+            for k in shared:
+                _WORKER.pop(k, None)
+    specs = {k: a.spec for k, a in shared.items()}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(specs,)) as pool:
+        return list(pool.map(fn, tasks))
+
+def _default_workers(workers: Optional[int]) -> int:
+    return max(1, workers or os.cpu_count() or 1)
+
+def _rolling_task(task) -> None:
+    pair_cols, end_lo, end_hi, window, maxlag, autolag = task
+    prices, out = _array("prices"), _array("out")
+    row_lo = max(0, end_lo - window + 1)
+    for k, (i, j) in pair_cols:
+        res = rolling_engle_granger(prices[row_lo:end_hi, i], prices[row_lo:end_hi, j],
+                                    window, maxlag=maxlag, autolag=autolag)
+        out[end_lo:end_hi, k] = res["pvalue"].to_numpy()[end_lo - row_lo:]
+
+def rolling_coint_matrix(prices: pd.DataFrame, pairs: Optional[Sequence[Tuple[str, str]]] = None,
+                         window: int = 252, maxlag: Optional[int] = None, autolag: Optional[str] = "aic",
+                         workers: Optional[int] = None, chunks_per_worker: int = 4) -> pd.DataFrame:
+    """
+    - rolling_engle_granger p-values for many pairs, across worker processes.
+    - pairs: (y, x) column pairs of prices; default every pair in column order.
+    - Return a frame indexed like prices with one (y, x) column per pair;
+      row t is the window ending at (and including) t.
+    - workers defaults to os.cpu_count(). With fewer pairs than workers
+      each pair's window end rows are split across workers instead.
+    """
+    pairs = list(pairs) if pairs is not None else list(combinations(prices.columns, 2))
+    col = {c: k for k, c in enumerate(prices.columns)}
+    pair_cols = [(k, (col[y], col[x])) for k, (y, x) in enumerate(pairs)]
+    n = len(prices)
+    workers = _default_workers(workers)
+
+    if len(pairs) >= workers:
+        n_chunks = min(len(pairs), workers * chunks_per_worker)
+        tasks = [(chunk, 0, n) for chunk in np.array_split(np.array(pair_cols, dtype=object), n_chunks)]
+    else:
+        n_chunks = max(1, workers * chunks_per_worker // max(len(pairs), 1))
+        edges = np.linspace(window - 1, n, n_chunks + 1).astype(int) if n >= window else np.array([0, n])
+        tasks = [([pc], lo, hi) for pc in pair_cols for lo, hi in zip(edges[:-1], edges[1:]) if hi > lo]
+    tasks = [([tuple(pc) for pc in chunk], lo, hi, window, maxlag, autolag) for chunk, lo, hi in tasks]
+
+    values = prices.to_numpy(dtype=np.float64)
+    with SharedArray(values.shape, values) as shared_prices, SharedArray((n, len(pairs)), np.nan) as out:
+        _run(tasks, _rolling_task, workers, prices=shared_prices, out=out)
+        result = np.array(out.array)
+    columns = pd.MultiIndex.from_tuples(pairs, names=["y", "x"])
+    return pd.DataFrame(result, index=prices.index, columns=columns)
+
+def _scan_task(task):
+    bounds, tickers, kwargs = task
+    prices = _array("prices")
+    panel = PricePanel(prices, pd.RangeIndex(prices.shape[0]), tickers)
+    return _scan_blocks(panel, bounds, **kwargs).parts
+
+def parallel_scan_pairs(prices: pd.DataFrame, top_k: Optional[int] = 50, maxlag: int = 1,
+                        regression: str = "c", autolag: Optional[str] = "AIC", min_obs: int = 60,
+                        both_directions: bool = False, block_size: int = 512,
+                        workers: Optional[int] = None) -> List[PairScanResult]:
+    """
+    - scan_pairs with its ticker blocks spread over worker processes; same
+      arguments and the same results.
+    - Blocks near the start of the universe pair with more tickers, so
+      each worker gets an interleaved set of blocks to balance the load.
+    """
+    _check_args(maxlag, regression, autolag)
+    workers = _default_workers(workers)
+    tickers = [str(c) for c in prices.columns]
+    n_tickers = len(tickers)
+    size = int(np.clip(np.ceil(n_tickers / (4 * workers)), 16, _TICKER_BLOCK))
+    bounds = [(lo, min(lo + size, n_tickers)) for lo in range(0, n_tickers, size)]
+    kwargs = dict(top_k=top_k, maxlag=maxlag, regression=regression, autolag=autolag,
+                  min_obs=min_obs, both_directions=both_directions, block_size=block_size)
+    tasks = [(bounds[w::workers], tickers, kwargs) for w in range(min(workers, len(bounds)))]
+
+    values = prices.to_numpy(dtype=np.float64)
+    with SharedArray(values.shape, values) as shared_prices:
+        parts = _run(tasks, _scan_task, workers, prices=shared_prices)
+
+    best = _TopK(top_k)
+    for worker_parts in parts:
+        for part in worker_parts:
+            best.add(*part)
+    panel = PricePanel.from_frame(prices, dtype=np.float64)
+    return _results(panel, best, regression)
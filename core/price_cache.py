@@ -0,0 +1,169 @@
+"""
+Columnar on-disk cache for parsed price panels.
+
+Parsing a CSV, converting dates, resampling to business days and
+forward-filling is by far the most expensive part of loading prices. This
+module stores the result of that work once as plain NumPy arrays:
+
+    <cache_dir>/<key>/
+        values.npy   float64 matrix (rows x tickers), column-major
+        index.npy    int64 timestamps (unit recorded in meta.json)
+        <name>.npy   optional extra arrays (e.g. the forward-fill mask)
+        meta.json    tickers, index frequency, source file and per-ticker stats
+
+An entry holds either the whole numeric panel of a file or, for a load
+that only asked for some columns before the panel was cached, just those
+columns (a subset entry). Subset entries are dropped as soon as the full
+panel of the same file version is stored, since it serves any selection.
+
+The key is a hash of the source path, its mtime and size, and the loader
+arguments, so editing or replacing the CSV invalidates the entry
+automatically. Cached arrays are memory-mapped on load, so opening even a
+very wide panel costs little more than reading the metadata.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import config
+
+CACHE_VERSION = 3
+
+def cache_key(path: str, **loader_args) -> str:
+    """
+    - Hash the absolute source path, its mtime/size and the loader arguments.
+    - Any change to the file (or to how it is parsed) yields a new key.
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    payload = {
+        "version": CACHE_VERSION,
+        "path": path,
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "args": loader_args,
+    }
+    blob = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha1(blob).hexdigest()
+
+def _entry_dir(key: str, cache_dir: Optional[str]) -> str:
+    return os.path.join(cache_dir or config.CACHE_DIR, key)
+
+def load_cached_frame(key: str, cache_dir: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    - Return the cached panel for key as a DataFrame backed by a memmap.
+    - The map is copy-on-write: callers may modify the frame in place, and
+      the touched pages become private without ever writing to the cache.
+    - Return None if there is no (complete) entry.
+    """
+    entry = _entry_dir(key, cache_dir)
+    meta_path = os.path.join(entry, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        values = np.load(os.path.join(entry, "values.npy"), mmap_mode="c")
+        stamps = np.load(os.path.join(entry, "index.npy"))
+    except (OSError, ValueError):
+        return None
+
+    unit = meta.get("index_unit", "ns")
+    index = pd.DatetimeIndex(stamps.view(f"datetime64[{unit}]"), name=meta["index_name"])
+    if meta.get("freq"):
+        index.freq = meta["freq"]
+    # Column-major storage means the transposed block pandas keeps internally
+    # is C-contiguous, so no copy is made here.
+    return pd.DataFrame(values, index=index, columns=meta["columns"], copy=False)
+
+def load_meta(key: str, cache_dir: Optional[str] = None) -> Optional[dict]:
+    """
+    - Return the metadata of a cache entry without touching its arrays.
+    - Return None if there is no entry for key.
+    """
+    try:
+        with open(os.path.join(_entry_dir(key, cache_dir), "meta.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def load_array(key: str, name: str, cache_dir: Optional[str] = None) -> Optional[np.ndarray]:
+    """
+    - Return an extra array stored with store_frame(..., extra_arrays={name: ...}).
+    - Return None if the entry or the array does not exist.
+    """
+    try:
+        return np.load(os.path.join(_entry_dir(key, cache_dir), f"{name}.npy"))
+    except (OSError, ValueError):
+        return None
+
+def store_frame(key: str, df: pd.DataFrame, source: str, cache_dir: Optional[str] = None,
+                extra_meta: Optional[dict] = None, extra_arrays: Optional[Dict[str, np.ndarray]] = None,
+                subset: bool = False) -> None:
+    """
+    - Write a numeric, DatetimeIndex-ed frame to the cache under key.
+    - extra_meta is stored alongside (e.g. per-ticker stats) and returned by load_meta.
+    - extra_arrays are saved as <name>.npy and read back with load_array.
+    - The entry is written to a temporary directory and renamed into place,
+      so concurrent readers never see a half-written entry.
+    - Entries built from an older version of the same source file are removed,
+      and so are subset entries (subset=True: only some of the file's columns)
+      once a full entry for the current version is stored.
+    """
+    root = cache_dir or config.CACHE_DIR
+    os.makedirs(root, exist_ok=True)
+    source = os.path.abspath(source)
+    st = os.stat(source)
+
+    tmp = tempfile.mkdtemp(prefix=".tmp-", dir=root)
+    try:
+        np.save(os.path.join(tmp, "values.npy"), np.asfortranarray(df.to_numpy(dtype=np.float64)))
+        np.save(os.path.join(tmp, "index.npy"), df.index.asi8)
+        for name, arr in (extra_arrays or {}).items():
+            np.save(os.path.join(tmp, f"{name}.npy"), arr)
+        meta = {
+            "version": CACHE_VERSION,
+            "source": source,
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "columns": [str(c) for c in df.columns],
+            "index_name": df.index.name,
+            "index_unit": df.index.unit,
+            "freq": df.index.freqstr,
+            "subset": subset,
+            **(extra_meta or {}),
+        }
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, _entry_dir(key, root))
+    except OSError:
+        # Another process won the race (or the disk is read-only); the cache
+        # is an optimisation, so fall back to the freshly parsed frame.
+        shutil.rmtree(tmp, ignore_errors=True)
+        return
+
+    _evict_stale(root, source, st, drop_subsets=not subset)
+
+def _evict_stale(root: str, source: str, st: os.stat_result, drop_subsets: bool = False) -> None:
+    for name in os.listdir(root):
+        if name.startswith("."):
+            continue
+        meta_path = os.path.join(root, name, "meta.json")
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if meta.get("source") != source:
+            continue
+        current = (meta.get("mtime_ns"), meta.get("size")) == (st.st_mtime_ns, st.st_size)
+        if current and not (drop_subsets and meta.get("subset")):
+            continue
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
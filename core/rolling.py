@@ -0,0 +1,122 @@
+"""
+Single-pass rolling OLS of y on x (with intercept).
+
+Every window statistic of a simple regression follows from five window
+sums: x, y, x^2, y^2 and xy. Plain prefix sums of those lose digits when
+prices drift far from where they started (the window variance is a small
+difference of two large numbers), so the sums are built per block of
+`window` rows, each block centred on its own mean. A window then spans at
+most two blocks: the tail of one and the head of the next. The two parts
+are merged with the pairwise (Chan et al.) update for means and
+co-moments, which never subtracts large totals.
+
+rolling_ols returns intercept, beta, residual std, R^2 and the beta
+t-statistic for every window in O(n).
+"""
+
+import warnings
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+ArrayLike = Union[pd.Series, np.ndarray]
+
+COLUMNS = ["intercept", "beta", "resid_std", "r2", "tstat"]
+
+def rolling_ols(y: ArrayLike, x: ArrayLike, window: int = 60) -> pd.DataFrame:
+    """
+    - OLS y = a + b x over every trailing window of `window` rows; row t is
+      the window ending at (and including) t.
+    - Windows with a NaN in either series, too short, or with constant x
+      are NaN (as pandas rolling cov/var with min_periods=window).
+    - Return a DataFrame (indexed like y; RangeIndex for arrays) with
+      intercept, beta, resid_std (sqrt(SSR / (window - 2))), r2 and tstat.
+    """
+    if window < 2:
+        raise ValueError("window must be at least 2")
+    index = y.index if isinstance(y, pd.Series) else None
+    if index is not None and isinstance(x, pd.Series):
+        x = x.reindex(index)
+    Y = np.asarray(y, dtype=float)
+    X = np.asarray(x, dtype=float)
+    if Y.shape != X.shape or Y.ndim != 1:
+        raise ValueError("y and x must be 1-D and of equal length")
+
+    n = len(Y)
+    out = np.full((n, len(COLUMNS)), np.nan)
+    if n >= window:
+        out[window - 1:] = _window_stats(Y, X, window)
+    return pd.DataFrame(out, index=index if index is not None else pd.RangeIndex(n), columns=COLUMNS)
+
+def _window_stats(Y: np.ndarray, X: np.ndarray, w: int) -> np.ndarray:
+    n = len(Y)
+    bad = np.isnan(Y) | np.isnan(X)
+    n_blocks = -(-n // w)
+    pad = n_blocks * w - n
+
+    # Per-block reference point and within-block prefix sums of deviations
+    def blocks(a):
+        return np.concatenate([np.where(bad, np.nan, a), np.full(pad, np.nan)]).reshape(n_blocks, w)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN blocks
+        cy = np.nan_to_num(np.nanmean(blocks(Y), axis=1))
+        cx = np.nan_to_num(np.nanmean(blocks(X), axis=1))
+    dy = np.nan_to_num(blocks(Y) - cy[:, None])
+    dx = np.nan_to_num(blocks(X) - cx[:, None])
+    P = np.cumsum(np.stack([dx, dy, dx * dx, dy * dy, dx * dy], axis=-1), axis=1).reshape(n_blocks * w, 5)
+    totals = P[w - 1::w]
+
+    ends = np.arange(w - 1, n)
+    starts = ends - w + 1
+    b_start, b_end = starts // w, ends // w
+    split = b_start != b_end
+
+    # Head of the end block: rows b_end * w .. e
+    n_b = (ends - b_end * w + 1).astype(float)
+    s_b = P[ends]
+    # Tail of the start block: rows s .. (b_start + 1) * w - 1 (empty if aligned)
+    n_a = np.where(split, (b_start + 1) * w - starts, 0).astype(float)
+    s_a = np.where(split[:, None], totals[b_start] - P[np.maximum(starts - 1, 0)], 0.0)
+
+    mx_a, my_a, sxx_a, syy_a, sxy_a = _part(s_a, n_a, cx[b_start], cy[b_start])
+    mx_b, my_b, sxx_b, syy_b, sxy_b = _part(s_b, n_b, cx[b_end], cy[b_end])
+    f = n_a * n_b / w
+    ddx, ddy = mx_b - mx_a, my_b - my_a
+    sxx = sxx_a + sxx_b + ddx * ddx * f
+    syy = syy_a + syy_b + ddy * ddy * f
+    sxy = sxy_a + sxy_b + ddx * ddy * f
+    mx = (n_a * mx_a + n_b * mx_b) / w
+    my = (n_a * my_a + n_b * my_b) / w
+
+    # x is constant if its variance is below the rounding error of the block sums
+    tol = 64 * np.finfo(float).eps * (totals[b_start, 2] + totals[b_end, 2])
+    bad_count = np.concatenate([[0], np.cumsum(bad)])
+    ok = (bad_count[ends + 1] - bad_count[starts] == 0) & (sxx > tol)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta = sxy / sxx
+        ssr = np.maximum(syy - sxy * beta, 0.0)
+        sigma2 = ssr / (w - 2)
+        stats = np.column_stack([
+            my - beta * mx,
+            beta,
+            np.sqrt(sigma2),
+            sxy * sxy / (sxx * syy),
+            beta / np.sqrt(sigma2 / sxx),
+        ])
+    stats[~ok] = np.nan
+    return stats
+
+def _part(s: np.ndarray, count: np.ndarray, cx: np.ndarray, cy: np.ndarray):
+    """Means and centred co-moments of one part from its deviation sums."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv = np.where(count > 0, 1.0 / count, 0.0)
+    sx, sy, sxx, syy, sxy = s.T
+    return (
+        cx + sx * inv,
+        cy + sy * inv,
+        sxx - sx * sx * inv,
+        syy - sy * sy * inv,
+        sxy - sx * sy * inv,
+    )
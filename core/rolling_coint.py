@@ -0,0 +1,193 @@
+"""
+Rolling Engle-Granger cointegration test in one pass.
+
+Calling statsmodels coint on every window refits the first-stage OLS and
+the whole ADF lag search from scratch, O(n * window) work plus per-call
+overhead. rolling_engle_granger instead keeps cumulative sums of
+
+    1, y, x, y^2, xy, x^2                       (first-stage OLS)
+    outer products of [1, y_{t-1}, x_{t-1}, dy_{t-k}, dx_{t-k}]   (ADF)
+
+so the sufficient statistics of any window are a difference of two
+prefix sums. The window residual e = y - a - b*x is linear in y and x,
+which makes the ADF normal equations on e a quadratic form of those
+moments. The AIC lag search and the final regression then run as small
+batched solves over all windows at once.
+
+The statistic reproduces statsmodels coint(y, x) (trend "c", ADF on the
+residuals with regression "n" and autolag AIC): same default maxlag,
+same common sample for the lag search, same longest sample for the final
+regression, same collinearity guard, and the same MacKinnon p-value
+(looked up for all windows at once from core.mackinnon's tables).
+"""
+
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .mackinnon import mackinnon_pvalues
+
+ArrayLike = Union[pd.Series, np.ndarray]
+
+# statsmodels' SQRTEPS-based threshold for "(almost) perfectly colinear"
+_R2_MAX = 1 - 100 * np.sqrt(np.finfo(float).eps)
+
+def rolling_engle_granger(y: ArrayLike, x: ArrayLike, window: int = 252, maxlag: Optional[int] = None,
+                          autolag: Optional[str] = "aic") -> pd.DataFrame:
+    """
+    - Engle-Granger test of y on x over every trailing window of `window` rows.
+    - Row t describes the window ending at (and including) t; earlier rows
+      and windows containing a NaN are NaN.
+    - maxlag=None uses coint's default for the window length; autolag is
+      "aic" (coint's default) or None for a fixed maxlag.
+    - Return a DataFrame (indexed like y) with hedge_ratio, intercept,
+      adf_stat, pvalue and usedlag.
+    """
+    if autolag is not None and autolag.lower() != "aic":
+        raise ValueError("autolag must be 'aic' or None")
+    index = y.index if isinstance(y, pd.Series) else None
+    if index is not None and isinstance(x, pd.Series):
+        x = x.reindex(index)
+    Y = np.asarray(y, dtype=float)
+    X = np.asarray(x, dtype=float)
+    if Y.shape != X.shape or Y.ndim != 1:
+        raise ValueError("y and x must be 1-D and of equal length")
+
+    n = len(Y)
+    cap = window // 2 - 1
+    if maxlag is None:
+        maxlag = min(cap, int(np.ceil(12.0 * np.power(window / 100.0, 1 / 4.0))))
+    if not 0 <= maxlag <= cap:
+        raise ValueError("maxlag must be between 0 and window // 2 - 1")
+
+    out = pd.DataFrame(np.nan, index=index if index is not None else pd.RangeIndex(n),
+                       columns=["hedge_ratio", "intercept", "adf_stat", "pvalue", "usedlag"])
+    if n < max(window, 2 * maxlag + 4):
+        return out
+
+    bad = np.isnan(Y) | np.isnan(X)
+    # Centre on the sample mean so window sums don't lose digits to the
+    # price level; the OLS slope and residuals are shift-invariant.
+    my, mx = np.nanmean(Y), np.nanmean(X)
+    Yc = np.where(bad, 0.0, Y - my)
+    Xc = np.where(bad, 0.0, X - mx)
+
+    ends = np.arange(window - 1, n)
+    starts = ends - window + 1
+    nan_count = _prefix(bad.astype(float))
+    ok = (nan_count[ends + 1] - nan_count[starts]) == 0
+
+    # First stage: y = a + b x over each window
+    S = _prefix(np.column_stack([Yc, Xc, Yc * Yc, Xc * Yc, Xc * Xc]))
+    sy, sx, syy, sxy, sxx = (S[ends + 1] - S[starts]).T
+    sxx_c = sxx - sx * sx / window
+    sxy_c = sxy - sx * sy / window
+    syy_c = syy - sy * sy / window
+    with np.errstate(divide="ignore", invalid="ignore"):
+        b = sxy_c / sxx_c
+        r2 = sxy_c * sxy_c / (sxx_c * syy_c)
+    a = (sy - b * sx) / window
+    ok &= np.isfinite(b)
+    a, b = np.where(ok, a, 0.0), np.where(ok, b, 0.0)
+
+    # ADF features; lags reaching before the first row are padded with 0
+    # and never enter a window's regression.
+    L = maxlag
+    dY, dX = np.zeros(n), np.zeros(n)
+    dY[1:], dX[1:] = np.diff(Yc), np.diff(Xc)
+    cols = [np.ones(n), _shift(Yc, 1), _shift(Xc, 1)]
+    for k in range(L + 1):
+        cols += [_shift(dY, k), _shift(dX, k)]
+    F = np.column_stack(cols)
+    G = _prefix(F[:, :, None] * F[:, None, :])
+
+    # T maps features to [e_{t-1}, de_t, de_{t-1}, ..., de_{t-L}] per window
+    T = np.zeros((len(ends), L + 2, F.shape[1]))
+    T[:, 0, 0], T[:, 0, 1], T[:, 0, 2] = -a, 1.0, -b
+    for k in range(L + 1):
+        T[:, k + 1, 3 + 2 * k] = 1.0
+        T[:, k + 1, 4 + 2 * k] = -b
+
+    def moments(first, sel=slice(None)):
+        M = G[ends[sel] + 1] - G[first[sel]]
+        return T[sel] @ M @ T[sel].transpose(0, 2, 1)
+
+    if autolag is None:
+        usedlag = np.full(len(ends), L)
+    else:
+        nobs = window - L - 1
+        ssr = _nested_ssr(moments(starts + L + 1))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            aic = nobs * np.log(ssr / nobs) + 2 * np.arange(1, L + 2)
+        usedlag = np.argmin(np.nan_to_num(aic, nan=np.inf), axis=1)
+
+    stat = np.full(len(ends), np.nan)
+    for p in np.unique(usedlag):
+        sel = usedlag == p
+        Q = moments(starts + p + 1, sel)
+        beta, ssr, inv00 = _ols(Q, p)
+        dof = window - p - 1 - (p + 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            stat[sel] = beta[:, 0] / np.sqrt(ssr / dof * inv00)
+    stat = np.where(r2 >= _R2_MAX, -np.inf, stat)
+    stat[~ok] = np.nan
+
+    pvalue = mackinnon_pvalues(stat, regression="c", N=2)
+    out.iloc[ends] = np.column_stack([
+        np.where(ok, b, np.nan),
+        np.where(ok, a + my - b * mx, np.nan),
+        stat,
+        pvalue,
+        np.where(ok, usedlag, np.nan),
+    ])
+    return out
+
+def _prefix(a: np.ndarray) -> np.ndarray:
+    """Cumulative sum along axis 0 with a leading zero row."""
+    out = np.zeros((a.shape[0] + 1,) + a.shape[1:])
+    np.cumsum(a, axis=0, out=out[1:])
+    return out
+
+def _shift(a: np.ndarray, k: int) -> np.ndarray:
+    if k == 0:
+        return a
+    out = np.zeros_like(a)
+    out[k:] = a[:-k]
+    return out
+
+def _nested_ssr(Q: np.ndarray) -> np.ndarray:
+    """
+    - SSR of the ADF regression with 0..L lagged differences, on a common sample.
+    - The regressions are nested, so one Cholesky factor of the moments of
+      [e_{t-1}, de_{t-1}, ..., de_{t-L}, de_t] gives all of them: the SSR
+      with k regressors is sum(de_t^2) minus the first k squared entries
+      of the factor's last row.
+    """
+    L = Q.shape[1] - 2
+    order = [0] + list(range(2, L + 2)) + [1]
+    try:
+        C = np.linalg.cholesky(Q[:, order][:, :, order])
+    except np.linalg.LinAlgError:
+        return np.column_stack([_ols(Q, p)[1] for p in range(L + 1)])
+    return Q[:, 1, 1][:, None] - np.cumsum(C[:, -1, :-1] ** 2, axis=1)
+
+def _ols(Q: np.ndarray, p: int):
+    """
+    - ADF regression with p lagged differences from residual moments Q.
+    - Return coefficients, SSR and the (0, 0) element of the inverse
+      normal matrix for every window.
+    """
+    idx = [0] + list(range(2, p + 2))
+    A = Q[:, idx][:, :, idx]
+    c = Q[:, idx, 1]
+    rhs = np.zeros(A.shape[:2] + (2,))
+    rhs[:, :, 0], rhs[:, 0, 1] = c, 1.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        try:
+            sol = np.linalg.solve(A, rhs)
+        except np.linalg.LinAlgError:
+            sol = np.linalg.pinv(A) @ rhs
+    beta = sol[:, :, 0]
+    ssr = Q[:, 1, 1] - np.einsum("wi,wi->w", beta, c)
+    return beta, ssr, sol[:, 0, 1]
@@ -0,0 +1,446 @@
+"""
+All-pairs Engle-Granger scan over a price universe.
+
+engle_granger fits one statsmodels OLS and one adfuller per pair, which is
+~500k Python-level calls for 1,000 tickers. scan_pairs gets the same
+numbers from a handful of matrix products instead:
+
+1. Hedge ratios and intercepts for every pair come in closed form from
+   cross-product moments of the price matrix (masked so each pair only
+   uses the rows where both tickers have data).
+2. The residual e = y - a - b*x is linear in the two price series, so the
+   normal equations of the ADF regression on e (including the AIC lag
+   search that adfuller does by default) are combinations of lagged and
+   differenced cross-product moments, again matrix products. They are
+   solved for all pairs of a block at once.
+3. Pairs involving a ticker with interior gaps (rare after forward-filling)
+   go through adf_batch, the same regression run on explicit residuals in
+   batches of block_size pairs.
+
+Pairs are processed in (block x block) ticker tiles, and the lagged
+features behind the moments are built per tile, so memory is
+O(maxlag x dates x block) for the features plus O(maxlag^3) moment
+matrices of block x block, whatever the universe size. The moment count
+grows with the cube of maxlag, so above _MOMENT_MAXLAG every pair goes
+through adf_batch instead. Only the top_k pairs are kept, and
+p-values/critical values are looked up for those alone.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .mackinnon import crit_dict, mackinnon_crit, mackinnon_pvalues
+from .panel import PricePanel
+
+_TICKER_BLOCK = 128
+
+# Largest maxlag scanned from moments (the number of moment matrices per
+# tile grows with maxlag^3); larger lags use adf_batch for every pair
+_MOMENT_MAXLAG = 4
+
+@dataclass
+class PairScanResult:
+    y: str
+    x: str
+    hedge_ratio: float
+    intercept: float
+    adf_stat: float
+    adf_pvalue: float
+    crit_values: Dict[str, float]
+    nobs: int
+    usedlag: int
+
+def scan_pairs(prices: Union[pd.DataFrame, PricePanel], top_k: Optional[int] = 50, maxlag: int = 1,
+               regression: str = "c", autolag: Optional[str] = "AIC", min_obs: int = 60,
+               both_directions: bool = False, block_size: int = 512) -> List[PairScanResult]:
+    """
+    - Engle-Granger test for every pair of tickers in prices (a DataFrame or
+      PricePanel); for each pair (a, b), in column order, y=a and x=b, plus
+      y=b and x=a if both_directions.
+    - Same statistic as engle_granger(y, x, maxlag, regression) (OLS with
+      intercept, then adfuller with autolag), computed in float64.
+    - Pairs with fewer than min_obs joint observations are skipped. Rows
+      where either ticker is missing are dropped, as in engle_granger.
+    - Return the top_k pairs (all if None) sorted by ADF statistic, most
+      negative (strongest cointegration) first.
+    - block_size bounds the residual batches used for gappy pairs (and for
+      every pair when maxlag > _MOMENT_MAXLAG).
+    - maxlag must be an explicit lag; there is no adfuller-style default.
+    """
+    _check_args(maxlag, regression, autolag)
+    panel = prices if isinstance(prices, PricePanel) else PricePanel.from_frame(prices, dtype=np.float64)
+    starts = range(0, panel.shape[1], _TICKER_BLOCK)
+    bounds = [(lo, min(lo + _TICKER_BLOCK, panel.shape[1])) for lo in starts]
+    best = _scan_blocks(panel, bounds, top_k, maxlag, regression, autolag, min_obs, both_directions, block_size)
+    return _results(panel, best, regression)
+
+def _check_args(maxlag, regression: str, autolag: Optional[str]) -> None:
+    if maxlag is None or maxlag < 0:
+        raise ValueError("maxlag must be a non-negative int")
+    if regression not in _DET_POWERS:
+        raise ValueError(f"unknown regression {regression!r}")
+    if autolag not in ("AIC", None):
+        raise ValueError("autolag must be 'AIC' or None")
+
+def _scan_blocks(panel: PricePanel, bounds, top_k, maxlag, regression, autolag, min_obs,
+                 both_directions, block_size) -> "_TopK":
+    """
+    - Scan the pairs (i, j > i) whose first ticker i falls in one of the
+      [lo, hi) ticker ranges in bounds; return the running top-k.
+    - core.parallel hands disjoint ranges to worker processes.
+    """
+    values = panel.values.astype(np.float64, copy=False)
+    valid = panel.valid
+    n_tickers = values.shape[1]
+
+    X0 = np.where(valid, values, 0.0)
+    V = valid.astype(np.float64)
+    X2 = X0 * X0
+    lag_samples = _LagSamples(values, valid, maxlag, regression) if maxlag <= _MOMENT_MAXLAG else None
+
+    best = _TopK(top_k)
+    for lo, hi in bounds:
+        blk = slice(lo, hi)
+        for jlo in range(lo, n_tickers, _TICKER_BLOCK):
+            jblk = slice(jlo, min(jlo + _TICKER_BLOCK, n_tickers))
+            # Joint-row moments of (block ticker i, tile ticker j)
+            n = V[:, blk].T @ V[:, jblk]
+            s_i = X0[:, blk].T @ V[:, jblk]
+            s_j = V[:, blk].T @ X0[:, jblk]
+            s_ii = X2[:, blk].T @ V[:, jblk]
+            s_jj = V[:, blk].T @ X2[:, jblk]
+            s_ij = X0[:, blk].T @ X0[:, jblk]
+
+            # Pairs (i, j) of the tile with j > i (i_loc, j_loc index the tile)
+            i_loc, j_loc = np.nonzero(np.arange(jlo, jblk.stop)[None, :] > np.arange(lo, hi)[:, None])
+            keep = n[i_loc, j_loc] >= min_obs
+            i_loc, j_loc = i_loc[keep], j_loc[keep]
+            i_idx, j_idx = i_loc + lo, j_loc + jlo
+            moments = lag_samples.block(blk, jblk) if lag_samples is not None else None
+
+            directions = [(i_idx, j_idx, s_i, s_j, s_jj, False)]
+            if both_directions:
+                directions.append((j_idx, i_idx, s_j, s_i, s_ii, True))
+            for y_idx, x_idx, sy, sx, sxx, swap in directions:
+                nn = n[i_loc, j_loc]
+                sy, sx, sxx = sy[i_loc, j_loc], sx[i_loc, j_loc], sxx[i_loc, j_loc]
+                var_x = nn * sxx - sx * sx
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    beta = (nn * s_ij[i_loc, j_loc] - sy * sx) / var_x
+                alpha = (sy - beta * sx) / nn
+                usable = np.isfinite(beta) & (var_x > 0)
+                dense = panel._dense[y_idx] & panel._dense[x_idx] & (moments is not None)
+
+                # Dense pairs: ADF straight from the moments
+                sel = np.flatnonzero(usable & dense)
+                if len(sel):
+                    pm = [m.pairs(i_loc[sel], j_loc[sel], swap) for m in moments]
+                    stat, lag, nobs = lag_samples.adf(pm, beta[sel], alpha[sel], y_idx[sel], x_idx[sel], autolag)
+                    best.add(stat, y_idx[sel], x_idx[sel], beta[sel], alpha[sel], lag, nobs)
+
+                # Pairs with interior gaps: batched ADF on compressed residuals
+                gappy = np.flatnonzero(usable & ~dense)
+                for start in range(0, len(gappy), block_size):
+                    sel = gappy[start:start + block_size]
+                    resid = values[:, y_idx[sel]] - (alpha[sel] + beta[sel] * values[:, x_idx[sel]])
+                    for c in range(resid.shape[1]):
+                        # drop the missing rows, as engle_granger's dropna does
+                        col = resid[:, c]
+                        kept = col[~np.isnan(col)]
+                        col[:] = np.nan
+                        col[:len(kept)] = kept
+                    stat, lag, nobs = adf_batch(resid, maxlag, regression, autolag)
+                    best.add(stat, y_idx[sel], x_idx[sel], beta[sel], alpha[sel], lag, nobs)
+
+    return best
+
+def _results(panel: PricePanel, best: "_TopK", regression: str) -> List[PairScanResult]:
+    """Sort the kept pairs and attach p-values and critical values."""
+    rows = best.sorted()
+    stats = np.array([r[0] for r in rows], dtype=float)
+    pvalues = mackinnon_pvalues(stats, regression=regression, N=1)
+    crits = mackinnon_crit(np.array([r[6] for r in rows], dtype=float), regression=regression, N=1)
+    out = []
+    for (stat, yi, xi, b, a, lag, nobs), p, crit in zip(rows, pvalues, crits):
+        out.append(PairScanResult(
+            y=panel.tickers[yi], x=panel.tickers[xi], hedge_ratio=float(b), intercept=float(a),
+            adf_stat=float(stat), adf_pvalue=float(p), crit_values=crit_dict(crit),
+            nobs=int(nobs), usedlag=int(lag),
+        ))
+    return out
+
+# Powers of the (scaled) time trend in the ADF regression
+_DET_POWERS = {"n": [], "c": [0], "ct": [0, 1], "ctt": [0, 1, 2]}
+
+class _LagSamples:
+    """
+    Per-ticker ADF regression features for each lag sample k = 0..maxlag.
+
+    For a pair with hedge ratio b, the residual e = y - a - b*x is linear in
+    the prices, so every entry of the ADF normal equations (sums of products
+    of e_{t-1}, de_{t-j} and trend terms over the pair's joint sample) is a
+    combination of cross-product moments of per-ticker series. Those moments
+    are plain matrix products over the universe (BLAS), instead of one
+    regression per pair. Valid for tickers without interior gaps, where the
+    joint sample is the product of the two tickers' row masks.
+
+    Only the centred levels are kept for the whole universe; the lagged
+    features are rebuilt for each tile in block().
+    """
+
+    def __init__(self, values: np.ndarray, valid: np.ndarray, maxlag: int, regression: str):
+        T = values.shape[0]
+        self.maxlag, self.regression = maxlag, regression
+        self.det = _DET_POWERS[regression]
+        self.tau = (np.arange(T, dtype=np.float64) / max(T, 1))[:, None]
+        count = valid.sum(axis=0)
+        self.mu = np.where(valid, values, 0.0).sum(axis=0) / np.maximum(count, 1)
+        # Centred levels keep the moment sums well scaled
+        self.centred = np.where(valid, values - self.mu, 0.0)
+        self.valid = valid
+
+    def _samples(self, cols: slice):
+        """
+        - (W, feats) for the tickers in cols, one lag sample k at a time:
+          row mask W, then features level (e_{t-1}), de_t, de_{t-1}, ..., de_{t-k}.
+        - Built on demand so only one tile's features are alive at once.
+        """
+        C, valid = self.centred[:, cols], self.valid[:, cols]
+        T = C.shape[0]
+
+        def shift(a, j, fill):
+            out = np.full_like(a, fill)
+            out[j:] = a[:T - j]
+            return out
+
+        level = shift(C, 1, 0.0)
+        diffs = [shift(C, j, 0.0) - shift(C, j + 1, 0.0) for j in range(self.maxlag + 1)]
+        w = valid & shift(valid, 1, False)
+        for k in range(self.maxlag + 1):
+            if k:
+                w = w & shift(valid, k + 1, False)
+            W = w.astype(np.float64)
+            yield W, [level * W] + [d * W for d in diffs[:k + 1]]
+
+    def block(self, blk: slice, jblk: slice) -> List["_Moments"]:
+        """Moments for block tickers (as y) against tile tickers jblk (as x), per lag sample."""
+        powers = sorted(set(self.det) | {0})
+        pair_powers = sorted({a + c for a in self.det for c in self.det} | {0})
+        out = []
+        for (Wb, Fb), (Wx, Fx) in zip(self._samples(blk), self._samples(jblk)):
+            q = len(Fb)
+            m = _Moments()
+            m.s0 = {a: (Wb * self.tau ** a).T @ Wx for a in pair_powers}
+            m.sy = {(a, f): (Fb[f] * self.tau ** a).T @ Wx for a in powers for f in range(q)}
+            m.sx = {(a, f): (Wb * self.tau ** a).T @ Fx[f] for a in powers for f in range(q)}
+            m.syy = {(f, g): (Fb[f] * Fb[g]).T @ Wx for f in range(q) for g in range(f, q)}
+            m.sxx = {(f, g): Wb.T @ (Fx[f] * Fx[g]) for f in range(q) for g in range(f, q)}
+            m.syx = {(f, g): Fb[f].T @ Fx[g] for f in range(q) for g in range(q)}
+            out.append(m)
+        return out
+
+    def adf(self, pm: List["_Moments"], beta: np.ndarray, alpha: np.ndarray,
+            y_idx: np.ndarray, x_idx: np.ndarray, autolag: Optional[str]):
+        """ADF (stat, usedlag, nobs) for pairs from their moments; mirrors adf_batch."""
+        m = self.maxlag
+        # Intercept in centred coordinates, only needed without a constant
+        a_c = alpha - self.mu[y_idx] + beta * self.mu[x_idx]
+        if autolag == "AIC":
+            nobs = pm[m].s0[0]
+            aic = np.empty((m + 1, len(beta)))
+            for k in range(m + 1):
+                ssr, _, c = self._ols(pm[m], beta, a_c, k)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    aic[k] = nobs * np.log(ssr / nobs) + 2 * c
+            usedlag = np.argmin(np.nan_to_num(aic, nan=np.inf), axis=0)
+        else:
+            usedlag = np.full(len(beta), m)
+
+        stat = np.full(len(beta), np.nan)
+        nobs = np.zeros(len(beta), dtype=int)
+        for k in np.unique(usedlag):
+            sel = usedlag == k
+            ssr, t, _ = self._ols(pm[k].take(sel), beta[sel], a_c[sel], k)
+            stat[sel] = t
+            nobs[sel] = pm[k].s0[0][sel]
+        return stat, usedlag, nobs
+
+    def _ols(self, pm: "_Moments", b: np.ndarray, a_c: np.ndarray, k: int):
+        # Regressors: trend terms, e_{t-1} (feature 0), de_{t-1..t-k} (features 2..k+1); response de_t (feature 1)
+        no_const = self.regression == "n"
+
+        def cross(f, g):
+            f, g = min(f, g), max(f, g)
+            v = pm.syy[f, g] - b * (pm.syx[f, g] + pm.syx[g, f]) + b * b * pm.sxx[f, g]
+            if no_const and (f == 0) != (g == 0):
+                v = v - a_c * (pm.sy[0, g] - b * pm.sx[0, g])
+            elif no_const and f == g == 0:
+                v = v - 2 * a_c * (pm.sy[0, 0] - b * pm.sx[0, 0]) + a_c * a_c * pm.s0[0]
+            return v
+
+        def det_cross(a, f):
+            return pm.sy[a, f] - b * pm.sx[a, f]
+
+        regs = [("d", a) for a in self.det] + [("f", 0)] + [("f", j + 1) for j in range(1, k + 1)]
+        c, P = len(regs), len(b)
+        G = np.empty((P, c, c))
+        rhs = np.empty((P, c))
+        for i, (ki, vi) in enumerate(regs):
+            rhs[:, i] = det_cross(vi, 1) if ki == "d" else cross(vi, 1)
+            for j in range(i, c):
+                kj, vj = regs[j]
+                if ki == kj == "d":
+                    v = pm.s0[vi + vj]
+                elif ki == "d":
+                    v = det_cross(vi, vj)
+                else:
+                    v = cross(vi, vj)
+                G[:, i, j] = G[:, j, i] = v
+        try:
+            Ginv = np.linalg.inv(G)
+        except np.linalg.LinAlgError:
+            Ginv = np.linalg.pinv(G)
+        coef = np.einsum("pij,pj->pi", Ginv, rhs)
+        ssr = cross(1, 1) - (rhs * coef).sum(axis=1)
+        n = pm.s0[0]
+        lvl = len(self.det)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = coef[:, lvl] / np.sqrt(ssr / (n - c) * Ginv[:, lvl, lvl])
+        return ssr, t, c
+
+class _Moments:
+    """Cross-product moments, as (block x tile) matrices or per-pair vectors."""
+
+    def _map(self, fn):
+        out = _Moments()
+        for name in ("s0", "sy", "sx", "syy", "sxx", "syx"):
+            setattr(out, name, {key: fn(v) for key, v in getattr(self, name).items()})
+        return out
+
+    def pairs(self, i_loc: np.ndarray, j_loc: np.ndarray, swap: bool) -> "_Moments":
+        """Per-pair vectors; swap=True gives the moments of the (j, i) orientation."""
+        out = self._map(lambda M: M[i_loc, j_loc])
+        if swap:
+            out.sy, out.sx = out.sx, out.sy
+            out.syy, out.sxx = out.sxx, out.syy
+            out.syx = {(f, g): out.syx[g, f] for f, g in out.syx}
+        return out
+
+    def take(self, sel: np.ndarray) -> "_Moments":
+        return self._map(lambda v: v[sel])
+
+def adf_batch(resid: np.ndarray, maxlag: int = 1, regression: str = "c",
+              autolag: Optional[str] = "AIC"):
+    """
+    - ADF regression for every column of resid (n_dates x n_series) at once.
+    - Each column may have leading/trailing NaNs (its own sample range) but
+      no interior gaps.
+    - Mirrors statsmodels adfuller: with autolag="AIC" the lag is chosen on
+      a common sample of nobs - maxlag - 1 rows, then the regression is
+      re-run on the longest sample for that lag.
+    - Return (adf_stat, usedlag, nobs) arrays.
+    """
+    P = resid.shape[1]
+    m = maxlag
+    # Pad with m NaN rows so every valid regression row has a slot
+    E = np.vstack([np.full((m, P), np.nan), resid])
+    D = np.diff(E, axis=0)
+    R = D.shape[0] - m
+    dy = D[m:]
+    cols = [E[m:-1]] + [D[m - j:m - j + R] for j in range(1, m + 1)]  # level, lag 1..m
+    ok = [~np.isnan(dy) & ~np.isnan(cols[0])]
+    for c in cols[1:]:
+        ok.append(ok[-1] & ~np.isnan(c))  # sample for lag k: rows where lags 1..k exist
+
+    t = np.arange(R, dtype=np.float64)[:, None] / max(R, 1)
+    trend = {"n": [], "c": [np.ones((R, 1))], "ct": [np.ones((R, 1)), t], "ctt": [np.ones((R, 1)), t, t * t]}
+    det = trend[regression]
+    Z = det + [np.nan_to_num(c) for c in cols]  # regressors: deterministic terms, level, lag 1..m
+    dy0 = np.nan_to_num(dy)
+    lvl = len(det)
+
+    if autolag == "AIC":
+        # Same rows for every candidate lag, as in adfuller's _autolag
+        w = ok[m]
+        nobs = w.sum(axis=0)
+        aic = np.empty((m + 1, P))
+        for k in range(m + 1):
+            c = lvl + 1 + k
+            ssr, _, _ = _ols_batch(Z[:c], dy0, w)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                aic[k] = nobs * np.log(ssr / nobs) + 2 * c
+        usedlag = np.argmin(np.nan_to_num(aic, nan=np.inf), axis=0)
+    else:
+        usedlag = np.full(P, m)
+
+    stat = np.full(P, np.nan)
+    nobs = np.zeros(P, dtype=int)
+    for k in np.unique(usedlag):
+        sel = usedlag == k
+        c = lvl + 1 + k
+        w = ok[k]
+        if not sel.all():
+            w, Zk, yk = w[:, sel], [z if z.shape[1] == 1 else z[:, sel] for z in Z[:c]], dy0[:, sel]
+        else:
+            Zk, yk = Z[:c], dy0
+        ssr, coef, cov = _ols_batch(Zk, yk, w)
+        n = w.sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            se = np.sqrt(ssr / (n - c) * cov[:, lvl, lvl])
+            stat[sel] = coef[:, lvl] / se
+        nobs[sel] = n
+    return stat, usedlag, nobs
+
+def _ols_batch(Z: List[np.ndarray], y: np.ndarray, w: np.ndarray):
+    # Z: regressor columns, each (R, P) or (R, 1) for deterministic terms;
+    # y (R, P); w (R, P) row mask -> per-series ssr, coefficients, (Z'Z)^-1.
+    # Column-by-column products keep this on plain vectorised multiplies.
+    Zw = [z * w for z in Z]
+    c, P = len(Z), y.shape[1]
+    G = np.empty((P, c, c))
+    b = np.empty((P, c))
+    yw = y * w
+    for i in range(c):
+        b[:, i] = (Zw[i] * yw).sum(axis=0)
+        for j in range(i, c):
+            G[:, i, j] = G[:, j, i] = (Zw[i] * Zw[j]).sum(axis=0)
+    try:
+        Ginv = np.linalg.inv(G)
+    except np.linalg.LinAlgError:
+        Ginv = np.linalg.pinv(G)
+    coef = np.einsum("pij,pj->pi", Ginv, b)
+    resid = yw
+    for i in range(c):
+        resid = resid - Zw[i] * coef[:, i]
+    return (resid * resid).sum(axis=0), coef, Ginv
+
+class _TopK:
+    """Running top-k (lowest ADF statistic) across blocks."""
+
+    def __init__(self, k: Optional[int]):
+        self.k = k
+        self.parts = []
+
+    def add(self, stat, yi, xi, beta, alpha, lag, nobs):
+        self.parts.append((stat, yi, xi, beta, alpha, lag, nobs))
+        if self.k is not None and sum(len(p[0]) for p in self.parts) > 4 * self.k:
+            self._shrink()
+
+    def _shrink(self):
+        cols = [np.concatenate(c) for c in zip(*self.parts)]
+        stat = np.where(np.isnan(cols[0]), np.inf, cols[0])
+        if self.k is not None and len(stat) > self.k:
+            keep = np.argpartition(stat, self.k)[:self.k]
+            cols = [c[keep] for c in cols]
+        self.parts = [tuple(cols)]
+
+    def sorted(self):
+        if not self.parts:
+            return []
+        self._shrink()
+        cols = self.parts[0]
+        order = np.argsort(np.where(np.isnan(cols[0]), np.inf, cols[0]), kind="stable")
+        return [tuple(c[i] for c in cols) for i in order if np.isfinite(cols[0][i])]
@@ -0,0 +1,197 @@
+"""
+Multi-stage pair screening ahead of cointegration testing.
+
+Most pairs of a universe are obviously unrelated, and running ADF on them
+is wasted work. screen_pairs applies cheap, vectorized filters first and
+only sends the survivors to the expensive per-pair test:
+
+    corr      return correlation >= min_corr
+    ssd       mean squared distance of normalized prices <= max_ssd, and/or
+              within the lowest ssd_quantile of the remaining pairs
+    cluster   same k-means cluster of PCA return loadings (optional)
+    coint     Engle-Granger p-value <= max_pvalue (or a custom test)
+    half_life OU half-life of the hedged spread within [min_half_life,
+              max_half_life] bars (optional; core.ou, all survivors at once)
+
+Correlation and SSD for all pairs come from masked cross-product matrices
+(each pair only uses the rows where both tickers have data). Every stage
+records how many pairs it removed and how long it took.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .coint import engle_granger
+from .ou import ou_fit
+from .panel import PricePanel
+
+@dataclass
+class StageStats:
+    name: str
+    pairs_in: int
+    removed: int
+    seconds: float
+
+    @property
+    def pairs_out(self) -> int:
+        return self.pairs_in - self.removed
+
+@dataclass
+class ScreeningResult:
+    pairs: pd.DataFrame
+    stages: List[StageStats] = field(default_factory=list)
+
+    def summary(self) -> pd.DataFrame:
+        """One row per stage: pairs in/removed/out and seconds."""
+        return pd.DataFrame(
+            [(s.name, s.pairs_in, s.removed, s.pairs_out, s.seconds) for s in self.stages],
+            columns=["stage", "pairs_in", "removed", "pairs_out", "seconds"],
+        ).set_index("stage")
+
+def _eg_test(y: pd.Series, x: pd.Series) -> Tuple[float, float]:
+    res = engle_granger(y, x)
+    return res.hedge_ratio, res.adf_pvalue
+
+def screen_pairs(prices: Union[pd.DataFrame, PricePanel], min_corr: Optional[float] = 0.5,
+                 max_ssd: Optional[float] = None, ssd_quantile: Optional[float] = None,
+                 n_components: int = 5, n_clusters: Optional[int] = None,
+                 max_pvalue: float = 0.05, test: Optional[Callable] = None,
+                 min_half_life: Optional[float] = None, max_half_life: Optional[float] = None,
+                 min_obs: int = 60, seed: int = 0) -> ScreeningResult:
+    """
+    - Screen every pair (a, b) of prices (y=a, x=b, in column order).
+    - Stages run in order and each one only sees the previous survivors; a
+      stage whose cut-off is None is skipped.
+    - test(y, x) -> (hedge_ratio, pvalue) is the final test on the survivors
+      (default: engle_granger); src's test_cointegration_fullsample fits as is.
+      With test=False the screened candidates are returned untested.
+    - min_half_life / max_half_life keep pairs whose spread y - hedge_ratio * x
+      reverts within that many bars (needs the test's hedge ratios).
+    - Return a ScreeningResult: surviving pairs (sorted by p-value) with
+      their screening statistics, plus per-stage counts and timings.
+    """
+    panel = prices if isinstance(prices, PricePanel) else PricePanel.from_frame(prices, dtype=np.float64)
+    values = panel.values.astype(np.float64, copy=False)
+    valid = panel.valid
+    n = valid.shape[1]
+    stages = []
+
+    t0 = time.perf_counter()
+    i, j = np.triu_indices(n, k=1)
+    V = valid.astype(np.float64)
+    n_obs = (V.T @ V)[i, j]
+    keep = n_obs >= min_obs
+    stages.append(StageStats("min_obs", len(i), int((~keep).sum()), time.perf_counter() - t0))
+    i, j = i[keep], j[keep]
+    stats = {}
+
+    if min_corr is not None:
+        t0 = time.perf_counter()
+        rets = np.diff(values, axis=0) / values[:-1]
+        corr = _masked_corr(rets)[i, j]
+        keep = corr >= min_corr
+        stages.append(StageStats("corr", len(i), int((~keep).sum()), time.perf_counter() - t0))
+        i, j, stats = _filter(i, j, stats, keep, corr=corr)
+
+    if max_ssd is not None or ssd_quantile is not None:
+        t0 = time.perf_counter()
+        ssd = _masked_ssd(values)[i, j]
+        keep = np.isfinite(ssd)
+        if max_ssd is not None:
+            keep &= ssd <= max_ssd
+        if ssd_quantile is not None and keep.any():
+            keep &= ssd <= np.quantile(ssd[keep], ssd_quantile)
+        stages.append(StageStats("ssd", len(i), int((~keep).sum()), time.perf_counter() - t0))
+        i, j, stats = _filter(i, j, stats, keep, ssd=ssd)
+
+    if n_clusters is not None:
+        t0 = time.perf_counter()
+        labels = _return_clusters(values, n_components, n_clusters, seed)
+        keep = labels[i] == labels[j]
+        stages.append(StageStats("cluster", len(i), int((~keep).sum()), time.perf_counter() - t0))
+        i, j, stats = _filter(i, j, stats, keep, cluster=labels[i])
+
+    out = pd.DataFrame({"y": [panel.tickers[k] for k in i], "x": [panel.tickers[k] for k in j], **stats})
+    if test is not False:
+        test = test or _eg_test
+        t0 = time.perf_counter()
+        hedge, pvalue = np.full(len(i), np.nan), np.full(len(i), np.nan)
+        for k, (a, b) in enumerate(zip(out["y"], out["x"])):
+            frame = panel.pair(a, b).to_frame()
+            try:
+                hedge[k], pvalue[k] = test(frame[a], frame[b])
+            except (ValueError, np.linalg.LinAlgError):
+                continue
+        keep = pvalue <= max_pvalue
+        stages.append(StageStats("coint", len(i), int((~keep).sum()), time.perf_counter() - t0))
+        out = out.assign(hedge_ratio=hedge, pvalue=pvalue)[keep]
+        i, j = i[keep], j[keep]
+
+    if min_half_life is not None or max_half_life is not None:
+        if test is False:
+            raise ValueError("the half_life stage needs hedge ratios; pass a test")
+        t0 = time.perf_counter()
+        spreads = values[:, i] - out["hedge_ratio"].to_numpy() * values[:, j]
+        hl = ou_fit(pd.DataFrame(spreads), min_obs=min_obs)["half_life"].to_numpy()
+        keep = np.ones(len(hl), dtype=bool)
+        if min_half_life is not None:
+            keep &= hl >= min_half_life
+        if max_half_life is not None:
+            keep &= hl <= max_half_life
+        stages.append(StageStats("half_life", len(i), int((~keep).sum()), time.perf_counter() - t0))
+        out = out.assign(half_life=hl)[keep]
+
+    if test is not False:
+        out = out.sort_values("pvalue", kind="stable")
+
+    return ScreeningResult(pairs=out.reset_index(drop=True), stages=stages)
+
+def _filter(i, j, stats, keep, **new):
+    stats = {k: v[keep] for k, v in {**stats, **new}.items()}
+    return i[keep], j[keep], stats
+
+def _masked_corr(X: np.ndarray) -> np.ndarray:
+    """Pairwise-complete correlation matrix of the columns of X (NaN = missing)."""
+    V = (~np.isnan(X)).astype(np.float64)
+    X0 = np.where(V > 0, X, 0.0)
+    n = V.T @ V
+    sx = X0.T @ V          # sum of column a over rows shared with b
+    sxx = (X0 * X0).T @ V
+    sxy = X0.T @ X0
+    cov = n * sxy - sx * sx.T
+    var = n * sxx - sx * sx
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return cov / np.sqrt(var * var.T)
+
+def _masked_ssd(P: np.ndarray) -> np.ndarray:
+    """
+    Mean squared distance between prices normalized to 1 at each ticker's
+    first observation, over the rows both tickers share.
+    """
+    valid = ~np.isnan(P)
+    first = np.where(valid.any(axis=0), P[valid.argmax(axis=0), np.arange(P.shape[1])], np.nan)
+    N = P / first
+    V = valid.astype(np.float64)
+    N0 = np.where(valid, N, 0.0)
+    n = V.T @ V
+    s2 = (N0 * N0).T @ V   # sum of a^2 over rows shared with b
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (s2 + s2.T - 2 * (N0.T @ N0)) / n
+
+def _return_clusters(values: np.ndarray, n_components: int, n_clusters: int, seed: int) -> np.ndarray:
+    """k-means labels of each ticker's loadings on the top principal components of standardized returns."""
+    from scipy.cluster.vq import kmeans2
+
+    rets = np.diff(values, axis=0) / values[:-1]
+    mu, sd = np.nanmean(rets, axis=0), np.nanstd(rets, axis=0)
+    Z = np.nan_to_num((rets - mu) / np.where(sd > 0, sd, 1.0))
+    _, s, vt = np.linalg.svd(Z, full_matrices=False)
+    k = min(n_components, len(s))
+    loadings = (vt[:k] * s[:k, None]).T
+    loadings /= np.maximum(np.linalg.norm(loadings, axis=1, keepdims=True), 1e-12)
+    _, labels = kmeans2(loadings, min(n_clusters, len(loadings)), seed=seed, minit="++")
+    return labels
@@ -1,30 +1,142 @@
+"""
+Spread, rolling z-score and mean-reversion signals.
+
+The work is done by array kernels that write into preallocated outputs:
+
+    _spread_into       y - (intercept + hedge_ratio * x)
+    _zscore_into       rolling mean/std from window sums, z, inf -> NaN
+                       (SpreadMoments: the prefix sums, reusable across windows)
+    _hysteresis_into   entry/exit rule with positions held between events
+
+zscore also has exponentially weighted ("ewma") and median / MAD ("mad")
+modes; each has a batch function (ewma_zscore, robust_zscore) and an
+incremental class (EwmaZScore, RobustZScore) giving the same values one
+bar at a time.
+
+signal_kernel chains the three on raw price arrays, reusing its output
+buffers across calls (e.g. a sweep over entry/exit thresholds).
+compute_spread, zscore and mean_reversion_signals are thin pandas
+wrappers over the same kernels; zscore_multi gives several windows from
+one set of prefix sums.
+"""
+
+import bisect
+import math
+from typing import Optional, Sequence, Tuple, Union
+
 import pandas as pd
 import numpy as np
+from scipy.signal import lfilter
+
+from . import config
+
+Z_METHODS = ("rolling", "ewma", "mad")
 
 def compute_spread(y: pd.Series, x: pd.Series, hedge_ratio: float, intercept: float = 0.0) -> pd.Series:
     """
     spread_t = y_t - (intercept + hedge_ratio * x_t)
+    - Computed in config.get_dtype() (coefficients are cast so they do not upcast float32 prices).
     """
-    return y - (intercept + hedge_ratio * x)
+    dtype = config.get_dtype()
+    if isinstance(y, pd.Series) and isinstance(x, pd.Series) and not y.index.equals(x.index):
+        # Let pandas align the two indexes
+        y, x = _as_dtype(y, dtype), _as_dtype(x, dtype)
+        return y - (dtype.type(intercept) + dtype.type(hedge_ratio) * x)
+    out = _spread_into(np.asarray(y), np.asarray(x), hedge_ratio, intercept, np.empty(len(y), dtype=dtype))
+    if not isinstance(y, pd.Series) and not isinstance(x, pd.Series):
+        return out
+    like = y if isinstance(y, pd.Series) else x
+    name = y.name if isinstance(y, pd.Series) and isinstance(x, pd.Series) and y.name == x.name else None
+    return pd.Series(out, index=like.index, name=name, copy=False)
+
+def _as_dtype(a, dtype):
+    # No copy when a already has dtype (Series copies are lazy under copy-on-write)
+    return a.astype(dtype, copy=False) if isinstance(a, np.ndarray) else a.astype(dtype)
 
-def zscore(series: pd.Series, window: int = 60) -> pd.Series:
+def zscore(series: pd.Series, window: int = 60, method: str = "rolling") -> pd.Series:
     """
     - Rolling mean and std.
     - Return (series - mean) / std.
     - Handle std == 0 gracefully (e.g., return NaN).
+    - NumPy input (e.g. a spread built from PricePanel views) returns an array.
+    - Rolling moments are accumulated in float64; z is returned in config.get_dtype().
+    - method="ewma" / "mad" use ewma_zscore(series, span=window) /
+      robust_zscore(series, window) instead of the simple moving window.
+    """
+    if method == "ewma":
+        return ewma_zscore(series, span=window)
+    if method == "mad":
+        return robust_zscore(series, window=window)
+    if method != "rolling":
+        raise ValueError(f"method must be one of {Z_METHODS}, got {method!r}")
+    out = _zscore_into(np.asarray(series), window, np.empty(len(series), dtype=config.get_dtype()))
+    if isinstance(series, np.ndarray):
+        return out
+    return pd.Series(out, index=series.index, name=series.name, copy=False)
+
+def zscore_multi(series: pd.Series, windows: Sequence[int]) -> pd.DataFrame:
+    """
+    - zscore(series, w) for every w in windows, one column per window
+      (named by it), from one set of prefix sums.
+    - For repeated requests on the same series keep a SpreadMoments and
+      call its zscore(window) instead.
+    """
+    moments = SpreadMoments(series)
+    index = series.index if isinstance(series, pd.Series) else pd.RangeIndex(len(moments))
+    out = np.empty((len(moments), len(windows)), dtype=config.get_dtype(), order="F")
+    for j, window in enumerate(windows):
+        moments.zscore_into(int(window), out[:, j])
+    return pd.DataFrame(out, index=index, columns=pd.Index(windows, name="window"), copy=False)
+
+def ewma_zscore(series: pd.Series, span: int = 60, min_periods: Optional[int] = None) -> pd.Series:
+    """
+    - z_t = (s_t - m_t) / sqrt(v_t) with exponentially weighted mean and
+      variance, alpha = 2 / (span + 1):
+
+        m_t = alpha * s_t + (1 - alpha) * m_{t-1}
+        v_t = (1 - alpha) * (v_{t-1} + alpha * (s_t - m_{t-1})^2)
+
+      started at m = s_0, v = 0. No window of history is needed; EwmaZScore
+      is the same recursion one bar at a time.
+    - NaN bars are skipped (z NaN, state unchanged); z is NaN until
+      min_periods (default: span) bars have been seen, and where v == 0.
     """
-    roll = series.rolling(window=window)
-    mean = roll.mean()
-    std = roll.std()
-    
-    z = (series - mean) / std
-    
-    # Handle std == 0 or close to 0
-    # If std is 0, z will be inf or nan.
-    # We can replace inf with nan.
-    z = z.replace([np.inf, -np.inf], np.nan)
-    
-    return z
+    center, scale = _ewma_center_scale(np.asarray(series), span, min_periods)
+    return _standardize(series, center, scale)
+
+def robust_zscore(series: pd.Series, window: int = 60) -> pd.Series:
+    """
+    - z_t = (s_t - median) / (1.4826 * MAD) over the trailing window, MAD
+      being the median absolute deviation from the window median (1.4826
+      makes it a std estimate for normal data). An outlier in the window
+      barely moves either, where it inflates the rolling mean and std.
+    - NaN until window rows, while a NaN is in the window, and where MAD == 0.
+    - RobustZScore gives the same values one bar at a time.
+    """
+    center, scale = _robust_center_scale(np.asarray(series), window)
+    return _standardize(series, center, scale)
+
+def zscore_center_scale(series: pd.Series, window: int = 60,
+                        method: str = "rolling") -> Tuple[pd.Series, pd.Series]:
+    """
+    - (center, scale) with zscore(series, window, method) == (series - center) / scale,
+      e.g. to standardize a forecast of the series on the same footing.
+    - rolling: mean and std (ddof=1); ewma: m and sqrt(v); mad: median and 1.4826 * MAD.
+    """
+    a = np.asarray(series)
+    if method == "rolling":
+        moments = pd.Series(a, copy=False).astype(np.float64).rolling(window)
+        center, scale = moments.mean().to_numpy(), moments.std().to_numpy()
+    elif method == "ewma":
+        center, scale = _ewma_center_scale(a, window, None)
+    elif method == "mad":
+        center, scale = _robust_center_scale(a, window)
+    else:
+        raise ValueError(f"method must be one of {Z_METHODS}, got {method!r}")
+    if isinstance(series, np.ndarray):
+        return center, scale
+    return (pd.Series(center, index=series.index, copy=False),
+            pd.Series(scale, index=series.index, copy=False))
 
 def mean_reversion_signals(z: pd.Series, entry_z: float = 2.0, exit_z: float = 0.5) -> pd.Series:
     """
@@ -39,21 +151,302 @@ def mean_reversion_signals(z: pd.Series, entry_z: float = 2.0, exit_z: float = 0
 
     - Positions should be held over time:
       * Use a forward-filled position series so that once entered, the position persists until exit condition.
-    - Return Series of {-1, 0, 1} indexed same as z.
-    """
-    signals = pd.Series(np.nan, index=z.index)
-    
-    # Entry conditions
-    signals[z > entry_z] = -1
-    signals[z < -entry_z] = 1
-    
-    # Exit conditions
-    signals[z.abs() < exit_z] = 0
-    
-    # Forward fill to hold positions
-    signals.ffill(inplace=True)
-    
-    # Fill initial NaNs with 0 (flat)
-    signals.fillna(0, inplace=True)
-    
-    return signals
+    - Return Series of {-1, 0, 1} indexed same as z (an array for NumPy input).
+    """
+    out = _hysteresis_into(np.asarray(z), entry_z, exit_z, np.empty(len(z), dtype=config.get_dtype()))
+    if isinstance(z, np.ndarray):
+        return out
+    return pd.Series(out, index=z.index, copy=False)
+
+def signal_kernel(y: np.ndarray, x: np.ndarray, hedge_ratio: float, intercept: float = 0.0,
+                  window: int = 60, entry_z: float = 2.0, exit_z: float = 0.5,
+                  out: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+                  ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    - Spread, z-score and position from raw price arrays in one call; the
+      same values as compute_spread -> zscore -> mean_reversion_signals.
+    - out: optional (spread, z, position) arrays of len(y) and
+      config.get_dtype(), overwritten and returned (no allocation).
+    """
+    n = len(y)
+    dtype = config.get_dtype()
+    if out is None:
+        out = tuple(np.empty(n, dtype=dtype) for _ in range(3))
+    spread, z, position = out
+    for a in out:
+        if a.shape != (n,) or a.dtype != dtype:
+            raise ValueError(f"out arrays must have shape ({n},) and dtype {dtype}")
+    _spread_into(np.asarray(y), np.asarray(x), hedge_ratio, intercept, spread)
+    _zscore_into(spread, window, z)
+    _hysteresis_into(z, entry_z, exit_z, position)
+    return spread, z, position
+
+def _spread_into(y: np.ndarray, x: np.ndarray, hedge_ratio: float, intercept: float, out: np.ndarray) -> np.ndarray:
+    t = out.dtype.type
+    np.multiply(_as_dtype(x, out.dtype), t(hedge_ratio), out=out)
+    out += t(intercept)
+    np.subtract(_as_dtype(y, out.dtype), out, out=out)
+    return out
+
+class SpreadMoments:
+    """
+    Prefix sums of a series (centred on its mean) and of its square, built
+    once; z-scores for any window then follow in O(n) without a rolling pass.
+
+    - zscore(window) equals zscore(series, window) (same index and name).
+    - Centring keeps the window variance (sum of squares minus n * mean^2)
+      accurate for spreads far from zero; a window whose variance is below
+      the rounding error of the prefix sums is treated as constant (z NaN).
+    - Cached objects are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, series: Union[pd.Series, np.ndarray]):
+        self.index = series.index if isinstance(series, pd.Series) else None
+        self.name = series.name if isinstance(series, pd.Series) else None
+        a = np.asarray(series).astype(np.float64, copy=False)
+        n = len(a)
+        bad = np.isnan(a)
+        any_bad = bad.any()
+        centre = a[~bad].mean() if any_bad and not bad.all() else (a.mean() if not any_bad and n else 0.0)
+        d = a - centre
+        if any_bad:
+            d[bad] = 0.0
+        self.d = d
+
+        # Window sums as differences of prefix sums (each with a leading 0)
+        self.c1 = np.empty(n + 1)
+        self.c2 = np.empty(n + 1)
+        self.c1[0] = self.c2[0] = 0.0
+        np.cumsum(d, out=self.c1[1:])
+        np.square(d, out=self.c2[1:])
+        np.cumsum(self.c2[1:], out=self.c2[1:])
+        self.nbad = np.concatenate([[0], np.cumsum(bad)]) if any_bad else None
+
+    def __len__(self) -> int:
+        return len(self.d)
+
+    def zscore(self, window: int = 60) -> Union[pd.Series, np.ndarray]:
+        """Rolling z over `window` rows, in config.get_dtype()."""
+        out = self.zscore_into(window, np.empty(len(self), dtype=config.get_dtype()))
+        if self.index is None:
+            return out
+        return pd.Series(out, index=self.index, name=self.name, copy=False)
+
+    def zscore_into(self, window: int, out: np.ndarray) -> np.ndarray:
+        """
+        - Rolling z over trailing windows (NaN until window rows, or while a
+          NaN is in the window), as pandas rolling(window).mean() / .std().
+        """
+        n = len(self)
+        out[:window - 1] = np.nan
+        if n < window or window < 2:
+            out[:] = np.nan
+            return out
+        c1, c2 = self.c1, self.c2
+        mean = c1[window:] - c1[:-window]
+        mean /= window
+        var = c2[window:] - c2[:-window]
+        # The difference carries the rounding error of the prefix sum, not just of the window
+        tol = c2[window:] * (64 * np.finfo(float).eps)
+        sq = np.square(mean)
+        sq *= window
+        var -= sq
+        tiny = var <= tol
+        var /= window - 1
+
+        # z in float64, written straight into out when it is float64
+        z = out[window - 1:] if out.dtype == np.float64 else sq
+        np.subtract(self.d[window - 1:], mean, out=z)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.sqrt(var, out=var)  # negative only in (masked) constant windows
+            z /= var
+        tiny |= ~np.isfinite(z)
+        if self.nbad is not None:
+            tiny |= self.nbad[window:] != self.nbad[:-window]
+        z[tiny] = np.nan
+        out[window - 1:] = z
+        return out
+
+def _zscore_into(a: np.ndarray, window: int, out: np.ndarray) -> np.ndarray:
+    return SpreadMoments(a).zscore_into(window, out)
+
+def _standardize(series, center: np.ndarray, scale: np.ndarray):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (np.asarray(series, dtype=np.float64) - center) / scale
+    z[~np.isfinite(z)] = np.nan
+    z = z.astype(config.get_dtype(), copy=False)
+    if isinstance(series, np.ndarray):
+        return z
+    return pd.Series(z, index=series.index, name=series.name, copy=False)
+
+def _ewma_center_scale(a: np.ndarray, span: int, min_periods: Optional[int]):
+    if span < 1:
+        raise ValueError("span must be at least 1")
+    alpha = 2.0 / (span + 1)
+    min_periods = span if min_periods is None else max(min_periods, 1)
+    a = a.astype(np.float64, copy=False)
+    ok = ~np.isnan(a)
+    v = a[ok]
+    center = np.full(len(a), np.nan)
+    scale = np.full(len(a), np.nan)
+    if len(v) == 0:
+        return center, scale
+    # Both recursions are first-order linear filters: y_t = alpha * in_t + (1 - alpha) * y_{t-1}
+    b, den = [alpha], [1.0, -(1.0 - alpha)]
+    m, _ = lfilter(b, den, v, zi=[(1.0 - alpha) * v[0]])
+    prev = np.concatenate([v[:1], m[:-1]])
+    var, _ = lfilter(b, den, (1.0 - alpha) * np.square(v - prev), zi=[0.0])
+    seen = np.arange(1, len(v) + 1) >= min_periods
+    center[ok] = np.where(seen, m, np.nan)
+    scale[ok] = np.where(seen, np.sqrt(var), np.nan)
+    return center, scale
+
+# MAD -> std for normally distributed data
+MAD_SCALE = 1.4826
+
+# Window rows per chunk in _robust_center_scale (bounds the windows x window copy)
+_ROBUST_CHUNK_ELEMENTS = 4_000_000
+
+def _robust_center_scale(a: np.ndarray, window: int):
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    a = a.astype(np.float64, copy=False)
+    n = len(a)
+    center = np.full(n, np.nan)
+    scale = np.full(n, np.nan)
+    if n < window:
+        return center, scale
+    views = np.lib.stride_tricks.sliding_window_view(a, window)
+    step = max(1, _ROBUST_CHUNK_ELEMENTS // window)
+    for lo in range(0, len(views), step):
+        chunk = views[lo:lo + step]  # a NaN in the window propagates to med and mad
+        med = np.median(chunk, axis=1)
+        mad = np.median(np.abs(chunk - med[:, None]), axis=1)
+        center[window - 1 + lo:window - 1 + lo + len(chunk)] = med
+        scale[window - 1 + lo:window - 1 + lo + len(chunk)] = MAD_SCALE * mad
+    return center, scale
+
+def _hysteresis_into(z: np.ndarray, entry_z: float, exit_z: float, out: np.ndarray) -> np.ndarray:
+    """
+    - Set -1 / +1 where z crosses +-entry_z and 0 where |z| < exit_z (exit
+      wins), then carry the last set value forward; 0 before the first.
+    """
+    short = z > entry_z
+    long_ = z < -entry_z
+    flat = np.abs(z) < exit_z
+    # Value of each event (0 on rows without one), then the index of the
+    # latest event row so far; before the first event it points at row 0,
+    # which is either that event or 0.
+    np.subtract(long_, short, out=out, dtype=out.dtype)
+    out[flat] = 0
+    event = short | long_ | flat
+    last = np.where(event, np.arange(len(z)), 0)
+    np.maximum.accumulate(last, out=last)
+    np.take(out.copy(), last, out=out)
+    return out
+
+class EwmaZScore:
+    """
+    - ewma_zscore one bar at a time: the recursion keeps only the mean and
+      variance, so updates are O(1) with no window of history.
+    """
+
+    def __init__(self, span: int = 60, min_periods: Optional[int] = None):
+        if span < 1:
+            raise ValueError("span must be at least 1")
+        self.span = span
+        self.alpha = 2.0 / (span + 1)
+        self.min_periods = span if min_periods is None else max(min_periods, 1)
+        self.n = 0
+        self.mean = np.nan
+        self.var = 0.0
+
+    def update(self, value: float) -> float:
+        """Add one bar; return its z (NaN for a NaN bar or during warm-up)."""
+        value = float(value)
+        if value != value:
+            return np.nan
+        alpha = self.alpha
+        prev = value if self.n == 0 else self.mean
+        self.mean = alpha * value + (1.0 - alpha) * prev
+        d = value - prev
+        self.var = alpha * ((1.0 - alpha) * (d * d)) + (1.0 - alpha) * self.var
+        self.n += 1
+        if self.n < self.min_periods or not self.var > 0:
+            return np.nan
+        z = (value - self.mean) / math.sqrt(self.var)
+        return z if math.isfinite(z) else np.nan
+
+class RobustZScore:
+    """
+    - robust_zscore one bar at a time. The window is kept sorted, so the
+      median is an index lookup and the MAD a selection over the two sorted
+      sides of it in O(log window).
+    - Adding / dropping a bar is a bisect plus a list insert / delete, which
+      shifts the tail of the list: O(window) per update, but as one memmove
+      of pointers rather than a re-sort of the window.
+    """
+
+    def __init__(self, window: int = 60):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+        self._buf = [np.nan] * window
+        self._i = 0
+        self._nan = window  # NaN (or not yet filled) slots in the buffer
+        self._sorted = []
+
+    def update(self, value: float) -> float:
+        """Add one bar; return its z (NaN until the window holds window finite bars)."""
+        value = float(value)
+        old = self._buf[self._i]
+        if old == old:
+            del self._sorted[bisect.bisect_left(self._sorted, old)]
+        else:
+            self._nan -= 1
+        if value == value:
+            bisect.insort(self._sorted, value)
+        else:
+            self._nan += 1
+        self._buf[self._i] = value
+        self._i = (self._i + 1) % self.window
+        if self._nan:
+            return np.nan
+
+        a, w = self._sorted, self.window
+        med = _middle(a[w // 2], a[(w - 1) // 2], w)
+        split = bisect.bisect_left(a, med)
+        mad = _middle(_kth_distance(a, med, split, w // 2), _kth_distance(a, med, split, (w - 1) // 2), w)
+        if not mad > 0:
+            return np.nan
+        z = (value - med) / (MAD_SCALE * mad)
+        return z if math.isfinite(z) else np.nan
+
+def _middle(hi: float, lo: float, n: int) -> float:
+    # np.median's middle value(s): the mean of the two for even n
+    return hi if n % 2 else (lo + hi) / 2
+
+def _kth_distance(a: list, med: float, split: int, k: int) -> float:
+    """
+    - k-th smallest (0-based) |a_i - med| of sorted a, with a[:split] < med <= a[split:].
+    - The distances on each side are sorted, so this is a k-th element of
+      two sorted sequences: binary search on how many come from the left.
+    """
+    n_left, n_right = split, len(a) - split
+
+    def left(i):  # i-th smallest distance below med
+        return med - a[split - 1 - i]
+
+    def right(j):  # j-th smallest distance at or above med
+        return a[split + j] - med
+
+    lo, hi = max(0, k + 1 - n_right), min(k + 1, n_left)
+    while True:
+        i = (lo + hi) // 2  # distances taken from the left side
+        j = k + 1 - i
+        if i < n_left and j > 0 and left(i) < right(j - 1):
+            lo = i + 1
+        elif i > 0 and j < n_right and left(i - 1) > right(j):
+            hi = i - 1
+        else:
+            return max(left(i - 1) if i > 0 else -np.inf, right(j - 1) if j > 0 else -np.inf)
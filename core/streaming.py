@@ -0,0 +1,315 @@
+"""
+Incremental Engle-Granger fit for live / nightly bar updates.
+
+engle_granger refits OLS and the ADF test on the whole history. For a
+regression of y on x with intercept, the OLS fit only depends on the
+count, the means and the centred co-moments Sxx, Sxy, Syy, which absorb
+one bar in O(1) with Welford's update (and a batch of bars with the
+pairwise Chan et al. merge). StreamingEngleGranger keeps those plus the
+bar history, so:
+
+    update / extend    O(1) per bar: hedge ratio, intercept, last spread
+    spread()           residuals of the whole history under the current fit
+    result()           the ADF test on those residuals, rerun only when
+                       bars arrived since the last call
+
+result() matches engle_granger on the same bars. save / load write the
+state to one .npz file, so a nightly job picks up where it stopped.
+
+StreamingSignalEngine is the live counterpart of compute_spread ->
+zscore -> mean_reversion_signals: a ring buffer of the last `window`
+spreads with their running sum and sum of squares gives each bar's
+spread, z and hysteresis position in O(1).
+"""
+
+import math
+import os
+import tempfile
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.stattools import adfuller
+
+from .coint import ArrayLike, EngleGrangerResult, _align
+from .signal import Z_METHODS, EwmaZScore, RobustZScore
+
+STATE_VERSION = 1
+
+class StreamingEngleGranger:
+    """
+    - Engle-Granger fit of y on x (with intercept) updated bar by bar.
+    - maxlag / regression are passed to the ADF test as in engle_granger.
+    - Bars with a NaN on either side are ignored, as engle_granger drops them.
+    - Bars may carry a timestamp; if they do, spread() and result() return
+      Series indexed by them.
+    """
+
+    def __init__(self, maxlag: Optional[int] = 1, regression: str = "c", capacity: int = 1024):
+        self.maxlag = maxlag
+        self.regression = regression
+        self.n = 0
+        self._mx = self._my = 0.0
+        self._sxx = self._sxy = self._syy = 0.0
+        self._y = np.empty(capacity)
+        self._x = np.empty(capacity)
+        self._t: Optional[np.ndarray] = None
+        self._result: Optional[EngleGrangerResult] = None
+
+    @classmethod
+    def fit(cls, y: ArrayLike, x: ArrayLike, maxlag: Optional[int] = 1, regression: str = "c") -> "StreamingEngleGranger":
+        """Start from a history of bars (aligned and NaN-dropped like engle_granger)."""
+        model = cls(maxlag=maxlag, regression=regression, capacity=max(len(y), 1024))
+        model.extend(y, x)
+        return model
+
+    @property
+    def hedge_ratio(self) -> float:
+        return self._sxy / self._sxx if self.n >= 2 and self._sxx > 0 else np.nan
+
+    @property
+    def intercept(self) -> float:
+        return self._my - self.hedge_ratio * self._mx
+
+    @property
+    def last_spread(self) -> float:
+        """Spread of the latest bar under the current fit."""
+        if self.n == 0:
+            return np.nan
+        return self._y[self.n - 1] - (self.intercept + self.hedge_ratio * self._x[self.n - 1])
+
+    def update(self, y: float, x: float, timestamp=None) -> float:
+        """
+        - Add one bar and update the fit in O(1).
+        - Return the bar's spread under the updated fit (NaN for a skipped bar).
+        """
+        if np.isnan(y) or np.isnan(x):
+            return np.nan
+        self._append(np.array([y], dtype=float), np.array([x], dtype=float),
+                     None if timestamp is None else [timestamp])
+        self.n += 1
+        dx, dy = x - self._mx, y - self._my
+        self._mx += dx / self.n
+        self._my += dy / self.n
+        self._sxx += dx * (x - self._mx)
+        self._syy += dy * (y - self._my)
+        self._sxy += dx * (y - self._my)
+        self._result = None
+        return self.last_spread
+
+    def extend(self, y: ArrayLike, x: ArrayLike) -> None:
+        """
+        - Add a batch of bars (Series are aligned by index and their index
+          used as timestamps; NaN rows are dropped).
+        - The batch moments are merged into the state in one step.
+        """
+        y, x = _align(y, x)
+        stamps = y.index if isinstance(y, pd.Series) else None
+        Y, X = np.asarray(y, dtype=float), np.asarray(x, dtype=float)
+        k = len(Y)
+        if k == 0:
+            return
+        self._append(Y, X, stamps)
+
+        mx_b, my_b = X.mean(), Y.mean()
+        dxb, dyb = X - mx_b, Y - my_b
+        n_a, n = self.n, self.n + k
+        f = n_a * k / n
+        ddx, ddy = mx_b - self._mx, my_b - self._my
+        self._sxx += dxb @ dxb + ddx * ddx * f
+        self._syy += dyb @ dyb + ddy * ddy * f
+        self._sxy += dxb @ dyb + ddx * ddy * f
+        self._mx += ddx * k / n
+        self._my += ddy * k / n
+        self.n = n
+        self._result = None
+
+    def _append(self, Y: np.ndarray, X: np.ndarray, stamps) -> None:
+        if self.n > 0 and (stamps is None) != (self._t is None):
+            raise ValueError("either every bar has a timestamp or none does")
+        need = self.n + len(Y)
+        if need > len(self._y):
+            capacity = max(need, 2 * len(self._y))
+            self._y = np.resize(self._y, capacity)
+            self._x = np.resize(self._x, capacity)
+            if self._t is not None:
+                self._t = np.resize(self._t, capacity)
+        if stamps is not None:
+            stamps = pd.DatetimeIndex(stamps).as_unit("ns").to_numpy()
+            if self._t is None:
+                self._t = np.empty(len(self._y), dtype="datetime64[ns]")
+            self._t[self.n:need] = stamps
+        self._y[self.n:need] = Y
+        self._x[self.n:need] = X
+
+    def spread(self) -> ArrayLike:
+        """Residuals y - (intercept + hedge_ratio * x) of every bar so far."""
+        values = self._y[:self.n] - (self.intercept + self.hedge_ratio * self._x[:self.n])
+        if self._t is None:
+            return values
+        return pd.Series(values, index=pd.DatetimeIndex(self._t[:self.n]))
+
+    def result(self) -> EngleGrangerResult:
+        """
+        - EngleGrangerResult for all bars so far, as engle_granger gives.
+        - The ADF test is only rerun if bars were added since the last call.
+        """
+        if self._result is None:
+            spread = self.spread()
+            adf_res = adfuller(spread, maxlag=self.maxlag, regression=self.regression)
+            self._result = EngleGrangerResult(
+                hedge_ratio=self.hedge_ratio,
+                intercept=self.intercept,
+                adf_stat=adf_res[0],
+                adf_pvalue=adf_res[1],
+                crit_values=adf_res[4],
+                spread=spread,
+            )
+        return self._result
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """Write the state to path (.npz), atomically."""
+        arrays = {
+            "version": np.array(STATE_VERSION),
+            "settings": np.array([-1 if self.maxlag is None else self.maxlag, self.regression]),
+            "moments": np.array([self.n, self._mx, self._my, self._sxx, self._sxy, self._syy]),
+            "y": self._y[:self.n],
+            "x": self._x[:self.n],
+        }
+        if self._t is not None:
+            arrays["t"] = self._t[:self.n].view(np.int64)
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike]) -> "StreamingEngleGranger":
+        """Restore a state written by save; no bars are refitted."""
+        with np.load(path) as data:
+            if int(data["version"]) != STATE_VERSION:
+                raise ValueError(f"unsupported state version {int(data['version'])}")
+            maxlag, regression = data["settings"]
+            maxlag = None if int(maxlag) < 0 else int(maxlag)
+            model = cls(maxlag=maxlag, regression=str(regression), capacity=max(len(data["y"]), 1024))
+            n, model._mx, model._my, model._sxx, model._sxy, model._syy = data["moments"]
+            model.n = int(n)
+            model._y[:model.n] = data["y"]
+            model._x[:model.n] = data["x"]
+            if "t" in data:
+                model._t = np.empty(len(model._y), dtype="datetime64[ns]")
+                model._t[:model.n] = data["t"].view("datetime64[ns]")
+        return model
+
+class StreamingSignalEngine:
+    """
+    - Spread, rolling z-score and mean_reversion_signals position updated
+      one bar (or tick) at a time; the same values, bar for bar, as the
+      batch functions on the full history (in float64).
+    - method="ewma" / "mad" score the spread with EwmaZScore / RobustZScore
+      (zscore(..., method=method) in batch) instead of the rolling window.
+    - hedge_ratio / intercept may be reassigned between bars (e.g. from a
+      StreamingEngleGranger); earlier spreads in the window are kept as they were.
+    - The running sums are of spreads centred on a reference value that is
+      reset to the window mean, with exact sums, every `window` bars, so
+      rounding error does not build up (amortized O(1) per bar).
+    """
+
+    def __init__(self, hedge_ratio: float, intercept: float = 0.0, window: int = 60,
+                 entry_z: float = 2.0, exit_z: float = 0.5, method: str = "rolling"):
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        if method not in Z_METHODS:
+            raise ValueError(f"method must be one of {Z_METHODS}, got {method!r}")
+        self.method = method
+        # ewma / mad z-scores come from their incremental forms (ewma keeps no buffer)
+        scorer = {"ewma": EwmaZScore, "mad": RobustZScore}.get(method)
+        self._scorer = scorer(window) if scorer is not None else None
+        self.hedge_ratio = float(hedge_ratio)
+        self.intercept = float(intercept)
+        self.window = window
+        self.entry_z = entry_z
+        self.exit_z = exit_z
+        self.n = 0
+        self.position = 0.0
+        self.z = np.nan
+        self._buf = [np.nan] * window
+        self._i = 0
+        self._nan = window  # NaN (or not yet filled) slots in the buffer
+        self._ref = 0.0
+        self._s1 = self._s2 = 0.0
+        self._last = np.nan
+        self._run = 0  # bars in the current run of identical spreads
+        self._since_sync = 0
+
+    def update(self, y: float, x: float) -> Tuple[float, float, float]:
+        """Add one bar of prices; return its (spread, z, position)."""
+        spread = y - (self.intercept + self.hedge_ratio * x)
+        z, position = self.update_spread(spread)
+        return spread, z, position
+
+    def update_spread(self, spread: float) -> Tuple[float, float]:
+        """Add one bar's spread directly; return its (z, position)."""
+        spread = float(spread)
+        if self._scorer is not None:
+            self.n += 1
+            self.z = z = self._scorer.update(spread)
+            return z, self._hold(z)
+        old = self._buf[self._i]
+        if old == old:
+            d = old - self._ref
+            self._s1 -= d
+            self._s2 -= d * d
+        else:
+            self._nan -= 1
+        if self._nan == self.window - 1:
+            # Nothing finite left in the window: restart the sums around this bar
+            self._ref = spread if spread == spread else 0.0
+            self._s1 = self._s2 = 0.0
+        if spread == spread:
+            d = spread - self._ref
+            self._s1 += d
+            self._s2 += d * d
+        else:
+            self._nan += 1
+        self._buf[self._i] = spread
+        self._i = (self._i + 1) % self.window
+        self._run = self._run + 1 if spread == self._last else 1
+        self._last = spread
+        self.n += 1
+        self._since_sync += 1
+        if self._since_sync >= self.window:
+            self._resync()
+
+        self.z = z = self._zscore(spread)
+        return z, self._hold(z)
+
+    def _hold(self, z: float) -> float:
+        # mean_reversion_signals: exit wins, a NaN z holds the position
+        if abs(z) < self.exit_z:
+            self.position = 0.0
+        elif z > self.entry_z:
+            self.position = -1.0
+        elif z < -self.entry_z:
+            self.position = 1.0
+        return self.position
+
+    def _zscore(self, spread: float) -> float:
+        w = self.window
+        if self._nan or self._run >= w:
+            return np.nan
+        mean = self._s1 / w
+        var = self._s2 - self._s1 * mean
+        # Below the rounding error of the sums the window is constant (as in zscore)
+        if var <= 64 * np.finfo(float).eps * self._s2:
+            return np.nan
+        return (spread - self._ref - mean) / math.sqrt(var / (w - 1))
+
+    def _resync(self) -> None:
+        finite = [v for v in self._buf if v == v]
+        self._ref = math.fsum(finite) / len(finite) if finite else 0.0
+        d = [v - self._ref for v in finite]
+        self._s1 = math.fsum(d)
+        self._s2 = math.fsum(v * v for v in d)
+        self._since_sync = 0
@@ -0,0 +1,133 @@
+"""
+Shared trading calendar for a price dataset.
+
+load_price_csv resamples every file to business days and forward-fills the
+holes. A TradingCalendar keeps the result of that step as data instead of
+throwing it away: the canonical date index, a date -> row position map and
+a per-ticker mask of the cells that were forward-filled. It is built once
+per dataset (the mask lives in the price cache next to the values), and
+downstream code aligns series by integer calendar positions rather than
+by repeated index intersections.
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from . import price_cache
+from .data_loader import _read_raw_prices, _resample, filled_mask, load_price_csv
+
+Aligned = Union[pd.Series, pd.DataFrame]
+
+class TradingCalendar:
+    """
+    Canonical date index plus forward-fill flags.
+
+    - index: sorted, unique DatetimeIndex shared by the dataset.
+    - filled: (n_dates, n_tickers) bool mask, True where a price was
+      forward-filled rather than observed (stale).
+    - columns: ticker -> column of filled.
+    """
+
+    def __init__(self, index: pd.DatetimeIndex, filled: Optional[np.ndarray] = None,
+                 tickers: Sequence[str] = ()):
+        index = pd.DatetimeIndex(index)
+        if not index.is_monotonic_increasing or not index.is_unique:
+            raise ValueError("calendar index must be sorted and unique")
+        self.index = index
+        self.tickers: List[str] = [str(t) for t in tickers]
+        self.columns: Dict[str, int] = {t: i for i, t in enumerate(self.tickers)}
+        if filled is None:
+            filled = np.zeros((len(index), len(self.tickers)), dtype=bool)
+        if filled.shape != (len(index), len(self.tickers)):
+            raise ValueError("filled must have shape (len(index), len(tickers))")
+        self.filled = filled
+        self._stamps = index.asi8
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def positions(self, index: pd.Index) -> np.ndarray:
+        """
+        - Calendar row of every date in index, -1 for dates not on the calendar.
+        - The dataset's own index maps to arange without a lookup.
+        """
+        if index is self.index or index.equals(self.index):
+            return np.arange(len(self.index))
+        stamps = pd.DatetimeIndex(index).as_unit(self.index.unit).asi8
+        if not len(self._stamps):
+            return np.full(len(stamps), -1)
+        pos = np.minimum(np.searchsorted(self._stamps, stamps), len(self._stamps) - 1)
+        return np.where(self._stamps[pos] == stamps, pos, -1)
+
+    def stale(self, tickers: Iterable[str]) -> np.ndarray:
+        """Rows where any of tickers carries a forward-filled price."""
+        cols = [self.columns[t] for t in tickers]
+        if not cols:
+            return np.zeros(len(self.index), dtype=bool)
+        return self.filled[:, cols].any(axis=1)
+
+    def common(self, *objs: Aligned, exclude_stale: Iterable[str] = ()) -> np.ndarray:
+        """
+        - Sorted calendar positions present in every obj's index.
+        - Rows where a ticker in exclude_stale was forward-filled are dropped
+          in the same pass.
+        """
+        keep = ~self.stale(exclude_stale)
+        for obj in objs:
+            pos = self.positions(obj.index)
+            if len(pos) == len(self.index) and (pos >= 0).all():
+                continue  # covers the whole calendar
+            present = np.zeros(len(self.index), dtype=bool)
+            present[pos[pos >= 0]] = True
+            keep &= present
+        return np.flatnonzero(keep)
+
+    def take(self, obj: Aligned, pos: np.ndarray) -> Aligned:
+        """
+        - Rows of obj at calendar positions pos (which must all be in obj).
+        - Uses iloc only; no label lookups.
+        """
+        obj_pos = self.positions(obj.index)
+        if len(obj_pos) == len(self.index) and (obj_pos == np.arange(len(obj_pos))).all():
+            return obj.iloc[pos]
+        row = np.full(len(self.index), -1)
+        hit = obj_pos >= 0
+        row[obj_pos[hit]] = np.flatnonzero(hit)
+        rows = row[pos]
+        if (rows < 0).any():
+            raise KeyError("some positions are not in obj's index")
+        return obj.iloc[rows]
+
+    def align(self, *objs: Aligned, exclude_stale: Iterable[str] = ()) -> Tuple[Aligned, ...]:
+        """Intersect objs on the calendar and return them aligned (see common/take)."""
+        pos = self.common(*objs, exclude_stale=exclude_stale)
+        return tuple(self.take(obj, pos) for obj in objs)
+
+_CALENDARS: Dict[tuple, Tuple[str, TradingCalendar]] = {}
+
+def load_calendar(path: str, date_col: str = "date", index_col: Optional[str] = None,
+                  cache_dir: Optional[str] = None) -> TradingCalendar:
+    """
+    - TradingCalendar of a price file as loaded by load_price_csv (business days).
+    - Built once per version of the file: the forward-fill mask is stored in
+      the price cache, and the calendar itself is kept in memory.
+    """
+    key = price_cache.cache_key(path, date_col=date_col, index_col=index_col, freq="B")
+    source = (os.path.abspath(path), date_col, index_col, cache_dir)
+    hit = _CALENDARS.get(source)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+
+    df = load_price_csv(path, date_col=date_col, index_col=index_col, cache_dir=cache_dir)
+    filled = price_cache.load_array(key, "filled", cache_dir)
+    if filled is None or filled.shape != df.shape:
+        # Cache not writable: derive the mask from a fresh parse
+        raw = _read_raw_prices(path, date_col, index_col)
+        df = _resample(raw, "B").select_dtypes(include=["number"])
+        filled = filled_mask(raw[df.columns], df)
+    cal = TradingCalendar(df.index, filled, df.columns)
+    _CALENDARS[source] = (key, cal)
+    return cal
@@ -33,9 +33,20 @@ export interface BacktestResponse {
     intercept: number;
 }
 
+export interface TickerStats {
+    first_date: string | null;
+    last_date: string | null;
+    rows: number;
+}
+
+export interface PairsResponse {
+    tickers: string[];
+    stats: Record<string, TickerStats | null>;
+}
+
 export const api = {
     getPairs: async () => {
-        const res = await axios.get<{ tickers: string[] }>(`${API_URL}/pairs`);
+        const res = await axios.get<PairsResponse>(`${API_URL}/pairs`);
         return res.data.tickers;
     },
     runBacktest: async (req: BacktestRequest) => {
@@ -1,13 +1,26 @@
 # backtest.py
+import sys
+from pathlib import Path
 import numpy as np
 import pandas as pd
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from core.trading_calendar import TradingCalendar
+from coint_utils import z_center_scale
+
 def backtest(y, x, beta, pred_next_dS, z, *,
-             entry_z=1.5, exit_z=0.0, cost_per_leg=0.0002, z_window=60,
+             entry_z=1.5, exit_z=0.0, cost_per_leg=0.0002, z_window=60, z_method="rolling",
              coint_mask=None, time_stop=0, vol_target=False, vol_window=20,
-             z_cap=3.0, meta_proba=None, meta_threshold=0.5):
+             z_cap=3.0, meta_proba=None, meta_threshold=0.5, calendar=None, exclude_stale=()):
     """
     If meta_proba is provided, only open NEW positions when meta_proba[t] >= meta_threshold.
+    Inputs are aligned by position on calendar (default: a calendar over y's dates);
+    days where a ticker in exclude_stale was forward-filled are skipped. That needs
+    the loader's forward-fill flags (core.trading_calendar.load_calendar), so
+    exclude_stale without such a calendar raises ValueError.
+    time_stop may be a Series (e.g. from a rolling half-life); a position then
+    uses the value on its entry day, and NaN means no time stop.
+    The predicted spread is standardized like z (z_window, z_method; see z_center_scale).
     """
     # realized spread
     if isinstance(beta, pd.Series):
@@ -18,15 +31,17 @@ def backtest(y, x, beta, pred_next_dS, z, *,
     # reconstruct predicted next spread: S_{t+1|t} = S_t + ΔŜ_{t+1}
     pred_next_S = S.reindex(pred_next_dS.index) + pred_next_dS
 
-    mu = S.rolling(z_window, min_periods=z_window).mean()
-    sd = S.rolling(z_window, min_periods=z_window).std(ddof=0).replace(0, np.nan)
+    mu, sd = z_center_scale(S, z_window, z_method)
     pred_z = (pred_next_S - mu) / sd
 
-    idx = y.index.intersection(x.index).intersection(z.index).intersection(pred_z.index)
-    z, pred_z = z.loc[idx], pred_z.loc[idx]
-    y, x, S = y.loc[idx], x.loc[idx], S.loc[idx]
-    valid = z.notna() & pred_z.notna()
-    y, x, z, pred_z, S = y.loc[valid], x.loc[valid], z.loc[valid], pred_z.loc[valid], S.loc[valid]
+    cal = calendar if calendar is not None else TradingCalendar(y.index)
+    unflagged = [t for t in exclude_stale if t not in cal.columns]
+    if unflagged:
+        raise ValueError(f"exclude_stale: calendar has no forward-fill flags for {unflagged}; "
+                         "pass calendar=load_calendar(<price file>)")
+    pos = cal.common(y, x, z, pred_z, exclude_stale=exclude_stale)
+    pos = pos[cal.take(z, pos).notna().to_numpy() & cal.take(pred_z, pos).notna().to_numpy()]
+    y, x, z, pred_z, S = (cal.take(s, pos) for s in (y, x, z, pred_z, S))
 
     gate = pd.Series(True, index=S.index)
     if coint_mask is not None:
@@ -38,18 +53,20 @@ def backtest(y, x, beta, pred_next_dS, z, *,
     x_ret = x.pct_change().fillna(0.0)
     leg = (y_ret - (beta.reindex(y.index)*x_ret) if isinstance(beta, pd.Series) else (y_ret - float(beta)*x_ret))
 
+    stops = time_stop.reindex(S.index) if isinstance(time_stop, pd.Series) else None
     pos = pd.Series(0, index=S.index, dtype=int)
-    state, days_in_pos = 0, 0
+    state, days_in_pos, stop = 0, 0, time_stop
     for t in S.index:
         if state == 0:
             days_in_pos = 0
             if gate.loc[t]:
                 if pred_z.loc[t] < -entry_z: state = +1
                 elif pred_z.loc[t] > +entry_z: state = -1
+                if state != 0 and stops is not None: stop = stops.loc[t]
         else:
             days_in_pos += 1
             exit_by_z = (state>0 and z.loc[t] <= exit_z) or (state<0 and z.loc[t] >= exit_z)
-            exit_by_time = (time_stop>0 and days_in_pos>=time_stop)
+            exit_by_time = (stop>0 and days_in_pos>=stop)
             if exit_by_z or exit_by_time:
                 state, days_in_pos = 0, 0
         pos.loc[t] = state
@@ -0,0 +1,159 @@
+# batch_loader.py
+import argparse, asyncio, collections, time
+import pandas as pd
+from ib_insync import Stock
+
+from data_loader import _ib_hist_requests, _bars_to_series
+from ib_pool import get_pool
+from price_store import AdjustmentMismatch, PriceStore
+
+class Pacer:
+    """
+    Sliding-window limit on request starts: at most max_requests per period seconds.
+    IB's historical-data pacing rule is 60 requests per 10 minutes.
+    """
+
+    def __init__(self, max_requests=60, period=600.0, clock=time.monotonic):
+        self.max_requests, self.period, self.clock = max_requests, period, clock
+        self._starts = collections.deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = self.clock()
+                while self._starts and now - self._starts[0] >= self.period:
+                    self._starts.popleft()
+                if len(self._starts) < self.max_requests:
+                    self._starts.append(now)
+                    return
+                await asyncio.sleep(self.period - (now - self._starts[0]))
+
+async def _fetch_gap(ib, pacer, sem, ticker, start, end, adjusted, use_rth, retries, backoff):
+    contract = Stock(ticker, "SMART", "USD")
+    last_err = None
+    for attempt in range(retries + 1):
+        if attempt:
+            await asyncio.sleep(backoff * 2 ** (attempt - 1))
+        try:
+            for kwargs in _ib_hist_requests(start, end, adjusted, use_rth):
+                await pacer.acquire()
+                async with sem:
+                    bars = await ib.reqHistoricalDataAsync(contract, **kwargs)
+                if bars:
+                    return _bars_to_series(bars, start, end)
+            last_err = RuntimeError(f"No historical data for {ticker}")
+        except Exception as e:  # timeouts, disconnects, pacing violations
+            last_err = e
+    raise last_err
+
+async def fill_store_async(ib, tickers, start, end, store, adjusted=True, use_rth=True,
+                           max_in_flight=20, pacer=None, retries=3, backoff=2.0):
+    """
+    Fetch every uncovered gap for tickers concurrently and merge it into store.
+    Adjusted gaps are anchored on a stored bar (see PriceStore.anchored); a
+    ticker whose adjustment basis changed is refetched in full and replaced.
+
+    Up to max_in_flight reqHistoricalData calls run at once; pacer (default: IB's
+    60 per 10 min) bounds how fast new ones start. Each gap is retried with
+    exponential backoff. Returns ({ticker: bars added}, {ticker: error message}).
+    """
+    pacer = pacer or Pacer()
+    sem = asyncio.Semaphore(max_in_flight)
+    filled, failed = {}, {}
+
+    async def one(ticker):
+        # gaps of one ticker run sequentially so its store file has a single writer
+        n = 0
+        try:
+            for g_start, g_end in store.missing(ticker, start, end):
+                if not len(pd.bdate_range(g_start, g_end)):
+                    store.merge(ticker, pd.Series(dtype=float), g_start, g_end)
+                    continue
+                # Adjusted fetches reach one stored bar past the gap, so merge can
+                # check that both are on the same adjustment basis
+                f_start, f_end = store.anchored(ticker, g_start, g_end)
+                s = await _fetch_gap(ib, pacer, sem, ticker, f_start, f_end, adjusted, use_rth, retries, backoff)
+                try:
+                    store.merge(ticker, s, g_start, g_end)
+                except AdjustmentMismatch:
+                    # A split or dividend since the stored bars were fetched:
+                    # rebuild the ticker from one fetch of everything needed
+                    covered = store.coverage(ticker)
+                    full_start = min(covered[0][0], pd.Timestamp(start))
+                    full_end = max(covered[-1][1], pd.Timestamp(end))
+                    s = await _fetch_gap(ib, pacer, sem, ticker, full_start, full_end, adjusted, use_rth,
+                                         retries, backoff)
+                    store.replace(ticker, s, full_start, full_end)
+                    n = len(s)
+                    break
+                n += int(((s.index >= g_start) & (s.index <= g_end)).sum())
+            filled[ticker] = n
+        except Exception as e:
+            failed[ticker] = f"{type(e).__name__}: {e}"
+
+    await asyncio.gather(*(one(t) for t in tickers))
+    return filled, failed
+
+def _run(coro):
+    # Run on the thread's current loop, which pooled (sync-connected) ib_insync
+    # sessions are bound to; asyncio.run would start a fresh, unrelated loop.
+    try:
+        loop = asyncio.get_event_loop()
+        if loop.is_closed():
+            raise RuntimeError
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+    return loop.run_until_complete(coro)
+
+def fill_store(cfg, tickers, max_in_flight=20, max_requests=60, period=600.0, retries=3, backoff=2.0, ib=None):
+    """Blocking wrapper: fill the cache for tickers over ib, or over a pooled session if ib is None."""
+    store = PriceStore(cfg["cache_dir"], cfg["adjusted"], cfg["use_rth"])
+    end = cfg["end_date"] or pd.Timestamp.today().strftime("%Y-%m-%d")
+
+    def run(conn):
+        return _run(fill_store_async(conn, tickers, cfg["start_date"], end, store,
+                                     cfg["adjusted"], cfg["use_rth"], max_in_flight,
+                                     Pacer(max_requests, period), retries, backoff))
+
+    if ib is not None:
+        return run(ib)
+    with get_pool(cfg["ib_host"], cfg["ib_port"], cfg["ib_client_id"]).session() as conn:
+        return run(conn)
+
+def main():
+    p = argparse.ArgumentParser(description="Fill the local price store for a ticker universe from IBKR")
+    p.add_argument("--tickers", required=True, help="Comma-separated tickers, or @file with one per line")
+    p.add_argument("--start", default="2020-01-01")
+    p.add_argument("--end", default="2024-12-31")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=7497)
+    p.add_argument("--client-id", type=int, default=12)
+    p.add_argument("--raw", action="store_true")
+    p.add_argument("--all-hours", action="store_true")
+    p.add_argument("--max-in-flight", type=int, default=20)
+    p.add_argument("--pace", type=int, default=60, help="Max requests per --pace-period seconds")
+    p.add_argument("--pace-period", type=float, default=600.0)
+    p.add_argument("--retries", type=int, default=3)
+    p.add_argument("--cache-dir", default="data")
+    args = p.parse_args()
+
+    if args.tickers.startswith("@"):
+        with open(args.tickers[1:]) as f:
+            tickers = [t.strip().upper() for t in f if t.strip()]
+    else:
+        tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+
+    cfg = dict(start_date=args.start, end_date=args.end, ib_host=args.host, ib_port=args.port,
+               ib_client_id=args.client_id, adjusted=not args.raw, use_rth=not args.all_hours,
+               cache_dir=args.cache_dir)
+    t0 = time.time()
+    filled, failed = fill_store(cfg, tickers, args.max_in_flight, args.pace, args.pace_period, args.retries)
+    print(f"Filled {len(filled)} tickers ({sum(filled.values())} bars) in {time.time()-t0:.1f}s")
+    for t, err in sorted(failed.items()):
+        print(f"  FAILED {t}: {err}")
+    print(f"IB pool: {get_pool(args.host, args.port, args.client_id).stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,20 @@
 # beta_estimators.py
+import sys
+from pathlib import Path
 import numpy as np
 import pandas as pd
 import statsmodels.api as sm
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from core.rolling import rolling_ols
+
 def static_beta(y, x) -> float:
     X = sm.add_constant(x.values)
     return float(sm.OLS(y.values, X).fit().params[1])
 
 def rolling_beta(y, x, window=120) -> pd.Series:
-    cov = y.rolling(window).cov(x)
-    var = x.rolling(window).var().replace(0, np.nan)
-    return (cov/var).rename("beta_roll")
+    # rolling cov(y, x) / var(x), from the one-pass rolling OLS engine
+    return rolling_ols(y, x, window)["beta"].rename("beta_roll")
 
 def rls_beta(y, x, lam=0.99) -> pd.Series:
     theta = np.array([0.0, 0.0])  # [a,b]
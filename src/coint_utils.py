@@ -1,16 +1,37 @@
 # coint_utils.py
+import sys
+from pathlib import Path
 import numpy as np
 import pandas as pd
 import statsmodels.api as sm
 from statsmodels.tsa.stattools import coint
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from core.ou import rolling_ou
+from core.parallel import rolling_coint_matrix
+from core.rolling_coint import rolling_engle_granger
+from core.signal import zscore_center_scale
+
 def test_cointegration_fullsample(y, x):
     _, p, _ = coint(y, x)
     X = sm.add_constant(x.values)
     beta = float(sm.OLS(y.values, X).fit().params[1])
     return beta, p
 
-def rolling_coint_pvalues(y, x, window=252) -> pd.Series:
+def rolling_coint_pvalues(y, x, window=252, workers=1) -> pd.Series:
+    """
+    p at t is coint() over the `window` rows before t (t itself excluded).
+    workers > 1 splits the windows across processes (core.parallel).
+    x is reindexed to y's dates either way, so workers only changes speed.
+    """
+    x = x.reindex(y.index)
+    if workers > 1:
+        df = pd.concat({"y": y, "x": x}, axis=1)
+        return rolling_coint_matrix(df, [("y", "x")], window, workers=workers)[("y", "x")].rename("pvalue").shift(1)
+    return rolling_engle_granger(y, x, window)["pvalue"].shift(1)
+
+def _rolling_coint_pvalues_loop(y, x, window=252) -> pd.Series:
+    # reference implementation: one statsmodels coint call per window
     p = pd.Series(index=y.index, dtype=float)
     for i in range(window, len(y)):
         try:
@@ -19,22 +40,46 @@ def rolling_coint_pvalues(y, x, window=252) -> pd.Series:
             p.iloc[i] = np.nan
     return p
 
-def calculate_spread_and_z(y, x, beta, window=60):
+def z_center_scale(spread, window=60, method="rolling", zero=np.nan):
+    """
+    (mu, sd) the spread (or a forecast of it) is standardized with; sd is `zero` where 0
+    (NaN by default; meta-labeling keeps 0, as it always has).
+    rolling: mean / std(ddof=0) over `window`; ewma / mad: core.signal.zscore_center_scale.
+    """
+    if method == "rolling":
+        mu = spread.rolling(window, min_periods=window).mean()
+        sd = spread.rolling(window, min_periods=window).std(ddof=0)
+    else:
+        mu, sd = zscore_center_scale(spread, window, method)
+    return mu, sd.replace(0, zero)
+
+def calculate_spread_and_z(y, x, beta, window=60, method="rolling"):
     if isinstance(beta, pd.Series):
         spread = y - beta.reindex(y.index)*x
     else:
         spread = y - float(beta)*x
-    mu = spread.rolling(window, min_periods=window).mean()
-    sd = spread.rolling(window, min_periods=window).std(ddof=0).replace(0, np.nan)
+    mu, sd = z_center_scale(spread, window, method)
     z = (spread - mu)/sd
     return spread, z
 
 def half_life(spread):
+    """
+    OU half-life (bars) of the whole spread: ln(2) / -ln(phi) of its AR(1) fit,
+    as core.ou and rolling_half_life define it. inf if it does not mean-revert.
+    """
     s = spread.dropna()
     if len(s)<50: return np.inf
     s_lag = s.shift(1).dropna()
     ds = (s - s_lag).dropna()
     s_lag = s_lag.loc[ds.index]
     X = sm.add_constant(s_lag.values)
-    phi = float(sm.OLS(ds.values, X).fit().params[1])
-    return np.inf if phi>=0 else float(-np.log(2)/phi)
+    b = float(sm.OLS(ds.values, X).fit().params[1])  # ds on s_lag: b = phi - 1
+    if b >= 0: return np.inf
+    return float(np.log(2)/-np.log1p(b)) if b > -1 else np.nan
+
+def rolling_half_life(spread, window=60) -> pd.Series:
+    """
+    OU half-life (bars) at t over the `window` rows before t (t itself excluded).
+    inf where the window does not mean-revert.
+    """
+    return rolling_ou(spread, window)["half_life"].shift(1)
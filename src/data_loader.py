@@ -1,16 +1,10 @@
 # data_loader.py
-import os, math
+import math
 import pandas as pd
 from ib_insync import IB, Stock, util
 
-def _cache_path(cache_dir, ticker, start_date, end_date):
-    os.makedirs(cache_dir, exist_ok=True)
-    return os.path.join(cache_dir, f"{ticker}_{start_date}_{end_date}.csv")
-
-def _ib_connect(host: str, port: int, client_id: int):
-    ib = IB()
-    ib.connect(host, port, clientId=client_id, readonly=True, timeout=5)
-    return ib
+from ib_pool import get_pool
+from price_store import AdjustmentMismatch, PriceStore
 
 def _ib_duration_str(start_date: str, end_date: str) -> str:
     s = pd.Timestamp(start_date)
@@ -18,53 +12,77 @@ def _ib_duration_str(start_date: str, end_date: str) -> str:
     yrs = max(1, math.ceil(max(1,(e-s).days)/365))
     return f"{yrs} Y"
 
-def _ib_fetch_series(ib: IB, ticker: str, start_date: str, end_date: str,
-                     adjusted: bool = True, use_rth: bool = True) -> pd.Series:
-    contract = Stock(ticker, "SMART", "USD")
-    what = "ADJUSTED_LAST" if adjusted else "TRADES"
-    end_str = "" if adjusted else pd.Timestamp(end_date).strftime("%Y%m%d %H:%M:%S")
-    bars = ib.reqHistoricalData(
-        contract, endDateTime=end_str, durationStr=_ib_duration_str(start_date,end_date),
-        barSizeSetting="1 day", whatToShow=what, useRTH=use_rth, formatDate=1, keepUpToDate=False
+def _ib_hist_requests(start_date: str, end_date: str, adjusted: bool = True, use_rth: bool = True):
+    """
+    reqHistoricalData kwargs for daily bars to try in order: ADJUSTED_LAST first
+    (if adjusted), then TRADES. Intraday data goes through core.intraday instead.
+    """
+    trades = dict(
+        endDateTime=pd.Timestamp(end_date).strftime("%Y%m%d %H:%M:%S"),
+        durationStr=_ib_duration_str(start_date, end_date),
+        barSizeSetting="1 day", whatToShow="TRADES", useRTH=use_rth, formatDate=1, keepUpToDate=False
     )
-    if not bars and adjusted:
-        end_str = pd.Timestamp(end_date).strftime("%Y%m%d %H:%M:%S")
-        bars = ib.reqHistoricalData(
-            contract, endDateTime=end_str, durationStr=_ib_duration_str(start_date,end_date),
-            barSizeSetting="1 day", whatToShow="TRADES", useRTH=use_rth, formatDate=1, keepUpToDate=False
-        )
-        if not bars:
-            raise RuntimeError(f"No historical data for {ticker}")
+    if not adjusted:
+        return [trades]
+    # ADJUSTED_LAST only allows an end of "now", so the duration has to reach
+    # back from today to start_date, not span start_date..end_date.
+    adj = dict(trades, endDateTime="", durationStr=_ib_duration_str(start_date, None), whatToShow="ADJUSTED_LAST")
+    return [adj, trades]
+
+def _bars_to_series(bars, start_date: str, end_date: str) -> pd.Series:
     df = util.df(bars)
     df["date"] = pd.to_datetime(df["date"]).dt.tz_localize(None)
     s = df.set_index("date")["close"].astype(float).rename("Adj Close")
     return s.loc[(s.index>=pd.Timestamp(start_date))&(s.index<=pd.Timestamp(end_date))]
 
+def _ib_fetch_series(ib: IB, ticker: str, start_date: str, end_date: str,
+                     adjusted: bool = True, use_rth: bool = True) -> pd.Series:
+    contract = Stock(ticker, "SMART", "USD")
+    for kwargs in _ib_hist_requests(start_date, end_date, adjusted, use_rth):
+        bars = ib.reqHistoricalData(contract, **kwargs)
+        if bars:
+            return _bars_to_series(bars, start_date, end_date)
+    raise RuntimeError(f"No historical data for {ticker}")
+
 def load_pair(cfg):
     y_t, x_t = cfg["ticker_y"], cfg["ticker_x"]
-    start, end = cfg["start_date"], cfg["end_date"]
-    y_path = _cache_path(cfg["cache_dir"], y_t, start, end)
-    x_path = _cache_path(cfg["cache_dir"], x_t, start, end)
+    start, end = cfg["start_date"], cfg["end_date"] or pd.Timestamp.today().strftime("%Y-%m-%d")
+    store = PriceStore(cfg["cache_dir"], cfg["adjusted"], cfg["use_rth"])
 
-    y = x = None
-    if os.path.exists(y_path) and os.path.exists(x_path):
-        try:
-            y = pd.read_csv(y_path, parse_dates=["Date"], index_col="Date")["Adj Close"]
-            x = pd.read_csv(x_path, parse_dates=["Date"], index_col="Date")["Adj Close"]
-        except Exception:
-            y = x = None
+    # Only the date ranges the store does not cover yet go to IB; gaps with
+    # no business days in them (weekends) are simply marked as covered.
+    gaps = {}
+    for t in (y_t, x_t):
+        gaps[t] = []
+        for g_start, g_end in store.missing(t, start, end):
+            if len(pd.bdate_range(g_start, g_end)):
+                gaps[t].append((g_start, g_end))
+            else:
+                store.merge(t, pd.Series(dtype=float), g_start, g_end)
+    if any(gaps.values()):
+        # Pooled session: the connection stays up for the next call
+        with get_pool(cfg["ib_host"], cfg["ib_port"], cfg["ib_client_id"]).session() as ib:
+            for t, t_gaps in gaps.items():
+                for g_start, g_end in t_gaps:
+                    # Adjusted fetches reach one stored bar past the gap, so merge can
+                    # check that both are on the same adjustment basis
+                    f_start, f_end = store.anchored(t, g_start, g_end)
+                    s = _ib_fetch_series(ib, t, f_start, f_end, cfg["adjusted"], cfg["use_rth"])
+                    try:
+                        store.merge(t, s, g_start, g_end)
+                    except AdjustmentMismatch:
+                        # A split or dividend since the stored bars were fetched:
+                        # rebuild the ticker from one fetch of everything needed
+                        covered = store.coverage(t)
+                        full_start = min(covered[0][0], pd.Timestamp(start))
+                        full_end = max(covered[-1][1], pd.Timestamp(end))
+                        s = _ib_fetch_series(ib, t, full_start, full_end, cfg["adjusted"], cfg["use_rth"])
+                        store.replace(t, s, full_start, full_end)
+                        break
 
-    if y is None or x is None:
-        ib = _ib_connect(cfg["ib_host"], cfg["ib_port"], cfg["ib_client_id"])
-        try:
-            y = _ib_fetch_series(ib, y_t, start, end, cfg["adjusted"], cfg["use_rth"])
-            x = _ib_fetch_series(ib, x_t, start, end, cfg["adjusted"], cfg["use_rth"])
-        finally:
-            ib.disconnect()
-        idx = y.index.intersection(x.index)
-        y, x = y.loc[idx], x.loc[idx]
-        if len(y)==0 or len(x)==0:
-            raise ValueError("IBKR returned empty data.")
-        pd.DataFrame({"Adj Close": y}).to_csv(y_path, index_label="Date")
-        pd.DataFrame({"Adj Close": x}).to_csv(x_path, index_label="Date")
+    y, x = store.read(y_t, start, end), store.read(x_t, start, end)
+    idx = y.index.intersection(x.index)
+    y, x = y.loc[idx], x.loc[idx]
+    if len(y)==0 or len(x)==0:
+        raise ValueError("IBKR returned empty data.")
     return y, x
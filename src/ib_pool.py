@@ -0,0 +1,200 @@
+# ib_pool.py
+import atexit, threading, time
+from contextlib import contextmanager
+from ib_insync import IB
+
+# TWS / gateway error code: "client id is already in use"
+CLIENT_ID_IN_USE = 326
+
+class ClientIdInUse(ConnectionError):
+    """The gateway refused a client id because another session holds it (error 326)."""
+
+class IBPool:
+    """
+    Keeps authenticated IB sessions alive and hands them out to loader calls.
+
+    - Connections are created lazily, up to max_size, with client ids
+      client_id, client_id+1, ... (each live session needs a unique id).
+    - acquire() prefers an idle connection (hit) over opening one (miss); when
+      the pool is exhausted it waits up to `wait` seconds for a release.
+    - Idle connections that dropped are reconnected on their next checkout; if
+      their id is refused as in use (error 326), the next free id is tried.
+      Other connect failures (gateway down, timeouts) keep the id, so the
+      pool recovers once the gateway is back.
+    - stats() reports hits/misses/reconnects and acquire/connect latency.
+    """
+
+    def __init__(self, host="127.0.0.1", port=7497, client_id=11, max_size=4,
+                 factory=IB, timeout=5, readonly=True, wait=30.0):
+        self.host, self.port, self.timeout, self.readonly = host, port, timeout, readonly
+        self.factory, self.max_size, self.wait = factory, max_size, wait
+        self._free_ids = list(range(client_id, client_id + max_size))
+        self._ids = {}       # id(ib) -> client id
+        self._idle = []
+        self._size = 0
+        self._cond = threading.Condition()
+        self._stats = dict(hits=0, misses=0, reconnects=0, waits=0,
+                           acquire_s=0.0, acquire_max_s=0.0, acquires=0, connect_s=0.0, connects=0)
+
+    def _connect(self, ib, client_id):
+        t0 = time.perf_counter()
+        codes = []
+        on_error = lambda req_id, code, *args: codes.append(code)
+        events = getattr(ib, "errorEvent", None)
+        if events is not None:
+            events += on_error
+        try:
+            ib.connect(self.host, self.port, clientId=client_id, readonly=self.readonly, timeout=self.timeout)
+        except Exception as e:
+            if CLIENT_ID_IN_USE in codes or "already in use" in str(e):
+                raise ClientIdInUse(f"client id {client_id} already in use") from e
+            raise
+        finally:
+            if events is not None:
+                events -= on_error
+        with self._cond:
+            self._stats["connect_s"] += time.perf_counter() - t0
+            self._stats["connects"] += 1
+
+    def _open(self, ib=None):
+        # Try free client ids until one connects. Ids the gateway reports as in
+        # use are retired; any other failure (e.g. gateway down) returns the id
+        # to the free list and is raised, so the pool recovers with the gateway.
+        last_err = None
+        while True:
+            with self._cond:
+                if not self._free_ids:
+                    break
+                cid = self._free_ids.pop(0)
+            conn = ib or self.factory()
+            try:
+                self._connect(conn, cid)
+            except ClientIdInUse as e:
+                last_err = e
+                continue
+            except Exception:
+                with self._cond:
+                    self._free_ids.append(cid)
+                raise
+            with self._cond:
+                self._ids[id(conn)] = cid
+            return conn
+        raise ConnectionError(f"IB pool: no usable client id ({last_err})")
+
+    def _reconnect(self, ib):
+        with self._cond:
+            cid = self._ids.pop(id(ib))
+        try:
+            self._connect(ib, cid)
+        except ClientIdInUse:
+            return self._open(ib)
+        except Exception:
+            with self._cond:
+                self._free_ids.append(cid)
+            raise
+        with self._cond:
+            self._ids[id(ib)] = cid
+        return ib
+
+    def acquire(self):
+        t0 = time.perf_counter()
+        with self._cond:
+            deadline = t0 + self.wait
+            while not self._idle and self._size >= self.max_size:
+                self._stats["waits"] += 1
+                left = deadline - time.perf_counter()
+                if left <= 0 or not self._cond.wait(left):
+                    raise TimeoutError(f"IB pool: all {self.max_size} connections busy")
+            if self._idle:
+                ib = self._idle.pop()
+                stale = not ib.isConnected()
+                self._stats["reconnects" if stale else "hits"] += 1
+            else:
+                ib, stale = None, False
+                self._stats["misses"] += 1
+                self._size += 1
+
+        # Handshakes happen outside the lock so other callers are not blocked
+        try:
+            if ib is None:
+                ib = self._open()
+            elif stale:
+                ib = self._reconnect(ib)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        dt = time.perf_counter() - t0
+        with self._cond:
+            self._stats["acquires"] += 1
+            self._stats["acquire_s"] += dt
+            self._stats["acquire_max_s"] = max(self._stats["acquire_max_s"], dt)
+        return ib
+
+    def release(self, ib, discard=False):
+        with self._cond:
+            if discard or not ib.isConnected():
+                self._free_ids.append(self._ids.pop(id(ib)))
+                self._size -= 1
+                try:
+                    ib.disconnect()
+                except Exception:
+                    pass
+            else:
+                self._idle.append(ib)
+            self._cond.notify()
+
+    @contextmanager
+    def session(self):
+        """with pool.session() as ib: ...  (a connection that errored mid-use is discarded)"""
+        ib = self.acquire()
+        try:
+            yield ib
+        except ConnectionError:
+            self.release(ib, discard=True)
+            raise
+        except BaseException:
+            self.release(ib)
+            raise
+        self.release(ib)
+
+    def close(self):
+        with self._cond:
+            for ib in self._idle:
+                self._free_ids.append(self._ids.pop(id(ib)))
+                try:
+                    ib.disconnect()
+                except Exception:
+                    pass
+            self._size -= len(self._idle)
+            self._idle = []
+
+    def stats(self):
+        s = self._stats
+        with self._cond:
+            return dict(
+                hits=s["hits"], misses=s["misses"], reconnects=s["reconnects"], waits=s["waits"],
+                hit_rate=s["hits"] / s["acquires"] if s["acquires"] else 0.0,
+                size=self._size, idle=len(self._idle),
+                acquire_ms_avg=1e3 * s["acquire_s"] / s["acquires"] if s["acquires"] else 0.0,
+                acquire_ms_max=1e3 * s["acquire_max_s"],
+                connect_ms_avg=1e3 * s["connect_s"] / s["connects"] if s["connects"] else 0.0,
+            )
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+def get_pool(host="127.0.0.1", port=7497, client_id=11, **kwargs):
+    """Process-wide pool per (host, port, base client id); closed at exit."""
+    key = (host, port, client_id)
+    with _POOLS_LOCK:
+        if key not in _POOLS:
+            _POOLS[key] = IBPool(host, port, client_id, **kwargs)
+        return _POOLS[key]
+
+@atexit.register
+def _close_pools():
+    for pool in _POOLS.values():
+        pool.close()
@@ -0,0 +1,111 @@
+# ib_replay.py
+import asyncio, collections, time, zlib
+import numpy as np
+import pandas as pd
+from ib_insync import BarData
+
+_UNITS = {"S": "seconds", "D": "days", "W": "weeks", "M": "months", "Y": "years"}
+
+def _window(endDateTime, durationStr):
+    end = pd.Timestamp(endDateTime) if endDateTime else pd.Timestamp.today().normalize()
+    n, unit = durationStr.split()
+    return end - pd.DateOffset(**{_UNITS[unit]: int(n)}), end
+
+class ReplayIB:
+    """
+    Local stand-in for a TWS/Gateway session that replays daily bars.
+
+    Implements the parts of ib_insync.IB the loaders use (reqHistoricalData,
+    reqHistoricalDataAsync, connectAsync, isConnected, disconnect), so
+    data_loader.load_pair and batch_loader.fill_store can be exercised offline.
+
+      history    {ticker: close Series}; unknown tickers get a seeded random walk
+      latency    seconds each request takes to "arrive"
+      fail_first {ticker: n} - the first n requests for ticker raise ConnectionError
+      pacing     (max_requests, period): exceeding it returns [] like IB error 162
+
+    Records every request and the peak number in flight for assertions.
+    """
+
+    def __init__(self, history=None, latency=0.0, fail_first=None, pacing=None):
+        self.history = dict(history or {})
+        self.latency = latency
+        self.fail_first = collections.Counter(fail_first or {})
+        self.pacing = pacing
+        self.requests = []
+        self.in_flight = self.max_in_flight = 0
+        self.violations = 0
+        self._connected = True
+        self._starts = collections.deque()
+
+    @classmethod
+    def from_csv_dir(cls, path, tickers, **kwargs):
+        """Replay {ticker}.csv files with Date and Adj Close (or close) columns."""
+        history = {}
+        for t in tickers:
+            df = pd.read_csv(f"{path}/{t}.csv", parse_dates=["Date"], index_col="Date")
+            history[t] = df["Adj Close" if "Adj Close" in df else "close"]
+        return cls(history, **kwargs)
+
+    def _series(self, ticker):
+        if ticker not in self.history:
+            dates = pd.bdate_range("2010-01-01", pd.Timestamp.today().normalize())
+            rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+            self.history[ticker] = pd.Series(50 + rng.standard_normal(len(dates)).cumsum().clip(-45), index=dates)
+        return self.history[ticker]
+
+    def _paced_out(self):
+        if not self.pacing:
+            return False
+        max_requests, period = self.pacing
+        now = time.monotonic()
+        while self._starts and now - self._starts[0] >= period:
+            self._starts.popleft()
+        self._starts.append(now)
+        if len(self._starts) > max_requests:
+            self.violations += 1
+            return True
+        return False
+
+    def _bars(self, contract, endDateTime, durationStr):
+        ticker = contract.symbol
+        self.requests.append((ticker, endDateTime, durationStr))
+        if self.fail_first[ticker] > 0:
+            self.fail_first[ticker] -= 1
+            raise ConnectionError(f"replay: injected failure for {ticker}")
+        if self._paced_out():
+            return []
+        start, end = _window(endDateTime, durationStr)
+        s = self._series(ticker).loc[start:end]
+        return [BarData(date=d.date(), close=float(v)) for d, v in s.items()]
+
+    def reqHistoricalData(self, contract, endDateTime, durationStr, barSizeSetting, whatToShow, useRTH,
+                          formatDate=1, keepUpToDate=False, chartOptions=[], timeout=60):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._bars(contract, endDateTime, durationStr)
+
+    async def reqHistoricalDataAsync(self, contract, endDateTime, durationStr, barSizeSetting, whatToShow,
+                                     useRTH, formatDate=1, keepUpToDate=False, chartOptions=[], timeout=60):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return self._bars(contract, endDateTime, durationStr)
+        finally:
+            self.in_flight -= 1
+
+    async def connectAsync(self, host="127.0.0.1", port=7497, clientId=1, timeout=4, readonly=False, account=""):
+        self._connected = True
+        return self
+
+    def connect(self, host="127.0.0.1", port=7497, clientId=1, timeout=4, readonly=False, account=""):
+        self._connected = True
+        return self
+
+    def isConnected(self):
+        return self._connected
+
+    def disconnect(self):
+        self._connected = False
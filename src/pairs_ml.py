@@ -1,6 +1,7 @@
 # pairs_ml.py
 import argparse, warnings
 warnings.filterwarnings("ignore")
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
@@ -10,7 +11,9 @@ from coint_utils import (
     test_cointegration_fullsample,
     rolling_coint_pvalues,
     calculate_spread_and_z,
+    z_center_scale,
     half_life,
+    rolling_half_life,
 )
 from features import engineer_features
 from models import train_regressor, train_meta_classifier
@@ -33,6 +36,12 @@ def parse_args():
     p.add_argument("--exit-z", type=float, default=0.0)
     p.add_argument("--cost-bps", type=float, default=2.0)
     p.add_argument("--z-window", type=int, default=60)
+    p.add_argument(
+        "--z-method",
+        choices=["rolling", "ewma", "mad"],
+        default="rolling",
+        help="z-score of the spread: rolling mean/std, EWMA with span --z-window, or rolling median/MAD",
+    )
 
     # Model choice
     p.add_argument("--use-xgb", action="store_true")
@@ -59,6 +68,12 @@ def parse_args():
 
     # Execution
     p.add_argument("--time-stop", type=int, default=0)
+    p.add_argument(
+        "--time-stop-hl",
+        type=float,
+        default=0.0,
+        help="Dynamic time stop: exit after this many rolling half-lives (z-window) of the spread; overrides --time-stop",
+    )
     p.add_argument("--vol-target", action="store_true")
     p.add_argument("--vol-window", type=int, default=20)
     p.add_argument("--z-cap", type=float, default=3.0)
@@ -120,6 +135,7 @@ def main():
         exit_threshold=args.exit_z,
         cost_per_leg=args.cost_bps / 1e4,
         z_window=args.z_window,
+        z_method=args.z_method,
         use_xgb=args.use_xgb,
         ib_host=args.host,
         ib_port=args.port,
@@ -135,6 +151,7 @@ def main():
         coint_threshold=args.coint_threshold,
         coint_gate=(not args.no_coint_gate),
         time_stop=args.time_stop,
+        time_stop_hl=args.time_stop_hl,
         vol_target=args.vol_target,
         vol_window=args.vol_window,
         z_cap=args.z_cap,
@@ -155,7 +172,7 @@ def main():
         f"Pair: {cfg['ticker_y']}/{cfg['ticker_x']}   Dates: {cfg['start_date']} → {cfg['end_date']}"
     )
     print(
-        f"EntryZ={cfg['entry_threshold']} ExitZ={cfg['exit_threshold']} Zwin={cfg['z_window']}  Cost/leg={cfg['cost_per_leg']*1e4:.1f} bps"
+        f"EntryZ={cfg['entry_threshold']} ExitZ={cfg['exit_threshold']} Zwin={cfg['z_window']} Z={cfg['z_method']}  Cost/leg={cfg['cost_per_leg']*1e4:.1f} bps"
     )
     print(
         f"β mode: {cfg['beta_mode']} (win={cfg['beta_window']} λ={cfg['rls_lam']} q={cfg['kalman_q']} rS={cfg['kalman_r_scale']})"
@@ -163,8 +180,9 @@ def main():
     print(
         f"Coint gate: {'ON' if cfg['coint_gate'] else 'OFF'} (win={cfg['coint_window']} p≤{cfg['coint_threshold']})"
     )
+    time_stop_desc = f"{cfg['time_stop_hl']:g}×half-life" if cfg["time_stop_hl"] > 0 else cfg["time_stop"]
     print(
-        f"Time stop: {cfg['time_stop']}  Vol targeting: {'ON' if cfg['vol_target'] else 'OFF'}"
+        f"Time stop: {time_stop_desc}  Vol targeting: {'ON' if cfg['vol_target'] else 'OFF'}"
     )
     print(
         f"Meta: {'ON' if cfg['meta'] else 'OFF'} (pt={cfg['meta_pt']} sl={cfg['meta_sl']} H={cfg['meta_h']} thr={cfg['meta_thresh']} train_entry={cfg['meta_train_entry_z']})"
@@ -211,7 +229,7 @@ def main():
 
     # 5) Spread & z for TRADING
     print("\nStep 3: Spread & z (trading β)...")
-    spread, z = calculate_spread_and_z(y, x, beta, cfg["z_window"])
+    spread, z = calculate_spread_and_z(y, x, beta, cfg["z_window"], cfg["z_method"])
 
     # 6) Half-life diagnostic (independent β choice)
     try:
@@ -226,6 +244,13 @@ def main():
     except Exception as e:
         print(f"(Half-life diagnostic skipped: {e})")
 
+    # Dynamic time stop: a multiple of the spread's rolling half-life (lagged)
+    time_stop = cfg["time_stop"]
+    if cfg["time_stop_hl"] > 0:
+        hl_roll = rolling_half_life(spread, cfg["z_window"])
+        time_stop = np.ceil(cfg["time_stop_hl"] * hl_roll.where(np.isfinite(hl_roll)))
+        print(f"Rolling half-life median ≈ {hl_roll[np.isfinite(hl_roll)].median():.1f} days")
+
     # 7) Features & ΔS regressor
     print("Step 4: Features & ΔS regressor...")
     feats = engineer_features(y, x, spread, z)
@@ -238,8 +263,7 @@ def main():
         print("\nStep 5: Meta-labeling (triple barrier)...")
         # reconstruct predicted z (for dataset building only)
         pred_S = spread.reindex(pred_dS.index) + pred_dS
-        mu = spread.rolling(cfg["z_window"], min_periods=cfg["z_window"]).mean()
-        sd = spread.rolling(cfg["z_window"], min_periods=cfg["z_window"]).std(ddof=0).replace(0, 0.0)
+        mu, sd = z_center_scale(spread, cfg["z_window"], cfg["z_method"], zero=0.0)
         pred_z = ((pred_S - mu) / sd).reindex(pred_dS.index)
 
         meta_entry = cfg["meta_train_entry_z"] if cfg["meta_train_entry_z"] is not None else cfg["entry_threshold"]
@@ -277,8 +301,9 @@ def main():
         exit_z=cfg["exit_threshold"],
         cost_per_leg=cfg["cost_per_leg"],
         z_window=cfg["z_window"],
+        z_method=cfg["z_method"],
         coint_mask=coint_mask,
-        time_stop=cfg["time_stop"],
+        time_stop=time_stop,
         vol_target=cfg["vol_target"],
         vol_window=cfg["vol_window"],
         z_cap=cfg["z_cap"],
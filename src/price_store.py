@@ -0,0 +1,179 @@
+# price_store.py
+import glob, json, os, re
+import numpy as np
+import pandas as pd
+
+DAY = pd.Timedelta(days=1)
+
+# Adjusted closes that differ by more than this (relative) come from different adjustment bases
+ADJ_RTOL = 1e-6
+
+class AdjustmentMismatch(ValueError):
+    """Fetched adjusted bars disagree with the stored ones (a split/dividend landed in between)."""
+
+def _merge_ranges(ranges):
+    out = []
+    for s, e in sorted(ranges):
+        if out and s <= out[-1][1] + DAY:
+            out[-1] = (out[-1][0], max(out[-1][1], e))
+        else:
+            out.append((s, e))
+    return out
+
+def _in_ranges(idx, ranges):
+    mask = np.zeros(len(idx), dtype=bool)
+    for s, e in ranges:
+        mask |= (idx >= s) & (idx < e + DAY)
+    return mask
+
+class PriceStore:
+    """
+    Per-ticker daily close store that remembers which calendar ranges it covers.
+
+      <cache_dir>/<TICKER>.<ADJ|RAW>.<RTH|ALL>.csv   Date, Adj Close
+      <cache_dir>/<TICKER>.<ADJ|RAW>.<RTH|ALL>.json  {"ranges": [[start, end], ...]}
+
+    Ranges are inclusive calendar dates that have been fetched, so weekends and
+    holidays inside a covered range are not re-requested. Only the gaps between
+    a request and the covered ranges need to go to IB; any covered sub-range is
+    served locally. Files from the old {ticker}_{start}_{end}.csv cache are
+    absorbed the first time a ticker is touched.
+
+    Adjusted bars are only comparable within one adjustment basis, so for
+    an ADJ store every merge is checked against the stored bars it overlaps
+    (fetch with anchored() to get an overlap); a mismatch raises
+    AdjustmentMismatch and the caller refetches the whole range (replace()).
+    """
+
+    def __init__(self, cache_dir, adjusted=True, use_rth=True):
+        self.cache_dir = cache_dir
+        self.adjusted = adjusted
+        self.suffix = f"{'ADJ' if adjusted else 'RAW'}.{'RTH' if use_rth else 'ALL'}"
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, ticker, ext):
+        return os.path.join(self.cache_dir, f"{ticker}.{self.suffix}.{ext}")
+
+    def _load_meta(self, ticker):
+        path = self._path(ticker, "json")
+        if not os.path.exists(path):
+            return {"ranges": [], "imported": []}
+        with open(path) as f:
+            meta = json.load(f)
+        meta["ranges"] = [(pd.Timestamp(s), pd.Timestamp(e)) for s, e in meta["ranges"]]
+        meta.setdefault("imported", [])
+        return meta
+
+    def _save(self, ticker, series, meta):
+        series.sort_index().to_frame("Adj Close").to_csv(self._path(ticker, "csv"), index_label="Date")
+        out = dict(meta, ranges=[[s.strftime("%Y-%m-%d"), e.strftime("%Y-%m-%d")] for s, e in meta["ranges"]])
+        tmp = self._path(ticker, "json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(out, f)
+        os.replace(tmp, self._path(ticker, "json"))
+
+    def _load_series(self, ticker):
+        path = self._path(ticker, "csv")
+        if not os.path.exists(path):
+            return pd.Series(dtype=float, name="Adj Close", index=pd.DatetimeIndex([], name="Date"))
+        return pd.read_csv(path, parse_dates=["Date"], index_col="Date")["Adj Close"]
+
+    def _import_legacy(self, ticker, meta):
+        pat = re.compile(rf"^{re.escape(ticker)}_(\d{{4}}-\d{{2}}-\d{{2}})_(\d{{4}}-\d{{2}}-\d{{2}})\.csv$")
+        found = []
+        for path in glob.glob(os.path.join(self.cache_dir, f"{ticker}_*.csv")):
+            m = pat.match(os.path.basename(path))
+            if m and os.path.basename(path) not in meta["imported"]:
+                found.append((path, m.group(1), m.group(2)))
+        if not found:
+            return meta
+        series = self._load_series(ticker)
+        for path, start, end in found:
+            try:
+                legacy = pd.read_csv(path, parse_dates=["Date"], index_col="Date")["Adj Close"]
+            except Exception:
+                continue
+            meta["imported"].append(os.path.basename(path))
+            if self.adjusted:
+                try:
+                    self._check_basis(legacy, series, meta)
+                except AdjustmentMismatch:
+                    continue  # left uncovered, so it is fetched again
+            series = legacy.combine_first(series)
+            meta["ranges"] = _merge_ranges(meta["ranges"] + [(pd.Timestamp(start), pd.Timestamp(end))])
+        self._save(ticker, series.rename("Adj Close"), meta)
+        return meta
+
+    def coverage(self, ticker):
+        return self._import_legacy(ticker, self._load_meta(ticker))["ranges"]
+
+    def missing(self, ticker, start, end):
+        """Inclusive (start, end) gaps of [start, end] not yet covered locally."""
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        gaps, cursor = [], start
+        for s, e in self.coverage(ticker):
+            if e < cursor:
+                continue
+            if s > end:
+                break
+            if s > cursor:
+                gaps.append((cursor, s - DAY))
+            cursor = max(cursor, e + DAY)
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def anchored(self, ticker, start, end):
+        """
+        (start, end) widened to the nearest stored bar on each side, so that
+        adjusted bars fetched for the gap overlap the store (unchanged for RAW).
+        """
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        if not self.adjusted:
+            return start, end
+        meta = self._import_legacy(ticker, self._load_meta(ticker))
+        idx = self._load_series(ticker).index
+        idx = idx[_in_ranges(idx, meta["ranges"])]
+        before, after = idx[idx < start], idx[idx > end]
+        return (before[-1] if len(before) else start), (after[0] if len(after) else end)
+
+    def _check_basis(self, series, stored, meta):
+        # Compare on stored bars inside covered ranges (an uncovered bar, e.g.
+        # today's, may still change)
+        stored = stored[_in_ranges(stored.index, meta["ranges"])]
+        if not len(series) or not len(stored):
+            return
+        common = series.index.intersection(stored.index)
+        if not len(common):
+            raise AdjustmentMismatch("no overlapping bars to compare adjustment bases")
+        new, old = series.loc[common].to_numpy(), stored.loc[common].to_numpy()
+        if (abs(new - old) > ADJ_RTOL * abs(old)).any():
+            raise AdjustmentMismatch("adjusted closes changed since they were stored")
+
+    def merge(self, ticker, series, start, end):
+        """
+        Add fetched bars and mark [start, end] as covered (today's bar is never final).
+        ADJ stores raise AdjustmentMismatch if the bars do not match the stored ones.
+        """
+        start = pd.Timestamp(start).normalize()
+        end = min(pd.Timestamp(end).normalize(), pd.Timestamp.today().normalize() - DAY)
+        meta = self._load_meta(ticker)
+        stored = self._load_series(ticker)
+        if self.adjusted:
+            self._check_basis(series, stored, meta)
+        merged = series.combine_first(stored) if len(series) else stored
+        if end >= start:
+            meta["ranges"] = _merge_ranges(meta["ranges"] + [(start, end)])
+        self._save(ticker, merged.rename("Adj Close"), meta)
+
+    def replace(self, ticker, series, start, end):
+        """Drop everything stored for ticker and keep just these bars, covering [start, end]."""
+        start = pd.Timestamp(start).normalize()
+        end = min(pd.Timestamp(end).normalize(), pd.Timestamp.today().normalize() - DAY)
+        meta = self._load_meta(ticker)
+        meta["ranges"] = [(start, end)] if end >= start else []
+        self._save(ticker, series.rename("Adj Close"), meta)
+
+    def read(self, ticker, start, end):
+        s = self._load_series(ticker)
+        return s.loc[(s.index >= pd.Timestamp(start)) & (s.index <= pd.Timestamp(end))]